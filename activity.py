@@ -0,0 +1,204 @@
+import math
+import time
+import unicodedata
+from array import array
+from collections.abc import Callable
+from typing import Any
+
+# Event kinds counted per repository, in display order
+ACTIVITY_KINDS = ("issues", "prs", "pushes", "stars", "releases")
+KIND_LABELS = {
+    "issues": "Issue",
+    "prs": "PR",
+    "pushes": "推送",
+    "stars": "Star",
+    "releases": "Release",
+}
+# Event log record types -> activity kind
+_RECORD_KINDS = {
+    "issues": "issues",
+    "pull_request": "prs",
+    "push": "pushes",
+    "star": "stars",
+    "watch": "stars",
+    "release": "releases",
+}
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+# Buckets per sparkline; longer ranges merge several hours into one bucket
+SPARK_WIDTH = 42
+
+
+def current_hour(now: float | None = None) -> int:
+    """Hours since the epoch, the index of an hourly bucket."""
+    return int((time.time() if now is None else now) // 3600)
+
+
+def record_kind(record: dict[str, Any]) -> str | None:
+    """Return the activity kind of an event log record, if it is counted."""
+    kind = _RECORD_KINDS.get(record.get("type", ""))
+    if kind == "stars" and record.get("action") == "deleted":
+        return None
+    return kind
+
+
+def sparkline(values: list[int]) -> str:
+    """Render counts as block characters scaled to the largest one."""
+    peak = max(values, default=0)
+    blocks = []
+    for value in values:
+        if value <= 0:
+            blocks.append(SPARK_BLOCKS[0])
+        else:
+            # Any activity shows at least the second block, the peak the last
+            scaled = math.ceil(value * (len(SPARK_BLOCKS) - 1) / peak)
+            blocks.append(SPARK_BLOCKS[max(1, scaled)])
+    return "".join(blocks)
+
+
+def _pad(label: str, width: int) -> str:
+    """Left-align a label, counting wide (CJK) characters as two columns."""
+    columns = sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in label)
+    return label + " " * max(1, width - columns)
+
+
+class RepoActivity:
+    """Hourly event counts of one repository in fixed-size ring buffers.
+
+    Each kind has an array of ``size`` hourly buckets indexed by
+    ``hour % size``. Moving to a new hour clears only the buckets skipped
+    since the last update, so adding an event is O(1) amortized.
+    """
+
+    __slots__ = ("size", "hour", "since", "counts")
+
+    def __init__(self, size: int, hour: int) -> None:
+        self.size = size
+        # Newest bucket and first hour this repository was tracked
+        self.hour = hour
+        self.since = hour
+        self.counts = {kind: array("I", bytes(4 * size)) for kind in ACTIVITY_KINDS}
+
+    def advance(self, hour: int) -> None:
+        """Make ``hour`` the newest bucket, clearing the hours in between."""
+        if hour <= self.hour:
+            return
+        for skipped in range(max(self.hour + 1, hour - self.size + 1), hour + 1):
+            for buckets in self.counts.values():
+                buckets[skipped % self.size] = 0
+        self.hour = hour
+
+    def add(self, kind: str, hour: int, count: int = 1) -> None:
+        self.advance(hour)
+        if hour > self.hour - self.size:
+            self.counts[kind][hour % self.size] += count
+
+    def series(self, kind: str, hours: int, hour: int) -> list[int]:
+        """Counts of the ``hours`` buckets ending at ``hour``, oldest first."""
+        self.advance(hour)
+        buckets = self.counts[kind]
+        return [
+            buckets[h % self.size] if h > self.hour - self.size else 0
+            for h in range(hour - hours + 1, hour + 1)
+        ]
+
+
+class ActivityTracker:
+    """Recent activity of every tracked repository, bucketed by hour.
+
+    Fed with the same records as the event log, from both the webhook and
+    the poll path. Answers ``/ghactivity`` without API calls and tells the
+    poll loop which repositories have gone quiet.
+    """
+
+    def __init__(self, days: int) -> None:
+        self.size = max(1, days) * 24
+        self._repos: dict[str, RepoActivity] = {}
+
+    def track(self, repo: str, now: float | None = None) -> RepoActivity:
+        """Start tracking a repository, even before its first event."""
+        name = repo.lower()
+        activity = self._repos.get(name)
+        if activity is None:
+            activity = self._repos[name] = RepoActivity(self.size, current_hour(now))
+        return activity
+
+    def add(self, record: dict[str, Any]) -> None:
+        kind = record_kind(record)
+        repo = record.get("repo")
+        if kind is None or not repo:
+            return
+        hour = current_hour(record.get("ts"))
+        self.track(repo, record.get("ts")).add(kind, hour)
+
+    def total(self, repo: str, hours: int, now: float | None = None) -> int | None:
+        """Events of every kind in the last ``hours`` hours, None if untracked."""
+        activity = self._repos.get(repo.lower())
+        if activity is None:
+            return None
+        hours = min(hours, self.size)
+        hour = current_hour(now)
+        return sum(sum(activity.series(kind, hours, hour)) for kind in ACTIVITY_KINDS)
+
+    def is_quiet(self, repo: str, hours: int, now: float | None = None) -> bool:
+        """Whether a repository was tracked for ``hours`` hours without any event."""
+        activity = self._repos.get(repo.lower())
+        if activity is None or current_hour(now) - activity.since < hours:
+            return False
+        return self.total(repo, hours, now) == 0
+
+    def retain(self, keep: Callable[[str], bool]) -> None:
+        """Drop repositories for which ``keep`` returns False."""
+        for name in [name for name in self._repos if not keep(name)]:
+            del self._repos[name]
+
+    def report(self, repo: str, hours: int, now: float | None = None) -> str | None:
+        """Sparkline per kind over the last ``hours`` hours, None if untracked."""
+        activity = self._repos.get(repo.lower())
+        if activity is None:
+            return None
+        hours = min(hours, self.size)
+        width = math.ceil(hours / SPARK_WIDTH)
+        buckets = math.ceil(hours / width)
+        hour = current_hour(now)
+
+        rows = []
+        grand_total = 0
+        for kind in ACTIVITY_KINDS:
+            series = activity.series(kind, buckets * width, hour)
+            merged = [sum(series[i : i + width]) for i in range(0, len(series), width)]
+            total = sum(merged)
+            grand_total += total
+            rows.append(f"{_pad(KIND_LABELS[kind], 8)}{sparkline(merged)} {total}")
+
+        span = f"{hours // 24} 天" if hours % 24 == 0 else f"{hours} 小时"
+        return "\n".join(
+            [f"📈 {repo} 近 {span}的活动 (每格 {width} 小时，共 {grand_total} 个事件)"]
+            + rows
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        now = current_hour()
+        return {
+            name: {
+                "hour": now,
+                "since": activity.since,
+                "counts": {
+                    kind: activity.series(kind, self.size, now) for kind in ACTIVITY_KINDS
+                },
+            }
+            for name, activity in self._repos.items()
+        }
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Restore saved activity; counts are stored oldest first, so the size may change."""
+        for name, saved in data.items():
+            hour = int(saved.get("hour", 0))
+            activity = self._repos[name] = RepoActivity(self.size, hour)
+            activity.since = int(saved.get("since", hour))
+            for kind, counts in (saved.get("counts") or {}).items():
+                if kind not in activity.counts:
+                    continue
+                counts = counts[-self.size :]
+                for offset, count in enumerate(counts):
+                    bucket_hour = hour - len(counts) + 1 + offset
+                    activity.counts[kind][bucket_hour % self.size] = count
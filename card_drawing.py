@@ -0,0 +1,193 @@
+"""Card drawing run in the renderer's worker processes.
+
+This module must not import AstrBot: spawned workers import it to run
+``render_card``, and should only load the standard library and Pillow.
+"""
+
+import io
+import os
+from typing import Any
+
+CARD_WIDTH = 1200
+CARD_HEIGHT = 600
+MARGIN = 60
+
+# Fonts with CJK coverage tried when no font is configured
+CJK_FONT_CANDIDATES = (
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "C:/Windows/Fonts/msyh.ttc",
+)
+
+STATE_COLORS = {
+    "open": "#1f883d",
+    "closed": "#cf222e",
+    "merged": "#8250df",
+    "draft": "#6e7781",
+    "public": "#1f883d",
+    "private": "#9a6700",
+}
+TEXT_COLOR = "#1f2328"
+MUTED_COLOR = "#656d76"
+
+
+def _font(font_path: str | None, size: int) -> Any:
+    from PIL import ImageFont
+
+    for path in (font_path, *CJK_FONT_CANDIDATES):
+        if path and os.path.exists(path):
+            try:
+                return ImageFont.truetype(path, size)
+            except OSError:
+                continue
+    return ImageFont.load_default(size=size)
+
+
+def _wrap(draw: Any, text: str, font: Any, width: int, max_lines: int) -> list[str]:
+    """Greedy line wrap that also breaks long runs without spaces, such as CJK text."""
+    lines: list[str] = []
+    line = ""
+    # Only the first few hundred characters can ever be shown
+    for char in " ".join(text[:400].split()):
+        candidate = line + char
+        if line and draw.textlength(candidate, font=font) > width:
+            head, sep, tail = line.rpartition(" ")
+            if sep and head:
+                lines.append(head)
+                line = tail + char
+            else:
+                lines.append(line)
+                line = char.lstrip()
+            if len(lines) == max_lines:
+                break
+        else:
+            line = candidate
+    else:
+        if line:
+            lines.append(line)
+        return lines
+    last = lines[-1]
+    while last and draw.textlength(last + "…", font=font) > width:
+        last = last[:-1]
+    lines[-1] = last + "…"
+    return lines
+
+
+def _label_colors(color: str | None) -> tuple[str, str]:
+    """Return (fill, text) colors for a label's hex color."""
+    color = (color or "d0d7de").lstrip("#")
+    try:
+        r, g, b = (int(color[i : i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return "#d0d7de", TEXT_COLOR
+    luminance = 0.299 * r + 0.587 * g + 0.114 * b
+    return f"#{color}", TEXT_COLOR if luminance > 150 else "#ffffff"
+
+
+def _card_fields(kind: str, ref: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Pick what a card shows from REST API data of a repository, issue or PR."""
+    if kind == "repo":
+        stats = [
+            f"{data.get('stargazers_count', 0):,} stars",
+            f"{data.get('forks_count', 0):,} forks",
+            f"{data.get('open_issues_count', 0):,} open issues",
+        ]
+        if data.get("language"):
+            stats.insert(0, data["language"])
+        return {
+            "header": (data.get("owner") or {}).get("login") or ref.split("/")[0],
+            "title": data.get("full_name") or ref,
+            "subtitle": data.get("description") or "",
+            "state": "private" if data.get("private") else "public",
+            "labels": [{"name": topic} for topic in (data.get("topics") or [])[:6]],
+            "author": None,
+            "stats": stats,
+        }
+
+    state = data.get("state") or "open"
+    if kind == "pr" and (data.get("merged") or data.get("merged_at")):
+        state = "merged"
+    elif kind == "pr" and data.get("draft") and state == "open":
+        state = "draft"
+    stats = [f"{data.get('comments', 0):,} comments"] if "comments" in data else []
+    if kind == "pr" and "additions" in data:
+        stats += [
+            f"+{data.get('additions', 0):,} -{data.get('deletions', 0):,}",
+            f"{data.get('changed_files', 0):,} files",
+        ]
+    repo = "/".join(ref.split("/")[:2])
+    return {
+        "header": f"{repo} #{data.get('number', '')}",
+        "title": data.get("title") or "",
+        "subtitle": "",
+        "state": state,
+        "labels": data.get("labels") or [],
+        "author": (data.get("user") or {}).get("login"),
+        "stats": stats,
+    }
+
+
+def render_card(
+    kind: str, ref: str, data: dict[str, Any], font_path: str | None = None
+) -> bytes:
+    """Draw a repository, issue or PR card and return it as PNG bytes.
+
+    Runs in a worker process; needs Pillow.
+    """
+    from PIL import Image, ImageDraw
+
+    fields = _card_fields(kind, ref, data)
+    image = Image.new("RGB", (CARD_WIDTH, CARD_HEIGHT), "#ffffff")
+    draw = ImageDraw.Draw(image)
+    state_color = STATE_COLORS.get(fields["state"], MUTED_COLOR)
+    draw.rectangle((0, 0, CARD_WIDTH, 12), fill=state_color)
+
+    header_font = _font(font_path, 30)
+    title_font = _font(font_path, 54)
+    body_font = _font(font_path, 30)
+    small_font = _font(font_path, 24)
+    text_width = CARD_WIDTH - 2 * MARGIN
+
+    y = MARGIN
+    draw.text((MARGIN, y), fields["header"], font=header_font, fill=MUTED_COLOR)
+    y += 56
+    for line in _wrap(draw, fields["title"], title_font, text_width, 3):
+        draw.text((MARGIN, y), line, font=title_font, fill=TEXT_COLOR)
+        y += 68
+    if fields["subtitle"]:
+        y += 8
+        for line in _wrap(draw, fields["subtitle"], body_font, text_width, 2):
+            draw.text((MARGIN, y), line, font=body_font, fill=MUTED_COLOR)
+            y += 40
+
+    # State pill followed by as many labels as fit on one row
+    y = max(y + 24, 380)
+    x = MARGIN
+    pills = [(fields["state"].capitalize(), state_color, "#ffffff")]
+    for label in fields["labels"]:
+        if isinstance(label, dict) and label.get("name"):
+            pills.append((label["name"], *_label_colors(label.get("color"))))
+    for text, fill, text_color in pills:
+        pill_width = int(draw.textlength(text, font=small_font)) + 32
+        if x + pill_width > CARD_WIDTH - MARGIN:
+            break
+        draw.rounded_rectangle((x, y, x + pill_width, y + 40), radius=20, fill=fill)
+        draw.text((x + 16, y + 6), text, font=small_font, fill=text_color)
+        x += pill_width + 12
+
+    footer = list(fields["stats"])
+    if fields["author"]:
+        footer.insert(0, f"by {fields['author']}")
+    draw.text(
+        (MARGIN, CARD_HEIGHT - MARGIN - 30),
+        "  ·  ".join(footer),
+        font=body_font,
+        fill=MUTED_COLOR,
+    )
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
@@ -0,0 +1,196 @@
+import asyncio
+import glob
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+import aiohttp
+
+from astrbot.api import logger
+
+from .card_drawing import render_card
+
+DEFAULT_WORKERS = 2
+# Rendered and downloaded cards kept on disk; older files are removed first
+MAX_CACHED_CARDS = 500
+# Skip OpenGraph for this long after GitHub had no card for a repository, e.g. a private one
+OPENGRAPH_FAILURE_TTL = 3600
+# OpenGraph images without an updated_at stamp, e.g. of repositories, are reused this long
+OPENGRAPH_CACHE_TTL = 600
+# Older versions of an item used this recently are kept; a caller may still be sending one
+PRUNE_GRACE = 120
+
+
+def _ref_hash(ref: str) -> str:
+    return hashlib.sha1(ref.lower().encode("utf-8")).hexdigest()[:16]
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        # Already removed, e.g. by another instance sharing the cache
+        pass
+
+
+def _mtime(path: str) -> float | None:
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+
+
+class CardRenderer:
+    """Repository/issue/PR card images, from GitHub OpenGraph or drawn locally.
+
+    Local cards are drawn from API data in a process pool so rendering
+    never blocks the event loop. Images are cached on disk per item and
+    ``updated_at``, so an unchanged item is never drawn or downloaded twice.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        font_path: str | None = None,
+        workers: int = DEFAULT_WORKERS,
+        opengraph_timeout: float = 5.0,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.font_path = font_path or None
+        self.workers = max(1, workers)
+        self.opengraph_timeout = opengraph_timeout
+        self._pool: ProcessPoolExecutor | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._pending: dict[str, asyncio.Future[str]] = {}
+        self._opengraph_failures: dict[str, float] = {}  # repo -> monotonic time
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers do not inherit the bot's threads or event loop
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _path(self, prefix: str, ref: str, stamp: str) -> str:
+        stamp_hash = hashlib.sha1(stamp.encode("utf-8")).hexdigest()[:10]
+        return os.path.join(self.cache_dir, f"{prefix}-{_ref_hash(ref)}-{stamp_hash}.png")
+
+    def _store(self, path: str, image: bytes) -> None:
+        """Write an image atomically and drop older versions of the same item.
+
+        Only the single producer of ``path`` calls this. Versions used in
+        the last PRUNE_GRACE seconds are kept, since a caller that got one
+        may still be sending it.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(image)
+        os.replace(tmp_path, path)
+
+        prune_before = time.time() - PRUNE_GRACE
+        prefix = os.path.basename(path).rsplit("-", 1)[0]
+        for old in glob.glob(os.path.join(self.cache_dir, f"{prefix}-*.png")):
+            mtime = _mtime(old)
+            if old != path and mtime is not None and mtime < prune_before:
+                _remove(old)
+
+        cached = glob.glob(os.path.join(self.cache_dir, "*.png"))
+        if len(cached) > MAX_CACHED_CARDS:
+            by_age = sorted(
+                (mtime, cached_path)
+                for cached_path in cached
+                if (mtime := _mtime(cached_path)) is not None
+            )
+            for _, old in by_age[: len(by_age) - MAX_CACHED_CARDS]:
+                _remove(old)
+
+    async def _cached(self, path: str, produce) -> str:
+        """Return ``path`` if cached, else produce it once even for concurrent callers.
+
+        Cache hits refresh the file's mtime, which marks it as in use for
+        pruning.
+        """
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+        pending = self._pending.get(path)
+        if pending is None:
+            pending = asyncio.ensure_future(produce())
+            self._pending[path] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(path, None))
+        return await asyncio.shield(pending)
+
+    async def render(self, kind: str, ref: str, data: dict[str, Any]) -> str:
+        """Return the path of a locally drawn card for ``kind`` repo, issue or pr."""
+        stamp = data.get("updated_at") or data.get("pushed_at") or ""
+        path = self._path(kind, ref, stamp)
+
+        async def produce() -> str:
+            loop = asyncio.get_running_loop()
+            try:
+                image = await loop.run_in_executor(
+                    self._get_pool(), render_card, kind, ref, data, self.font_path
+                )
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for the next card
+                self._pool = None
+                raise
+            self._store(path, image)
+            return path
+
+        return await self._cached(path, produce)
+
+    async def opengraph(self, url: str, ref: str, stamp: str | None = None) -> str | None:
+        """Download an OpenGraph card; None if it is slow, missing or recently failed.
+
+        Downloads are cached per ``stamp`` (the item's ``updated_at``).
+        Without one the image may change at any time, so it is reused for
+        OPENGRAPH_CACHE_TTL seconds and then downloaded again.
+        """
+        repo = "/".join(ref.lower().split("/")[:2])
+        failed_at = self._opengraph_failures.get(repo)
+        if failed_at is not None and time.monotonic() - failed_at < OPENGRAPH_FAILURE_TTL:
+            return None
+
+        async def produce() -> str:
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession()
+            async with self._session.get(
+                url, timeout=aiohttp.ClientTimeout(total=self.opengraph_timeout)
+            ) as resp:
+                content_type = resp.headers.get("Content-Type", "")
+                if resp.status != 200 or not content_type.startswith("image/"):
+                    raise ValueError(f"HTTP {resp.status} {content_type}")
+                image = await resp.read()
+            self._store(path, image)
+            return path
+
+        if not stamp:
+            stamp = f"ttl-{int(time.time() // OPENGRAPH_CACHE_TTL)}"
+        path = self._path("og", ref, stamp)
+        try:
+            return await self._cached(path, produce)
+        except ValueError as e:
+            # GitHub has no card for the item, typically because the repository is private
+            logger.info(f"{ref} 没有 OpenGraph 卡片 ({e})，改用本地渲染")
+            self._opengraph_failures[repo] = time.monotonic()
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            logger.info(f"获取 {ref} 的 OpenGraph 卡片失败 ({e!r})，改用本地渲染")
+            return None
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
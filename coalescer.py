@@ -0,0 +1,128 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from . import formatters
+from .send_window import WindowedSender
+
+# Updates listed in a merged message; the rest are only counted
+MAX_LISTED = 10
+# A window holding this many updates is sent without waiting for it to end
+FLUSH_THRESHOLD = 30
+
+
+def _subject_title(subject_key: str, number: Any) -> str:
+    return f"讨论 #{number}" if subject_key == "discussion" else f"#{number}"
+
+
+def coalesce_target(
+    event_type: str, action: str, payload: dict[str, Any]
+) -> tuple[str, str, str, bool] | None:
+    """Where a webhook delivery is held, or None to send it right away.
+
+    Returns ``(group, title, entity, lead)``. Deliveries sharing a group are
+    merged into one message titled ``title``; a delivery whose ``entity``
+    is already waiting replaces it. ``lead`` puts the update first in the
+    merged message, as the review does for its inline comments.
+    """
+    if event_type == "pull_request_review":
+        review = payload.get("review") or {}
+        number = (payload.get("pull_request") or {}).get("number", "?")
+        if "id" not in review:
+            return None
+        return f"review:{review['id']}", f"PR #{number} 审查", "review", True
+
+    if event_type == "pull_request_review_comment":
+        comment = payload.get("comment") or {}
+        number = (payload.get("pull_request") or {}).get("number", "?")
+        if "id" not in comment:
+            return None
+        review_id = comment.get("pull_request_review_id")
+        group = f"review:{review_id}" if review_id else f"issue:{number}"
+        return group, f"PR #{number} 审查", f"comment:{comment['id']}", False
+
+    if event_type in {"issue_comment", "discussion_comment"}:
+        comment = payload.get("comment") or {}
+        subject_key = "issue" if event_type == "issue_comment" else "discussion"
+        number = (payload.get(subject_key) or {}).get("number", "?")
+        if "id" not in comment:
+            return None
+        # Issues and PRs share one number space, discussions have their own
+        title = _subject_title(subject_key, number)
+        return f"{subject_key}:{number}", title, f"comment:{comment['id']}", False
+
+    if event_type == "discussion" and action == "edited":
+        # Issue and PR edits are not notified at all, discussion edits are
+        number = (payload.get("discussion") or {}).get("number", "?")
+        title = _subject_title("discussion", number)
+        return f"discussion:{number}", title, "edit", False
+
+    return None
+
+
+class CoalesceWindow:
+    """Held updates of one review, issue or discussion for one subscriber."""
+
+    __slots__ = ("repo", "title", "updates", "lead")
+
+    def __init__(self, repo: str, title: str) -> None:
+        self.repo = repo
+        self.title = title
+        # Entity -> latest message; a superseding update keeps its slot
+        self.updates: dict[str, str] = {}
+        self.lead: str | None = None
+
+    def add(self, entity: str, message: str, lead: bool) -> None:
+        self.updates[entity] = message
+        if lead:
+            self.lead = entity
+
+    def render(self) -> str:
+        messages = list(self.updates.values())
+        if len(messages) == 1:
+            return messages[0]
+        if self.lead is not None:
+            lead = self.updates[self.lead]
+            messages.remove(lead)
+            messages.insert(0, lead)
+        return formatters.format_webhook_coalesced(
+            self.repo,
+            self.title,
+            messages[:MAX_LISTED],
+            len(messages) - MAX_LISTED,
+        )
+
+
+class EventCoalescer:
+    """Merge bursts of webhook deliveries about the same entity.
+
+    The first held delivery for a (subscriber, repository, group) opens a
+    window of ``window`` seconds. Later deliveries in the same group are
+    added to it, replacing an earlier one for the same entity, and the
+    window is sent as one message when it ends.
+    """
+
+    def __init__(self, window: float, send: Callable[[str, str], Awaitable[None]]) -> None:
+        self._windows = WindowedSender(window, send, "合并通知")
+
+    def add(
+        self,
+        repo: str,
+        subscriber_ids: list[str],
+        group: str,
+        title: str,
+        entity: str,
+        message: str,
+        *,
+        lead: bool = False,
+    ) -> None:
+        """Hold a delivery for its recipients instead of sending it now."""
+        for subscriber_id in subscriber_ids:
+            key = (subscriber_id, repo.lower(), group)
+            window = self._windows.open(key, lambda: CoalesceWindow(repo, title))
+            window.add(entity, message, lead)
+            if len(window.updates) >= FLUSH_THRESHOLD:
+                self._windows.flush(key)
+
+    async def close(self) -> None:
+        """Flush every open window and wait for the messages to be sent."""
+        await self._windows.close()
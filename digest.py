@@ -0,0 +1,175 @@
+from collections import Counter
+from typing import Any
+
+DIGEST_PERIODS = ("daily", "weekly")
+PERIOD_LABELS = {"daily": "每日", "weekly": "每周"}
+
+# Event types whose actors do not count as contributors
+PASSIVE_EVENT_TYPES = {"star", "fork"}
+
+
+class RepoAggregate:
+    """Running activity counters of one repository for one digest period."""
+
+    __slots__ = (
+        "opened_issues",
+        "closed_issues",
+        "opened_prs",
+        "merged_prs",
+        "releases",
+        "commits",
+        "star_delta",
+        "contributors",
+    )
+
+    def __init__(self) -> None:
+        self.opened_issues = 0
+        self.closed_issues = 0
+        self.opened_prs = 0
+        self.merged_prs = 0
+        self.releases = 0
+        self.commits = 0
+        self.star_delta = 0
+        self.contributors: Counter[str] = Counter()
+
+    def update(self, record: dict[str, Any]) -> None:
+        """Fold one event log record into the counters."""
+        event_type = record.get("type")
+        action = record.get("action")
+        if event_type == "issues":
+            if action == "opened":
+                self.opened_issues += 1
+            elif action == "closed":
+                self.closed_issues += 1
+        elif event_type == "pull_request":
+            if action == "opened":
+                self.opened_prs += 1
+            elif action == "merged":
+                self.merged_prs += 1
+        elif event_type == "release":
+            if action in ("published", "released"):
+                self.releases += 1
+        elif event_type == "push":
+            self.commits += record.get("count", 1)
+        elif event_type == "star":
+            if action == "created":
+                self.star_delta += 1
+            elif action == "deleted":
+                self.star_delta -= 1
+
+        actor = record.get("actor")
+        if actor and event_type not in PASSIVE_EVENT_TYPES:
+            self.contributors[actor] += 1
+
+    def is_empty(self) -> bool:
+        return not (
+            self.opened_issues
+            or self.closed_issues
+            or self.opened_prs
+            or self.merged_prs
+            or self.releases
+            or self.commits
+            or self.star_delta
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["contributors"] = dict(self.contributors)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RepoAggregate":
+        aggregate = cls()
+        for name in cls.__slots__:
+            if name == "contributors":
+                aggregate.contributors = Counter(data.get(name) or {})
+            elif name in data:
+                setattr(aggregate, name, int(data[name]))
+        return aggregate
+
+
+class DigestAggregator:
+    """Per-period, per-repo aggregates updated incrementally as events are processed.
+
+    Building a digest reads the counters directly, so its cost grows with
+    the number of repositories rather than the number of events.
+    """
+
+    def __init__(self) -> None:
+        self.periods: dict[str, dict[str, RepoAggregate]] = {
+            period: {} for period in DIGEST_PERIODS
+        }
+
+    def add(self, record: dict[str, Any]) -> None:
+        repo = (record.get("repo") or "").lower()
+        if not repo:
+            return
+        for aggregates in self.periods.values():
+            aggregate = aggregates.get(repo)
+            if aggregate is None:
+                aggregate = aggregates[repo] = RepoAggregate()
+            aggregate.update(record)
+
+    def take(self, period: str) -> dict[str, RepoAggregate]:
+        """Return the aggregates of ``period`` and start a new period."""
+        aggregates = self.periods[period]
+        self.periods[period] = {}
+        return aggregates
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            period: {repo: agg.to_dict() for repo, agg in aggregates.items()}
+            for period, aggregates in self.periods.items()
+        }
+
+    def load(self, data: dict[str, Any]) -> None:
+        for period in DIGEST_PERIODS:
+            self.periods[period] = {
+                repo: RepoAggregate.from_dict(agg)
+                for repo, agg in (data.get(period) or {}).items()
+            }
+
+
+def format_digest(
+    period: str,
+    repos: list[str],
+    aggregates: dict[str, RepoAggregate],
+    title_suffix: str = "",
+    note: str = "",
+) -> str:
+    """Render a digest for ``repos`` from the given period's aggregates.
+
+    ``note`` is appended as a final line, e.g. to say which counts the
+    current update source cannot provide.
+    """
+    lines = [f"📰 GitHub {PERIOD_LABELS.get(period, '')}摘要{title_suffix}"]
+    for repo in sorted(repos, key=str.lower):
+        aggregate = aggregates.get(repo.lower())
+        if aggregate is None or aggregate.is_empty():
+            continue
+        lines.append(f"\n■ {repo}")
+        if aggregate.opened_issues or aggregate.closed_issues:
+            lines.append(
+                f"  Issue: 新建 {aggregate.opened_issues} / 关闭 {aggregate.closed_issues}"
+            )
+        if aggregate.opened_prs or aggregate.merged_prs:
+            lines.append(
+                f"  PR: 新建 {aggregate.opened_prs} / 合并 {aggregate.merged_prs}"
+            )
+        if aggregate.commits:
+            lines.append(f"  提交: {aggregate.commits}")
+        if aggregate.releases:
+            lines.append(f"  Release: {aggregate.releases}")
+        if aggregate.star_delta:
+            lines.append(f"  Star: {aggregate.star_delta:+d}")
+        top = aggregate.contributors.most_common(3)
+        if top:
+            lines.append(
+                "  活跃贡献者: " + ", ".join(f"{name}({count})" for name, count in top)
+            )
+
+    if len(lines) == 1:
+        lines.append("订阅的仓库在该周期内没有新动态")
+    if note:
+        lines.append(f"\n{note}")
+    return "\n".join(lines)
@@ -0,0 +1,279 @@
+import json
+import mmap
+import os
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from astrbot.api import logger
+
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+
+
+def summarize_webhook_event(event_type: str, payload: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a webhook payload to a compact event log record."""
+    repo = (payload.get("repository") or {}).get("full_name", "")
+    action = payload.get("action") or ""
+    actor = (payload.get("sender") or {}).get("login") or ""
+    number = None
+    title = ""
+    url = ""
+
+    subject = (
+        payload.get("pull_request")
+        or payload.get("issue")
+        or payload.get("discussion")
+    )
+    if isinstance(subject, dict):
+        number = subject.get("number")
+        title = subject.get("title") or ""
+        url = subject.get("html_url") or ""
+        if event_type == "pull_request" and action == "closed" and subject.get("merged"):
+            action = "merged"
+
+    for key in ("comment", "review", "thread"):
+        child = payload.get(key)
+        if isinstance(child, dict) and child.get("html_url"):
+            url = child["html_url"]
+            break
+
+    count = None
+    if event_type == "push":
+        commits = payload.get("commits") or []
+        ref = payload.get("ref") or ""
+        action = action or "pushed"
+        count = len(commits)
+        title = f"{len(commits)} 个提交 → {ref.removeprefix('refs/heads/')}"
+        url = payload.get("compare") or ""
+    elif event_type == "release":
+        release = payload.get("release") or {}
+        title = release.get("name") or release.get("tag_name") or ""
+        url = release.get("html_url") or ""
+    elif event_type == "fork":
+        forkee = payload.get("forkee") or {}
+        title = forkee.get("full_name") or ""
+        url = forkee.get("html_url") or ""
+    elif event_type == "create":
+        title = f"{payload.get('ref_type', '')} {payload.get('ref') or ''}".strip()
+    elif event_type == "commit_comment":
+        title = ((payload.get("comment") or {}).get("commit_id") or "")[:7]
+
+    record = {
+        "ts": time.time(),
+        "repo": repo,
+        "type": event_type,
+        "action": action,
+        "number": number,
+        "title": title,
+        "actor": actor,
+        "url": url,
+    }
+    if count is not None:
+        record["count"] = count
+    return record
+
+
+def summarize_poll_item(repo: str, item: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a polled issue/PR/commit/release item to an event log record."""
+    kind = item.get("_astrbot_type")
+    if kind == "commit":
+        commit = item.get("commit") or {}
+        branch = item.get("_astrbot_branch")
+        return {
+            "ts": time.time(),
+            "repo": repo,
+            "type": "push",
+            "action": "pushed",
+            "number": None,
+            "title": (commit.get("message") or "").split("\n")[0]
+            + (f" ({branch})" if branch else ""),
+            "actor": (commit.get("author") or {}).get("name") or "",
+            "url": item.get("html_url") or "",
+        }
+    if kind == "release":
+        return {
+            "ts": time.time(),
+            "repo": repo,
+            "type": "release",
+            "action": "published",
+            "number": None,
+            "title": item.get("name") or item.get("tag_name") or "",
+            "actor": (item.get("author") or {}).get("login") or "",
+            "url": item.get("html_url") or "",
+        }
+    return {
+        "ts": time.time(),
+        "repo": repo,
+        "type": "pull_request" if "pull_request" in item else "issues",
+        "action": "opened",
+        "number": item.get("number"),
+        "title": item.get("title") or "",
+        "actor": (item.get("user") or {}).get("login") or "",
+        "url": item.get("html_url") or "",
+    }
+
+
+class _Segment:
+    """One day of records plus a per-repo index of line offsets."""
+
+    __slots__ = ("path", "size", "offsets")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.size = 0
+        self.offsets: dict[str, array] = {}
+
+    @property
+    def index_path(self) -> str:
+        return self.path[: -len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+    def add(self, repo_key: str, offset: int) -> None:
+        offsets = self.offsets.get(repo_key)
+        if offsets is None:
+            offsets = self.offsets[repo_key] = array("Q")
+        offsets.append(offset)
+
+    def load_index(self) -> None:
+        """Load the sidecar index, rebuilding it when it is missing or stale."""
+        self.size = os.path.getsize(self.path)
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("size") == self.size:
+                self.offsets = {
+                    repo: array("Q", offsets) for repo, offsets in data["repos"].items()
+                }
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+
+        self.offsets = {}
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    repo = json.loads(line).get("repo", "")
+                except ValueError:
+                    repo = ""
+                if repo:
+                    self.add(repo.lower(), offset)
+                offset += len(line)
+        self.save_index()
+
+    def save_index(self) -> None:
+        data = {
+            "size": self.size,
+            "repos": {repo: offsets.tolist() for repo, offsets in self.offsets.items()},
+        }
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+
+class EventLog:
+    """Append-only log of processed events, segmented by UTC day.
+
+    Each segment keeps an in-memory per-repo index of line offsets (saved
+    next to the segment), so a history query only touches the days in range
+    and reads the matching lines through a memory map. Segments older than
+    the retention period are deleted by ``compact``.
+    """
+
+    def __init__(self, directory: str, retention_days: int = 7) -> None:
+        self.directory = directory
+        self.retention_days = max(1, int(retention_days))
+        self._segments: dict[str, _Segment] = {}
+        self._current_day: str | None = None
+        self._handle = None
+        os.makedirs(directory, exist_ok=True)
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            segment = _Segment(os.path.join(directory, name))
+            try:
+                segment.load_index()
+            except OSError as e:
+                logger.error(f"加载事件日志分段 {name} 失败: {e}")
+                continue
+            self._segments[name[: -len(SEGMENT_SUFFIX)]] = segment
+        self.compact()
+
+    @staticmethod
+    def _day(ts: float) -> str:
+        return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%d")
+
+    def _segment_for(self, day: str) -> _Segment:
+        if day != self._current_day:
+            self._close_current()
+            # A new day started; drop segments that aged out before opening it
+            self.compact()
+            segment = self._segments.get(day)
+            if segment is None:
+                segment = _Segment(os.path.join(self.directory, day + SEGMENT_SUFFIX))
+                self._segments[day] = segment
+            self._handle = open(segment.path, "ab")
+            segment.size = self._handle.tell()
+            self._current_day = day
+        return self._segments[day]
+
+    def _close_current(self) -> None:
+        if self._handle:
+            self._handle.close()
+            self._handle = None
+            segment = self._segments.get(self._current_day or "")
+            if segment:
+                segment.save_index()
+        self._current_day = None
+
+    def append(self, record: dict[str, Any]) -> None:
+        repo = record.get("repo")
+        if not repo:
+            return
+        segment = self._segment_for(self._day(record["ts"]))
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._handle.write(line + b"\n")
+        self._handle.flush()
+        segment.add(repo.lower(), segment.size)
+        segment.size += len(line) + 1
+
+    def query(
+        self, repo: str, since: float, limit: int = 50
+    ) -> list[dict[str, Any]]:
+        """Return up to ``limit`` most recent records of ``repo`` since ``since``, oldest first."""
+        repo_key = repo.lower()
+        first_day = self._day(since)
+        records: list[dict[str, Any]] = []
+        for day in sorted(d for d in self._segments if d >= first_day):
+            segment = self._segments[day]
+            offsets = segment.offsets.get(repo_key)
+            if not offsets or not segment.size:
+                continue
+            with open(segment.path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in offsets:
+                        end = mapped.find(b"\n", offset)
+                        try:
+                            record = json.loads(mapped[offset : end if end != -1 else None])
+                        except ValueError:
+                            continue
+                        if record.get("ts", 0) >= since:
+                            records.append(record)
+        return records[-limit:]
+
+    def compact(self) -> None:
+        """Delete segments that fall outside the retention period."""
+        cutoff = (
+            datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        ).strftime("%Y%m%d")
+        for day in [d for d in self._segments if d < cutoff]:
+            segment = self._segments.pop(day)
+            for path in (segment.path, segment.index_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            logger.info(f"已清理过期的事件日志分段 {day}")
+
+    def close(self) -> None:
+        self._close_current()
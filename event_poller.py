@@ -0,0 +1,253 @@
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from astrbot.api import logger
+
+if TYPE_CHECKING:
+    from .github_client import GitHubClient
+
+GITHUB_REPO_EVENTS_API_URL = "https://api.github.com/repos/{repo}/events"
+GITHUB_ORG_EVENTS_API_URL = "https://api.github.com/orgs/{org}/events"
+
+# GitHub asks clients to poll the events API at most this often by default
+DEFAULT_POLL_INTERVAL = 60
+
+# Events API type -> webhook event type understood by handle_webhook_event
+EVENT_TYPE_TO_WEBHOOK = {
+    "IssuesEvent": "issues",
+    "PullRequestEvent": "pull_request",
+    "PushEvent": "push",
+    "ReleaseEvent": "release",
+    "IssueCommentEvent": "issue_comment",
+    "CommitCommentEvent": "commit_comment",
+    "PullRequestReviewEvent": "pull_request_review",
+    "PullRequestReviewCommentEvent": "pull_request_review_comment",
+    "PullRequestReviewThreadEvent": "pull_request_review_thread",
+    "DiscussionEvent": "discussion",
+    "ForkEvent": "fork",
+    "WatchEvent": "star",
+    "CreateEvent": "create",
+}
+
+# Actions that are named differently in the events API and in webhooks
+ACTION_ALIASES = {
+    "star": {"started": "created"},
+    "pull_request_review": {"created": "submitted"},
+}
+
+
+def event_to_webhook(event: dict[str, Any]) -> tuple[str, dict[str, Any]] | None:
+    """Convert an events API entry into a (webhook_event_type, payload) pair."""
+    event_type = EVENT_TYPE_TO_WEBHOOK.get(event.get("type", ""))
+    if not event_type:
+        return None
+
+    repo_name = (event.get("repo") or {}).get("name")
+    if not repo_name:
+        return None
+
+    payload = dict(event.get("payload") or {})
+    payload["repository"] = {"full_name": repo_name}
+    payload["sender"] = {"login": (event.get("actor") or {}).get("login")}
+
+    action = payload.get("action")
+    if action:
+        payload["action"] = ACTION_ALIASES.get(event_type, {}).get(action, action)
+
+    if event_type == "push":
+        # Push events list commits with "sha" where webhooks use "id"
+        payload["commits"] = [
+            {**commit, "id": commit.get("sha", "")}
+            for commit in payload.get("commits") or []
+        ]
+        before, head = payload.get("before"), payload.get("head")
+        if before and head:
+            payload["compare"] = (
+                f"https://github.com/{repo_name}/compare/{before[:12]}...{head[:12]}"
+            )
+        payload.setdefault("after", head)
+
+    return event_type, payload
+
+
+def _event_timestamp(event: dict[str, Any]) -> float:
+    created_at = event.get("created_at") or ""
+    try:
+        return datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class RepoEventState:
+    __slots__ = ("etag", "last_event_id", "next_poll_at", "delivered_until")
+
+    def __init__(self) -> None:
+        self.etag: str | None = None
+        self.last_event_id: int | None = None
+        self.next_poll_at = 0.0
+        # Events created up to this time (epoch) already arrived as webhooks
+        self.delivered_until: float | None = None
+
+
+class RepoEventPoller:
+    """Poll ``/repos/{repo}/events`` or ``/orgs/{org}/events`` with conditional requests.
+
+    Each feed keeps its ETag, the newest event ID already handled and the
+    earliest time GitHub allows the next poll (``X-Poll-Interval``).
+    Unchanged feeds answer with 304, which does not count against the
+    rate limit. Organization feeds are tracked under ``"org/*"``.
+    """
+
+    def __init__(self) -> None:
+        self._states: dict[str, RepoEventState] = {}
+
+    def is_tracking(self, repo: str) -> bool:
+        return repo in self._states
+
+    def forget(self, repo: str) -> None:
+        self._states.pop(repo, None)
+
+    def feeds(self, repo: str) -> list[str]:
+        """Return the tracked feed keys of a repository, including ``repo:...`` keys."""
+        prefix = f"{repo}:"
+        return [key for key in self._states if key == repo or key.startswith(prefix)]
+
+    def export_state(self, repo: str) -> dict[str, Any] | None:
+        """Return the cursor of a feed as JSON-safe data, None if untracked."""
+        state = self._states.get(repo)
+        if state is None:
+            return None
+        return {
+            "etag": state.etag,
+            "last_event_id": state.last_event_id,
+            "delivered_until": state.delivered_until,
+        }
+
+    def restore_state(self, repo: str, data: dict[str, Any]) -> None:
+        """Replace the cursor of a feed with one saved by ``export_state``."""
+        state = self._states[repo] = RepoEventState()
+        state.etag = data.get("etag")
+        state.last_event_id = data.get("last_event_id")
+        state.delivered_until = data.get("delivered_until")
+
+    def mark_delivered(self, repo: str, until: float) -> None:
+        """Record that webhooks delivered the feed's events up to ``until`` (epoch).
+
+        The cursor is kept: once webhooks stop, the next poll skips events
+        created before ``until`` and delivers the rest, so nothing from the
+        gap is lost. A feed without a cursor yet starts from ``until``
+        instead of silently initializing.
+        """
+        state = self._states.setdefault(repo, RepoEventState())
+        if state.delivered_until is None or until > state.delivered_until:
+            state.delivered_until = until
+
+    async def poll(
+        self,
+        client: "GitHubClient",
+        repo: str,
+        headers: dict[str, str],
+        *,
+        key: str | None = None,
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Return new events for ``repo`` as webhook-style pairs, oldest first.
+
+        The first poll of a repository only records the newest event ID so
+        that history is not replayed as notifications. ``key`` keeps a
+        separate cursor for the same repository, e.g. for ``owner/*``
+        subscriptions of a user account.
+        """
+        events = await self._poll(
+            client, key or repo, GITHUB_REPO_EVENTS_API_URL.format(repo=repo), headers
+        )
+        return events or []
+
+    async def poll_org(
+        self,
+        client: "GitHubClient",
+        org: str,
+        headers: dict[str, str],
+    ) -> list[tuple[str, dict[str, Any]]] | None:
+        """Return new events of every repository of an organization.
+
+        Returns None if ``org`` is not an organization (GitHub answers 404),
+        so callers can fall back to polling the owner's repositories.
+        """
+        return await self._poll(
+            client, f"{org}/*", GITHUB_ORG_EVENTS_API_URL.format(org=org), headers
+        )
+
+    async def _poll(
+        self,
+        client: "GitHubClient",
+        repo: str,
+        url: str,
+        headers: dict[str, str],
+    ) -> list[tuple[str, dict[str, Any]]] | None:
+        state = self._states.setdefault(repo, RepoEventState())
+        now = time.monotonic()
+        if now < state.next_poll_at:
+            logger.debug(f"仓库 {repo} 未到 X-Poll-Interval 允许的轮询时间，跳过")
+            return []
+
+        request_headers = dict(headers)
+        if state.etag:
+            request_headers["If-None-Match"] = state.etag
+
+        resp = await client.get(
+            url,
+            params={"per_page": 100},
+            headers=request_headers,
+        )
+        try:
+            interval = int(resp.headers.get("X-Poll-Interval", DEFAULT_POLL_INTERVAL))
+        except ValueError:
+            interval = DEFAULT_POLL_INTERVAL
+        state.next_poll_at = now + interval
+
+        if resp.status == 304:
+            logger.debug(f"仓库 {repo} 的事件没有变化 (304)")
+            return []
+        if resp.status == 404:
+            logger.debug(f"{url} 不存在 (404)")
+            self._states.pop(repo, None)
+            return None
+        if resp.status != 200:
+            logger.error(f"获取仓库 {repo} 的事件失败: {resp.status}: {resp.text()[:100]}")
+            return []
+
+        state.etag = resp.headers.get("ETag")
+        events = resp.json()
+
+        if not isinstance(events, list):
+            return []
+
+        newest_id = max((int(e["id"]) for e in events if e.get("id")), default=None)
+        if state.last_event_id is None and state.delivered_until is None:
+            state.last_event_id = newest_id or 0
+            logger.info(f"初始化仓库 {repo} 的事件游标: {state.last_event_id}")
+            return []
+
+        last_event_id = state.last_event_id or 0
+        results = []
+        for event in reversed(events):
+            event_id = int(event.get("id") or 0)
+            if event_id <= last_event_id:
+                continue
+            if (
+                state.delivered_until is not None
+                and _event_timestamp(event) <= state.delivered_until
+            ):
+                continue
+            converted = event_to_webhook(event)
+            if converted:
+                results.append(converted)
+            else:
+                logger.debug(f"暂不处理的 GitHub 事件类型: {event.get('type')}")
+
+        if newest_id is not None:
+            state.last_event_id = max(last_event_id, newest_id)
+        if results:
+            logger.info(f"找到 {len(results)} 个新的事件在 {repo}")
+        return results
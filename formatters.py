@@ -398,6 +398,51 @@ def format_webhook_star_message(
     return "\n".join(message_lines)
 
 
+def format_webhook_storm_summary(
+    repo: str,
+    minutes: int,
+    stars: int,
+    unstars: int,
+    forks: int,
+    actors: list[str],
+    actor_count: int,
+) -> str:
+    counts = []
+    if stars:
+        counts.append(f"+{stars} Star")
+    if forks:
+        counts.append(f"+{forks} Fork")
+    if unstars:
+        counts.append(f"{unstars} 人取消 Star")
+
+    message_lines = [
+        f"[GitHub Webhook] 仓库 {repo} 最近 {minutes} 分钟: {'，'.join(counts)}",
+    ]
+    if actors:
+        others = f" 等 {actor_count} 人" if actor_count > len(actors) else ""
+        message_lines.append(f"触发人: {', '.join(actors)}{others}")
+
+    return "\n".join(message_lines)
+
+
+def format_webhook_coalesced(
+    repo: str,
+    title: str,
+    messages: list[str],
+    hidden: int,
+) -> str:
+    count = len(messages) + max(0, hidden)
+    message_lines = [f"[GitHub Webhook] 仓库 {repo} {title} 的 {count} 条更新"]
+    for message in messages:
+        message_lines.append("—" * 10)
+        message_lines.append(message)
+    if hidden > 0:
+        message_lines.append("—" * 10)
+        message_lines.append(f"……另有 {hidden} 条更新未列出")
+
+    return "\n".join(message_lines)
+
+
 def format_webhook_create_message(
     repo: str,
     payload: dict[str, Any],
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import aiohttp
+
+from astrbot.api import logger
+
+GITHUB_REPO_INSTALLATION_URL = "https://api.github.com/repos/{repo}/installation"
+# Used for owner-wide ("owner/*") subscriptions, which name no repository
+GITHUB_USER_INSTALLATION_URL = "https://api.github.com/users/{owner}/installation"
+GITHUB_INSTALLATION_TOKEN_URL = (
+    "https://api.github.com/app/installations/{installation_id}/access_tokens"
+)
+
+# GitHub rejects app JWTs that live longer than 10 minutes
+APP_JWT_LIFETIME = 9 * 60
+# Refresh installation tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 120
+# How long to remember that an owner has no installation of the app
+MISSING_INSTALLATION_TTL = 10 * 60
+
+
+class GitHubAppAuth:
+    """Authenticate as a GitHub App and hand out cached installation tokens.
+
+    Installations are looked up per repository owner and their access tokens
+    are cached until shortly before GitHub expires them.
+    """
+
+    def __init__(self, app_id: str | int, private_key: str) -> None:
+        self.app_id = str(app_id).strip()
+        self.private_key = self._load_private_key(private_key)
+        self._jwt: str | None = None
+        self._jwt_expires_at = 0.0
+        self._installations: dict[str, int] = {}
+        self._missing_owners: dict[str, float] = {}
+        self._tokens: dict[int, tuple[str, float]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def _load_private_key(value: str) -> str:
+        """Accept either PEM content or a path to a PEM file."""
+        value = (value or "").strip()
+        if value and "-----BEGIN" not in value and os.path.isfile(value):
+            with open(value, encoding="utf-8") as f:
+                return f.read()
+        # Config UIs often store multi-line secrets with escaped newlines
+        return value.replace("\\n", "\n")
+
+    def _app_jwt(self) -> str:
+        """Return a signed app JWT, reusing the previous one while it is valid."""
+        now = time.time()
+        if self._jwt and now < self._jwt_expires_at - 60:
+            return self._jwt
+
+        import jwt  # PyJWT, only required when GitHub App auth is configured
+
+        issued_at = int(now) - 60  # allow for clock drift
+        expires_at = issued_at + APP_JWT_LIFETIME
+        token = jwt.encode(
+            {"iat": issued_at, "exp": expires_at, "iss": self.app_id},
+            self.private_key,
+            algorithm="RS256",
+        )
+        self._jwt = token if isinstance(token, str) else token.decode("utf-8")
+        self._jwt_expires_at = float(expires_at)
+        return self._jwt
+
+    def _app_headers(self) -> dict[str, str]:
+        return {
+            "Accept": "application/vnd.github.v3+json",
+            "Authorization": f"Bearer {self._app_jwt()}",
+        }
+
+    async def get_installation_token(self, repo: str) -> str | None:
+        """Return an installation token for the owner of ``repo``.
+
+        Returns None when the app is not installed for that owner or the
+        token exchange fails, so callers can fall back to other credentials.
+        """
+        owner = repo.split("/", 1)[0].lower()
+        lock = self._locks.setdefault(owner, asyncio.Lock())
+        async with lock:
+            installation_id = self._installations.get(owner)
+            if installation_id is None:
+                installation_id = await self._lookup_installation(owner, repo)
+                if installation_id is None:
+                    return None
+
+            cached = self._tokens.get(installation_id)
+            if cached and time.time() < cached[1] - TOKEN_REFRESH_MARGIN:
+                return cached[0]
+
+            return await self._create_installation_token(owner, installation_id)
+
+    async def _lookup_installation(self, owner: str, repo: str) -> int | None:
+        missing_since = self._missing_owners.get(owner)
+        if missing_since and time.time() - missing_since < MISSING_INSTALLATION_TTL:
+            return None
+
+        if repo.endswith("/*"):
+            url = GITHUB_USER_INSTALLATION_URL.format(owner=owner)
+        else:
+            url = GITHUB_REPO_INSTALLATION_URL.format(repo=repo)
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(
+                    url,
+                    headers=self._app_headers(),
+                ) as resp:
+                    if resp.status != 200:
+                        text = await resp.text()
+                        logger.warning(
+                            f"GitHub App 未安装到 {owner} 或无法访问 {repo}: {resp.status}: {text[:100]}"
+                        )
+                        self._missing_owners[owner] = time.time()
+                        return None
+                    data = await resp.json()
+        except Exception as e:
+            logger.error(f"查询 GitHub App 安装信息失败: {e}")
+            return None
+
+        installation_id = int(data["id"])
+        self._installations[owner] = installation_id
+        self._missing_owners.pop(owner, None)
+        logger.info(f"GitHub App 在 {owner} 的安装 ID: {installation_id}")
+        return installation_id
+
+    async def _create_installation_token(
+        self, owner: str, installation_id: int
+    ) -> str | None:
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    GITHUB_INSTALLATION_TOKEN_URL.format(
+                        installation_id=installation_id
+                    ),
+                    headers=self._app_headers(),
+                ) as resp:
+                    if resp.status == 404:
+                        # The installation was removed; look it up again next time
+                        self._installations.pop(owner, None)
+                    if resp.status != 201:
+                        text = await resp.text()
+                        logger.error(
+                            f"获取 GitHub App 安装令牌失败: {resp.status}: {text[:100]}"
+                        )
+                        return None
+                    data = await resp.json()
+        except Exception as e:
+            logger.error(f"获取 GitHub App 安装令牌时出错: {e}")
+            return None
+
+        token = data["token"]
+        expires_at = datetime.fromisoformat(
+            data["expires_at"].replace("Z", "+00:00")
+        ).timestamp()
+        self._tokens[installation_id] = (token, expires_at)
+        logger.debug(f"已刷新 {owner} 的 GitHub App 安装令牌")
+        return token
@@ -0,0 +1,315 @@
+import asyncio
+import json
+import random
+import re
+import time
+from collections.abc import Mapping
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from astrbot.api import logger
+
+# Statuses worth retrying: server errors and explicit throttling
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Path segments that vary per call and would split one endpoint into many
+_VARIABLE_SEGMENT = re.compile(r"^(?:\d+|[0-9a-f]{7,40}(?:\.\.\.[0-9a-f]{7,40})?)$")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while an endpoint's circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float) -> None:
+        super().__init__(f"GitHub 接口 {endpoint} 暂时熔断，{retry_in:.0f} 秒后重试")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class GitHubResponse:
+    """A fully read GitHub API response."""
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Mapping[str, str], body: bytes) -> None:
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one endpoint.
+
+    After ``threshold`` failures in a row the circuit opens and requests
+    fail fast for ``reset_timeout`` seconds. The first request after that
+    is let through as a probe: success closes the circuit, failure opens
+    it again.
+    """
+
+    __slots__ = ("threshold", "reset_timeout", "failures", "opened_at", "probing")
+
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.probing else "open"
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.retry_in() > 0:
+            return False
+        # Restart the timer so a probe that never reports back only blocks one period
+        self.opened_at = time.monotonic()
+        self.probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; return True if this opened the circuit."""
+        self.failures += 1
+        if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+            self.opened_at = time.monotonic()
+            self.probing = False
+            return True
+        return False
+
+
+def endpoint_of(method: str, url: str) -> str:
+    """Collapse a URL into its endpoint, e.g. ``GET /repos/*/*/issues``.
+
+    Owner and repository names as well as numbers and SHAs are replaced so
+    that a failing API route trips one breaker for all repositories.
+    """
+    parts = urlsplit(url).path.strip("/").split("/")
+    if len(parts) >= 3 and parts[0] == "repos":
+        parts[1] = parts[2] = "*"
+    elif len(parts) >= 2 and parts[0] in ("orgs", "users"):
+        parts[1] = "*"
+    parts = ["*" if _VARIABLE_SEGMENT.match(p) else p for p in parts]
+    if len(parts) >= 5 and parts[3] in ("commits", "compare", "git"):
+        # Refs may be branch names or contain slashes
+        parts = parts[:4] + ["*"]
+    return f"{method.upper()} /{'/'.join(parts)}"
+
+
+class GitHubClient:
+    """Shared HTTP client for the GitHub API.
+
+    Transient failures (connection errors, timeouts, 5xx, 429 and secondary
+    rate limits) are retried with full-jitter exponential backoff, honoring
+    ``Retry-After`` and ``X-RateLimit-Reset``. Waits longer than
+    ``max_wait`` are not slept; the throttled response is returned to the
+    caller instead. Each endpoint has its own circuit breaker so that an
+    outage of one API route sheds its load without affecting the others.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        max_wait: float = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        timeout: float = 30.0,
+    ) -> None:
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.max_wait = max_wait
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: aiohttp.ClientSession | None = None
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._inflight: dict[tuple[Any, ...], asyncio.Future[GitHubResponse]] = {}
+        # "coalesced" counts requests saved by sharing an identical in-flight GET
+        self.stats = {"requests": 0, "retries": 0, "short_circuited": 0, "coalesced": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        return self._session
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout
+            )
+        return breaker
+
+    def open_circuits(self) -> dict[str, float]:
+        """Return endpoints whose circuit is open, with seconds until the next probe."""
+        return {
+            endpoint: breaker.retry_in()
+            for endpoint, breaker in self._breakers.items()
+            if breaker.opened_at is not None
+        }
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_wait, self.backoff_base * 2**attempt))
+
+    def _throttle_wait(self, response: GitHubResponse) -> float | None:
+        """Return how long GitHub asks us to wait, or None if it is not throttling."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                reset = float(response.headers.get("X-RateLimit-Reset", ""))
+            except ValueError:
+                return None
+            return max(0.0, reset - time.time()) + 1
+        return None
+
+    async def get(self, url: str, **kwargs: Any) -> GitHubResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        json_body: Any = None,
+    ) -> GitHubResponse:
+        """Send a request, sharing one in-flight GET among identical callers.
+
+        Concurrent GETs with the same URL, params and headers await the
+        same underlying request. Headers are part of the key because the
+        token, media type and ETag all change what GitHub returns.
+        Responses are immutable bytes, so ``json()`` still gives every
+        caller its own objects.
+        """
+        if method.upper() != "GET":
+            return await self._request(method, url, params, headers, json_body)
+
+        key = (
+            url,
+            tuple(sorted((k, str(v)) for k, v in (params or {}).items())),
+            tuple(sorted((headers or {}).items())),
+        )
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(method, url, params, headers, None))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish_inflight(key, t))
+        else:
+            self.stats["coalesced"] += 1
+        # Shield so one caller's cancellation does not cancel the others' request
+        return await asyncio.shield(task)
+
+    def _finish_inflight(self, key: tuple[Any, ...], task: asyncio.Future[Any]) -> None:
+        self._inflight.pop(key, None)
+        # Mark the outcome as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+        json_body: Any,
+    ) -> GitHubResponse:
+        endpoint = endpoint_of(method, url)
+        breaker = self._breaker(endpoint)
+        attempt = 0
+        response: GitHubResponse | None = None
+        error: Exception | None = None
+        while True:
+            if not breaker.allow():
+                # The circuit opened while retrying; report the last failure
+                if error is not None:
+                    raise error
+                if response is not None:
+                    return response
+                self.stats["short_circuited"] += 1
+                raise CircuitOpenError(endpoint, breaker.retry_in())
+
+            self.stats["requests"] += 1
+            delay: float | None
+            try:
+                async with self._get_session().request(
+                    method, url, params=params, headers=headers, json=json_body
+                ) as resp:
+                    response = GitHubResponse(
+                        # Keep the case-insensitive multidict; header case varies by server
+                        resp.status, resp.headers.copy(), await resp.read()
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                self._record_failure(breaker, endpoint)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug(f"请求 {endpoint} 出错 ({e!r})，{delay:.1f} 秒后重试")
+            else:
+                error = None
+                throttle = None
+                if response.status in RETRY_STATUSES or response.status == 403:
+                    throttle = self._throttle_wait(response)
+                if response.status >= 500:
+                    self._record_failure(breaker, endpoint)
+                elif response.status == 403 and throttle is None:
+                    # Plain permission errors are final and say nothing about availability
+                    breaker.record_success()
+                    return response
+                elif response.status not in RETRY_STATUSES and response.status != 403:
+                    breaker.record_success()
+                    return response
+
+                if attempt >= self.max_retries:
+                    return response
+                delay = throttle if throttle is not None else self._backoff(attempt)
+                if delay > self.max_wait:
+                    logger.warning(
+                        f"GitHub 接口 {endpoint} 被限流，需等待 {delay:.0f} 秒，本次不再重试"
+                    )
+                    return response
+                logger.debug(
+                    f"请求 {endpoint} 返回 {response.status}，{delay:.1f} 秒后重试"
+                )
+
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    def _record_failure(self, breaker: CircuitBreaker, endpoint: str) -> None:
+        if breaker.record_failure():
+            logger.warning(
+                f"GitHub 接口 {endpoint} 连续失败 {breaker.failures} 次，"
+                f"熔断 {breaker.reset_timeout:.0f} 秒"
+            )
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,227 @@
+import json
+import os
+import re
+import time
+from typing import Any
+
+from astrbot.api import logger
+
+# Leading part of issue/PR bodies kept in the mirror
+MAX_BODY_LENGTH = 500
+
+# ASCII words/numbers, or runs of CJK characters which are indexed as bigrams
+_TOKEN_RE = re.compile(r"[0-9a-z_]+|[぀-ヿ㐀-鿿가-힯]+")
+_CJK_RE = re.compile(r"[぀-ヿ㐀-鿿가-힯]")
+
+# Query qualifiers understood by search(), e.g. "is:open is:pr"
+STATE_QUALIFIERS = {"is:open": "open", "is:closed": "closed"}
+KIND_QUALIFIERS = {"is:pr": True, "is:issue": False}
+
+
+def tokenize(text: str) -> set[str]:
+    """Split text into index terms: lowercase words and CJK character bigrams."""
+    tokens = set()
+    for run in _TOKEN_RE.findall(text.lower()):
+        if _CJK_RE.match(run) and len(run) > 1:
+            tokens.update(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.add(run)
+    return tokens
+
+
+def mirror_entry(item: dict[str, Any]) -> dict[str, Any]:
+    """Reduce an issue/PR object from the REST API or a webhook to a mirror entry.
+
+    The entry keeps the REST field names so formatters can render it directly.
+    """
+    entry = {
+        "number": item.get("number"),
+        "title": item.get("title") or "",
+        "state": item.get("state") or "",
+        "html_url": item.get("html_url") or "",
+        "created_at": item.get("created_at") or "",
+        "updated_at": item.get("updated_at") or "",
+        "user": {"login": (item.get("user") or {}).get("login") or ""},
+        "labels": [
+            {"name": label.get("name")}
+            for label in item.get("labels") or []
+            if isinstance(label, dict)
+        ],
+        "assignees": [
+            {"login": user.get("login")}
+            for user in item.get("assignees") or []
+            if isinstance(user, dict)
+        ],
+        "body": (item.get("body") or "")[:MAX_BODY_LENGTH],
+    }
+    # Issues API marks PRs with a "pull_request" key; PR objects have "head"
+    if "pull_request" in item or "head" in item:
+        entry["pull_request"] = {"html_url": entry["html_url"]}
+        if item.get("merged") or (item.get("pull_request") or {}).get("merged_at"):
+            entry["merged"] = True
+    return entry
+
+
+class RepoMirror:
+    """Issues and PRs of one repository plus an inverted index over their text."""
+
+    __slots__ = ("entries", "mirrored_at", "index", "etag", "since", "synced_at")
+
+    def __init__(self) -> None:
+        self.entries: dict[int, dict[str, Any]] = {}
+        self.mirrored_at: dict[int, float] = {}
+        self.index: dict[str, set[int]] = {}
+        # Conditional sync state: ETag of the last listing and newest updated_at it returned
+        self.etag: str | None = None
+        self.since: str | None = None
+        # Time of the last successful listing; entries it did not return were unchanged
+        self.synced_at = 0.0
+
+    @staticmethod
+    def _terms(entry: dict[str, Any]) -> set[str]:
+        text = " ".join(
+            [
+                entry["title"],
+                entry["body"],
+                entry["user"]["login"],
+                *(label["name"] or "" for label in entry["labels"]),
+            ]
+        )
+        return tokenize(text) | {str(entry["number"])}
+
+    def upsert(self, entry: dict[str, Any], mirrored_at: float | None = None) -> None:
+        number = int(entry["number"])
+        old = self.entries.get(number)
+        if old is not None:
+            for term in self._terms(old):
+                postings = self.index.get(term)
+                if postings:
+                    postings.discard(number)
+                    if not postings:
+                        del self.index[term]
+        self.entries[number] = entry
+        self.mirrored_at[number] = mirrored_at if mirrored_at is not None else time.time()
+        for term in self._terms(entry):
+            self.index.setdefault(term, set()).add(number)
+
+    def search(self, query: str, limit: int = 10) -> tuple[int, list[dict[str, Any]]]:
+        """Return (total matches, best entries) for a query; all terms must match."""
+        state = None
+        is_pr = None
+        words = []
+        for word in query.split():
+            lowered = word.lower()
+            if lowered in STATE_QUALIFIERS:
+                state = STATE_QUALIFIERS[lowered]
+            elif lowered in KIND_QUALIFIERS:
+                is_pr = KIND_QUALIFIERS[lowered]
+            else:
+                words.append(word)
+
+        terms = tokenize(" ".join(words))
+        if terms:
+            postings = sorted((self.index.get(term, set()) for term in terms), key=len)
+            matches = set(postings[0]).intersection(*postings[1:])
+        else:
+            matches = set(self.entries)
+
+        results = []
+        for number in matches:
+            entry = self.entries[number]
+            if state and entry["state"] != state:
+                continue
+            if is_pr is not None and ("pull_request" in entry) != is_pr:
+                continue
+            title_terms = tokenize(entry["title"])
+            results.append((len(terms & title_terms), entry["updated_at"], entry))
+        results.sort(key=lambda r: (r[0], r[1]), reverse=True)
+        return len(results), [r[2] for r in results[:limit]]
+
+
+class IssueMirror:
+    """Local mirror of issue/PR metadata for subscribed repositories.
+
+    Entries arrive from webhook deliveries, polled items and lookups, and
+    from periodic conditional listings of recently updated issues. Only
+    the entries are persisted; the inverted index is rebuilt on load.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.repos: dict[str, RepoMirror] = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"加载 Issue 镜像失败: {e}")
+            return
+        for repo, repo_data in data.items():
+            mirror = self.repos[repo] = RepoMirror()
+            mirrored_at = repo_data.get("mirrored_at") or {}
+            for number, entry in (repo_data.get("entries") or {}).items():
+                mirror.upsert(entry, mirrored_at.get(number, 0.0))
+            mirror.etag = repo_data.get("etag")
+            mirror.since = repo_data.get("since")
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        data = {
+            repo: {
+                "etag": mirror.etag,
+                "since": mirror.since,
+                "entries": {str(n): e for n, e in mirror.entries.items()},
+                "mirrored_at": {str(n): t for n, t in mirror.mirrored_at.items()},
+            }
+            for repo, mirror in self.repos.items()
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except Exception as e:
+            logger.error(f"保存 Issue 镜像失败: {e}")
+
+    def repo(self, repo: str) -> RepoMirror | None:
+        return self.repos.get(repo.lower())
+
+    def track(self, repo: str) -> RepoMirror:
+        mirror = self.repos.get(repo.lower())
+        if mirror is None:
+            mirror = self.repos[repo.lower()] = RepoMirror()
+        return mirror
+
+    def retain(self, repos: set[str]) -> None:
+        """Drop mirrors of repositories that are no longer subscribed."""
+        keep = {repo.lower() for repo in repos}
+        for repo in [r for r in self.repos if r not in keep]:
+            del self.repos[repo]
+            self.dirty = True
+
+    def upsert(self, repo: str, item: dict[str, Any]) -> None:
+        """Mirror an issue/PR object if the repository is tracked."""
+        mirror = self.repos.get(repo.lower())
+        if mirror is None or not item.get("number"):
+            return
+        mirror.upsert(mirror_entry(item))
+        self.dirty = True
+
+    def get(self, repo: str, number: int, max_age: float) -> dict[str, Any] | None:
+        """Return a mirrored entry if it was refreshed within ``max_age`` seconds."""
+        mirror = self.repos.get(repo.lower())
+        if mirror is None:
+            return None
+        entry = mirror.entries.get(int(number))
+        if entry is None:
+            return None
+        refreshed = max(mirror.mirrored_at[int(number)], mirror.synced_at)
+        return entry if time.time() - refreshed <= max_age else None
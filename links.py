@@ -0,0 +1,5 @@
+import re
+
+# Repository, issue and pull request links resolved into cards in chat messages
+GITHUB_URL_PATTERN = r"https://github\.com/[\w\-]+/[\w\-]+(?:/(pull|issues)/\d+)?"
+GITHUB_URL_RE = re.compile(GITHUB_URL_PATTERN)
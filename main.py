@@ -1,14 +1,16 @@
 import asyncio
 import base64
+import importlib.util
 import json
 import os
 import re
 import sys
+import time
 import uuid
-from datetime import datetime
-from typing import Any
+import zlib
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
-import aiohttp
 
 import astrbot.api.message_components as Comp
 from astrbot.api import AstrBotConfig, logger
@@ -16,13 +18,49 @@ from astrbot.api.event import AstrMessageEvent, MessageChain, filter
 from astrbot.api.star import Context, Star, register
 
 from . import formatters
-from .webhook_server import GitHubWebhookServer
+from .activity import ActivityTracker
+from .coalescer import EventCoalescer, coalesce_target
+from .digest import DIGEST_PERIODS, PERIOD_LABELS, DigestAggregator, format_digest
+from .event_log import EventLog, summarize_poll_item, summarize_webhook_event
+from .event_poller import RepoEventPoller
+from .github_client import GitHubClient
+from .issue_mirror import IssueMirror, mirror_entry
+from .links import GITHUB_URL_PATTERN, GITHUB_URL_RE
+from .poll_plan import ITEMS_PULLS, RepoPlan, build_poll_plan
+from .subscription_filters import (
+    facts_from_item,
+    facts_from_webhook,
+    is_filter_token,
+    normalize_filter_tokens,
+)
+from .subscriptions import (
+    REPO_LEVEL_MASK,
+    WILDCARD_REPO,
+    Subscription,
+    SubscriptionStore,
+    event_bit,
+    format_subscription_key,
+    is_wildcard_repo,
+    parse_event_list,
+    parse_repo_key,
+    parse_subscription_key,
+    repo_owner,
+    split_filter_spec,
+)
+from .storm_window import AGGREGATED_EVENTS, StormAggregator
+from .tracing import StageTracer, poll_item_time, webhook_event_time
+
+if TYPE_CHECKING:
+    # Feature modules are imported lazily when their feature is enabled
+    from .card_renderer import CardRenderer
+    from .github_app_auth import GitHubAppAuth
+    from .poll_sharding import PollShardCoordinator
+    from .profiler import PluginProfiler
 
 PLUGIN_DIR = os.path.dirname(__file__)
 if PLUGIN_DIR not in sys.path:
     sys.path.insert(0, PLUGIN_DIR)
 
-GITHUB_URL_PATTERN = r"https://github\.com/[\w\-]+/[\w\-]+(?:/(pull|issues)/\d+)?"
 GITHUB_REPO_OPENGRAPH = "https://opengraph.githubassets.com/{hash}/{appendix}"
 STAR_HISTORY_URL = "https://api.star-history.com/svg?repos={identifier}&type=Date"
 GITHUB_API_URL = "https://api.github.com/repos/{repo}"
@@ -31,46 +69,47 @@ GITHUB_README_API_URL = (
 )
 GITHUB_ISSUES_API_URL = "https://api.github.com/repos/{repo}/issues"
 GITHUB_COMMITS_API_URL = "https://api.github.com/repos/{repo}/commits"
+GITHUB_COMMIT_API_URL = "https://api.github.com/repos/{repo}/commits/{ref}"
+GITHUB_COMPARE_API_URL = "https://api.github.com/repos/{repo}/compare/{base}...{head}"
 GITHUB_RELEASES_API_URL = "https://api.github.com/repos/{repo}/releases"
 GITHUB_ISSUE_API_URL = "https://api.github.com/repos/{repo}/issues/{issue_number}"
 GITHUB_PR_API_URL = "https://api.github.com/repos/{repo}/pulls/{pr_number}"
+GITHUB_PULLS_API_URL = "https://api.github.com/repos/{repo}/pulls"
 GITHUB_RATE_LIMIT_URL = "https://api.github.com/rate_limit"
-
-POLL_EVENTS = {"issues", "prs", "commits", "releases"}
-WEBHOOK_EVENTS = {
-    "issues",
-    "issue_comment",
-    "prs",
-    "pull_request",
-    "pull_request_review",
-    "pull_request_review_comment",
-    "pull_request_review_thread",
-    "commit_comment",
-    "discussion",
-    "discussion_comment",
-    "fork",
-    "star",
-    "create",
-    "push",
-    "commits",
-    "release",
-    "releases",
-}
-SUBSCRIPTION_EVENTS = POLL_EVENTS | WEBHOOK_EVENTS
-EVENT_ALIASES = {
-    "issue": "issues",
-    "pr": "prs",
-    "pulls": "prs",
-    "pull_request": "prs",
-    "commit": "commits",
-    "push": "commits",
-    "release": "releases",
-}
+GITHUB_OWNER_API_URL = "https://api.github.com/users/{owner}"
+GITHUB_ORG_REPOS_API_URL = "https://api.github.com/orgs/{owner}/repos"
+GITHUB_USER_REPOS_API_URL = "https://api.github.com/users/{owner}/repos"
 
 # Path for storing subscription data
 SUBSCRIPTION_FILE = "data/github_subscriptions.json"
 # Path for storing default repo data
 DEFAULT_REPO_FILE = "data/github_default_repos.json"
+# Directory of the append-only event log used by /ghhistory
+EVENT_LOG_DIR = "data/github_event_log"
+# Directory for profiles written by /ghprof dump
+PROFILE_DIR = "data/github_profiles"
+# Path for storing digest subscriptions and running aggregates
+DIGEST_FILE = "data/github_digest.json"
+# Path for storing the hourly activity counts used by /ghactivity
+ACTIVITY_FILE = "data/github_activity.json"
+# Repositories without events for this long count as quiet for polling
+QUIET_REPO_HOURS = 72
+# Directory of cached card images, keyed by item and updated_at
+CARD_CACHE_DIR = "data/github_cards"
+# Path of the local issue/PR mirror used by /ghsearch
+ISSUE_MIRROR_FILE = "data/github_issue_mirror.json"
+# Pages of 100 issues fetched per repository and mirror sync
+ISSUE_MIRROR_MAX_PAGES = 5
+# Repositories validated at once by a bulk /ghsub
+BULK_VALIDATE_CONCURRENCY = 8
+# Marks the token printed by /ghsub export
+SUBSCRIPTION_EXPORT_PREFIX = "GHSUB1:"
+# How often the repository list of an owner/* subscription is refreshed
+OWNER_REPO_REFRESH_HOURS = 6
+# Pages of 100 repositories fetched per owner/* refresh
+OWNER_REPO_MAX_PAGES = 10
+# Shared lease store used to shard polling across bot instances
+POLL_SHARD_FILE = "data/github_poll_shards.sqlite3"
 # Path for storing link resolution settings
 LINK_SETTINGS_FILE = "data/github_link_settings.json"
 
@@ -84,59 +123,303 @@ LINK_SETTINGS_FILE = "data/github_link_settings.json"
 class MyPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig | None = None):
         super().__init__(context)
+        started = time.perf_counter()
         self.config = config or {}
-        self.subscriptions = self._load_subscriptions()
-        self.default_repos = self._load_default_repos()
-        self.link_settings = self._load_link_settings()
+        # Persistent state is loaded on first use, see the properties below
+        self._subscriptions: SubscriptionStore | None = None
+        self._default_repos: dict[str, str] | None = None
+        self._link_settings: dict[str, bool] | None = None
+        self._digest: DigestAggregator | None = None
+        self._digest_subscribers: dict[str, str] = {}  # unified_msg_origin -> period
+        self._digest_last_sent: dict[str, str] = {}  # period -> last sent period id
+        self._event_log: EventLog | None = None
+        self._activity: ActivityTracker | None = None
+        self._issue_mirror: IssueMirror | None = None
         self.last_check_time = {}  # Store the last check time for each repo
+        self.branch_heads: dict[str, str] = {}  # Last notified head SHA per branch subscription
+        self.branch_head_etags: dict[str, str] = {}
         self.use_lowercase = self.config.get("use_lowercase_repo", True)
         self.auto_resolve_links = self.config.get("auto_resolve_links", True)
         self.github_token = self.config.get("github_token", "")
+        self.github_app: "GitHubAppAuth | None" = None
+        # Shared API client; its HTTP session is opened on the first request
+        self.github = GitHubClient(
+            max_retries=self.config.get("github_max_retries", 3),
+            failure_threshold=self.config.get("github_circuit_threshold", 5),
+            reset_timeout=self.config.get("github_circuit_reset_seconds", 60),
+        )
         self.check_interval = self.config.get("check_interval", 30)
+        self.poll_backend = self.config.get("poll_backend", "classic")
+        self.event_poller = RepoEventPoller()
+        self.activity_days = int(self.config.get("activity_days", 14))
+        # Quiet repositories are polled once every this many cycles
+        self.quiet_poll_factor = max(1, int(self.config.get("quiet_repo_poll_factor", 1)))
+        self.poll_cycle = 0
+        # Endpoints to poll per repository, rebuilt when subscriptions change
+        self._poll_plan: dict[str, RepoPlan] | None = None
+        self._poll_plan_version: tuple[int, int] | None = None
+        # owner/* subscriptions: repositories of the owner and whether it is an organization
+        self.owner_repos: dict[str, list[str]] = {}
+        self.owner_is_org: dict[str, bool] = {}
+        self.owner_repos_refreshed: dict[str, float] = {}
         self.enable_webhook = bool(self.config.get("enable_webhook", False))
+        self.hybrid_mode = bool(self.config.get("enable_hybrid_mode", False))
+        # Hybrid mode runs the webhook server and polls repos without recent deliveries
+        self.enable_polling = self.hybrid_mode or not self.enable_webhook
+        self.webhook_fallback_minutes = int(
+            self.config.get("webhook_fallback_minutes", 60)
+        )
+        self.webhook_last_seen: dict[str, float] = {}  # Last delivery per normalized repo
         self.webhook_host = self.config.get("webhook_host", "0.0.0.0")
         self.webhook_port = int(self.config.get("webhook_port", 6192))
         self.webhook_secret = self.config.get("webhook_secret", "")
         self.webhook_path = self.config.get("webhook_path", "/github/webhook")
         self.webhook_server: Any | None = None
         self.task: asyncio.Task[Any] | None = None
+        self.digest_hour = int(self.config.get("digest_hour", 9)) % 24
+        self.digest_task: asyncio.Task[Any] | None = None
+        self.poll_shards: "PollShardCoordinator | None" = None
+        self.event_log_retention_days = int(
+            self.config.get("event_log_retention_days", 7)
+        )
+        self.enable_issue_mirror = bool(self.config.get("enable_issue_mirror", False))
+        self.issue_mirror_sync_minutes = int(
+            self.config.get("issue_mirror_sync_minutes", 30)
+        )
+        self.issue_mirror_fresh_minutes = int(
+            self.config.get("issue_mirror_fresh_minutes", 10)
+        )
+        self.mirror_task: asyncio.Task[Any] | None = None
+        self.storm_window_minutes = int(self.config.get("storm_window_minutes", 10))
+        self.storms: StormAggregator | None = None
+        if self.storm_window_minutes > 0:
+            self.storms = StormAggregator(
+                self.storm_window_minutes * 60,
+                int(self.config.get("storm_flush_threshold", 200)),
+                self._send_plain,
+            )
+        self.coalesce_window_seconds = int(
+            self.config.get("coalesce_window_seconds", 20)
+        )
+        self.coalescer: EventCoalescer | None = None
+        if self.coalesce_window_seconds > 0:
+            self.coalescer = EventCoalescer(self.coalesce_window_seconds, self._send_plain)
+        self.profiler: "PluginProfiler | None" = None  # Created by the first /ghprof start
+        self.card_renderer: "CardRenderer | None" = None
+        self.tracer = StageTracer()
+        self.startup_timings: dict[str, float] = {
+            "config": (time.perf_counter() - started) * 1000
+        }
+
+        # Network services start on the event loop once the plugin is registered
+        self._startup_task: asyncio.Task[Any] | None = asyncio.create_task(
+            self._start_services()
+        )
 
-        if self.enable_webhook:
-            server = GitHubWebhookServer(
-                plugin=self,
-                host=self.webhook_host,
-                port=self.webhook_port,
-                secret=self.webhook_secret,
-                path=self.webhook_path,
+    async def _start_services(self) -> None:
+        """Start webhook/polling services, importing their dependencies on demand."""
+        await asyncio.sleep(0)
+        timings = self.startup_timings
+
+        def mark(stage: str, since: float) -> None:
+            timings[stage] = (time.perf_counter() - since) * 1000
+
+        try:
+            app_id = str(self.config.get("github_app_id", "") or "").strip()
+            app_private_key = self.config.get("github_app_private_key", "")
+            if app_id and app_private_key:
+                stage_start = time.perf_counter()
+                from .github_app_auth import GitHubAppAuth
+
+                self.github_app = GitHubAppAuth(app_id, app_private_key)
+                mark("github_app", stage_start)
+                logger.info(f"已启用 GitHub App 认证 (App ID: {app_id})")
+
+            if self.config.get("enable_local_cards", True):
+                if importlib.util.find_spec("PIL") is None:
+                    logger.warning("未安装 Pillow，本地卡片渲染不可用，仅使用 GitHub OpenGraph 卡片")
+                else:
+                    stage_start = time.perf_counter()
+                    from .card_renderer import CardRenderer
+
+                    self.card_renderer = CardRenderer(
+                        CARD_CACHE_DIR,
+                        font_path=self.config.get("card_font_path", ""),
+                        opengraph_timeout=self.config.get("opengraph_timeout_seconds", 5),
+                    )
+                    mark("card_renderer", stage_start)
+
+            if self.enable_webhook or self.hybrid_mode:
+                stage_start = time.perf_counter()
+                if self.config.get("webhook_process_mode", False):
+                    from .webhook_process import GitHubWebhookProcess
+
+                    # Verify and parse deliveries in a child process, off the bot's event loop
+                    server = GitHubWebhookProcess(
+                        plugin=self,
+                        host=self.webhook_host,
+                        port=self.webhook_port,
+                        secret=self.webhook_secret,
+                        path=self.webhook_path,
+                        max_pending=self.config.get("webhook_max_pending", 256),
+                    )
+                else:
+                    # Quart and Hypercorn are only imported when the in-process server is used
+                    from .webhook_server import GitHubWebhookServer
+
+                    server = GitHubWebhookServer(
+                        plugin=self,
+                        host=self.webhook_host,
+                        port=self.webhook_port,
+                        secret=self.webhook_secret,
+                        path=self.webhook_path,
+                    )
+                self.webhook_server = server
+                server.start()
+                mark("webhook", stage_start)
+
+            if self.enable_polling and self.config.get("enable_poll_sharding", False):
+                stage_start = time.perf_counter()
+                from .poll_sharding import PollShardCoordinator
+
+                self.poll_shards = PollShardCoordinator(
+                    self.config.get("poll_shard_lease_file") or POLL_SHARD_FILE,
+                    instance_id=self.config.get("poll_shard_instance_id") or None,
+                    lease_seconds=self.config.get("poll_shard_lease_seconds", 60),
+                )
+                self.poll_shards.start()
+                mark("poll_sharding", stage_start)
+                logger.info(f"已启用轮询分片，实例 ID: {self.poll_shards.instance_id}")
+            if self.enable_polling:
+                # Start background task to check for updates when webhook is disabled
+                self.task = asyncio.create_task(self._check_updates_periodically())
+            self.digest_task = asyncio.create_task(self._digest_loop())
+            if self.enable_issue_mirror:
+                self.mirror_task = asyncio.create_task(self._issue_mirror_loop())
+        except Exception as e:
+            logger.error(f"启动 GitHub Cards Plugin 服务失败: {e}", exc_info=True)
+
+        if self.hybrid_mode:
+            logger.info(
+                f"GitHub Cards Plugin 初始化完成，启用混合模式，"
+                f"{self.webhook_fallback_minutes} 分钟内未收到 Webhook 的仓库将回退到轮询"
             )
-            self.webhook_server = server
-            server.start()
+        elif self.enable_webhook:
             logger.info("GitHub Cards Plugin 初始化完成，启用 Webhook 模式")
         else:
-            # Start background task to check for updates when webhook is disabled
-            self.task = asyncio.create_task(self._check_updates_periodically())
             logger.info(
                 f"GitHub Cards Plugin初始化完成，检查间隔: {self.check_interval}分钟"
             )
+        logger.info(
+            "GitHub Cards Plugin 启动耗时: "
+            + ", ".join(f"{stage} {ms:.1f}ms" for stage, ms in timings.items())
+        )
+
+    def _timed_load(self, stage: str, loader):
+        """Run a lazy state loader and record how long it took."""
+        started = time.perf_counter()
+        value = loader()
+        elapsed = (time.perf_counter() - started) * 1000
+        self.startup_timings[f"load_{stage}"] = elapsed
+        logger.debug(f"加载 {stage} 耗时 {elapsed:.1f}ms")
+        return value
+
+    @property
+    def subscriptions(self) -> SubscriptionStore:
+        if self._subscriptions is None:
+            self._subscriptions = self._timed_load(
+                "subscriptions", self._load_subscriptions
+            )
+        return self._subscriptions
 
-    def _load_subscriptions(self) -> dict[str, list[str]]:
+    @property
+    def default_repos(self) -> dict[str, str]:
+        if self._default_repos is None:
+            self._default_repos = self._timed_load(
+                "default_repos", self._load_default_repos
+            )
+        return self._default_repos
+
+    @property
+    def link_settings(self) -> dict[str, bool]:
+        if self._link_settings is None:
+            self._link_settings = self._timed_load(
+                "link_settings", self._load_link_settings
+            )
+        return self._link_settings
+
+    def _ensure_digest_state(self) -> DigestAggregator:
+        if self._digest is None:
+            self._digest = DigestAggregator()
+            self._timed_load("digest", self._load_digest_state)
+        return self._digest
+
+    @property
+    def digest(self) -> DigestAggregator:
+        return self._ensure_digest_state()
+
+    @property
+    def digest_subscribers(self) -> dict[str, str]:
+        self._ensure_digest_state()
+        return self._digest_subscribers
+
+    @property
+    def digest_last_sent(self) -> dict[str, str]:
+        self._ensure_digest_state()
+        return self._digest_last_sent
+
+    @property
+    def activity(self) -> ActivityTracker:
+        if self._activity is None:
+            self._activity = self._timed_load("activity", self._load_activity)
+        return self._activity
+
+    @property
+    def event_log(self) -> EventLog | None:
+        if self._event_log is None and self.event_log_retention_days > 0:
+            try:
+                self._event_log = self._timed_load(
+                    "event_log",
+                    lambda: EventLog(EVENT_LOG_DIR, self.event_log_retention_days),
+                )
+            except Exception as e:
+                logger.error(f"初始化事件日志失败: {e}")
+                self.event_log_retention_days = 0
+        return self._event_log
+
+    @property
+    def issue_mirror(self) -> IssueMirror | None:
+        if self._issue_mirror is None and self.enable_issue_mirror:
+            self._issue_mirror = self._timed_load(
+                "issue_mirror", lambda: IssueMirror(ISSUE_MIRROR_FILE)
+            )
+        return self._issue_mirror
+
+    def _load_subscriptions(self) -> SubscriptionStore:
         """Load subscriptions from JSON file"""
         if os.path.exists(SUBSCRIPTION_FILE):
             try:
                 with open(SUBSCRIPTION_FILE, encoding="utf-8") as f:
-                    return json.load(f)
+                    return SubscriptionStore.from_json(
+                        json.load(f), self._normalize_repo_name
+                    )
             except Exception as e:
                 logger.error(f"加载订阅数据失败: {e}")
-        return {}
+        return SubscriptionStore(self._normalize_repo_name)
 
-    def _save_subscriptions(self):
-        """Save subscriptions to JSON file"""
+    def _save_subscriptions(self) -> bool:
+        """Save subscriptions to JSON file. Returns False if writing failed."""
         try:
             os.makedirs(os.path.dirname(SUBSCRIPTION_FILE), exist_ok=True)
-            with open(SUBSCRIPTION_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.subscriptions, f, ensure_ascii=False, indent=2)
+            # Write a complete file first so a failed save never leaves a truncated one
+            tmp_path = SUBSCRIPTION_FILE + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.subscriptions.to_json(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, SUBSCRIPTION_FILE)
+            return True
         except Exception as e:
             logger.error(f"保存订阅数据失败: {e}")
+            return False
 
     def _load_default_repos(self) -> dict[str, str]:
         """Load default repo settings from JSON file"""
@@ -176,25 +459,72 @@ class MyPlugin(Star):
         except Exception as e:
             logger.error(f"保存链接解析设置失败: {e}")
 
+    def _load_digest_state(self) -> None:
+        """Load digest subscriptions and aggregates from JSON file"""
+        if not os.path.exists(DIGEST_FILE):
+            return
+        try:
+            with open(DIGEST_FILE, encoding="utf-8") as f:
+                data = json.load(f)
+            self._digest_subscribers = data.get("subscribers", {})
+            self._digest_last_sent = data.get("last_sent", {})
+            self.digest.load(data.get("aggregates", {}))
+        except Exception as e:
+            logger.error(f"加载摘要数据失败: {e}")
+
+    def _save_digest_state(self):
+        """Save digest subscriptions and aggregates to JSON file"""
+        try:
+            os.makedirs(os.path.dirname(DIGEST_FILE), exist_ok=True)
+            data = {
+                "subscribers": self.digest_subscribers,
+                "last_sent": self.digest_last_sent,
+                "aggregates": self.digest.to_dict(),
+            }
+            with open(DIGEST_FILE, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"保存摘要数据失败: {e}")
+
+    def _load_activity(self) -> ActivityTracker:
+        """Load hourly activity counts from JSON file"""
+        activity = ActivityTracker(self.activity_days)
+        if os.path.exists(ACTIVITY_FILE):
+            try:
+                with open(ACTIVITY_FILE, encoding="utf-8") as f:
+                    activity.load(json.load(f))
+            except Exception as e:
+                logger.error(f"加载仓库活动数据失败: {e}")
+        return activity
+
+    def _save_activity(self):
+        """Save hourly activity counts of still subscribed repositories to JSON file"""
+        try:
+            if self._subscriptions is not None:
+                self.activity.retain(lambda repo: bool(self.subscriptions.matching(repo)))
+            os.makedirs(os.path.dirname(ACTIVITY_FILE), exist_ok=True)
+            with open(ACTIVITY_FILE, "w", encoding="utf-8") as f:
+                json.dump(self.activity.to_dict(), f, separators=(",", ":"))
+        except Exception as e:
+            logger.error(f"保存仓库活动数据失败: {e}")
+
     def _normalize_repo_name(self, repo: str) -> str:
         """Normalize repository name according to configuration"""
         return repo.lower() if self.use_lowercase else repo
 
-    def _resolve_repo_key(self, repo: str) -> str | None:
-        """Resolve stored subscription key that matches the provided repo name."""
-        if repo in self.subscriptions:
-            return repo
-
-        normalized = self._normalize_repo_name(repo)
-        for stored_repo in self.subscriptions.keys():
-            if self._normalize_repo_name(stored_repo) == normalized:
-                return stored_repo
-
-        return None
+    async def _get_github_headers(self, repo: str | None = None) -> dict[str, str]:
+        """Get GitHub API headers with token if available.
 
-    def _get_github_headers(self) -> dict[str, str]:
-        """Get GitHub API headers with token if available"""
+        When GitHub App auth is configured and ``repo`` is given, the
+        installation token for the repo owner is preferred over the
+        personal token.
+        """
         headers = {"Accept": "application/vnd.github.v3+json"}
+        if self.github_app and repo:
+            token = await self.github_app.get_installation_token(repo)
+            if token:
+                headers["Authorization"] = f"token {token}"
+                return headers
         if self.github_token:
             headers["Authorization"] = f"token {self.github_token}"
         return headers
@@ -210,18 +540,20 @@ class MyPlugin(Star):
             return
 
         msg = event.message_str
-        match = re.search(GITHUB_URL_PATTERN, msg)
+        match = GITHUB_URL_RE.search(msg)
         if not match:
             logger.debug("未能在消息中解析到 GitHub 链接")
             return
         repo_url = match.group(0)
         repo_url = repo_url.replace("https://github.com/", "")
-        hash_value = uuid.uuid4().hex
-        opengraph_url = GITHUB_REPO_OPENGRAPH.format(hash=hash_value, appendix=repo_url)
-        logger.info(f"生成的 OpenGraph URL: {opengraph_url}")
+        kind = {"pull": "pr", "issues": "issue"}.get(match.group(1) or "", "repo")
 
         try:
-            yield event.image_result(opengraph_url)
+            image = await self._card_image(kind, repo_url)
+            if image is None:
+                yield event.plain_result("获取 GitHub 卡片失败，可能不存在或无访问权限")
+                return
+            yield event.image_result(image)
         except Exception as e:
             logger.error(f"下载图片失败: {e}")
             yield event.plain_result("下载 GitHub 图片失败: " + str(e))
@@ -250,7 +582,37 @@ class MyPlugin(Star):
         branch: str | None = None,
         events: str | None = None,
     ):
-        """订阅 GitHub 仓库事件。例如: /ghsub AstrBotDev/AstrBot main issues,commits"""
+        """订阅 GitHub 仓库事件。例如: /ghsub AstrBotDev/AstrBot main issues,commits -bots label:bug，多个仓库用逗号分隔，/ghsub export 与 /ghsub import 迁移订阅"""
+        subscriber_id = event.unified_msg_origin
+        if repo.lower() == "export":
+            yield event.plain_result(self._export_subscriptions(subscriber_id))
+            return
+        if repo.lower() == "import":
+            yield event.plain_result(await self._import_subscriptions(subscriber_id, branch))
+            return
+
+        try:
+            branch, events, filter_spec = self._extract_filter_args(event, branch, events)
+        except ValueError as e:
+            yield event.plain_result(str(e))
+            return
+
+        if "," in repo:
+            # Bulk form: the event list and filters apply to every repository
+            targets = []
+            for item in repo.split(","):
+                parsed = self._parse_subscribe_target(item.strip(), branch, events)
+                if not parsed:
+                    yield event.plain_result(
+                        f"无效的仓库: {item}，格式为: 用户名/仓库名 或 用户名/仓库名/分支名"
+                    )
+                    return
+                base_repo, item_branch, event_set = parsed
+                repo_key = self._format_repo_key(base_repo, item_branch, event_set, filter_spec)
+                targets.append((base_repo, repo_key))
+            yield event.plain_result(await self._subscribe_keys(subscriber_id, targets))
+            return
+
         parsed = self._parse_subscribe_target(repo, branch, events)
         if not parsed:
             yield event.plain_result(
@@ -262,44 +624,30 @@ class MyPlugin(Star):
 
         # Check if the repo exists
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    GITHUB_API_URL.format(repo=base_repo),
-                    headers=self._get_github_headers(),
-                ) as resp:
-                    if resp.status != 200:
-                        yield event.plain_result(f"仓库 {base_repo} 不存在或无法访问")
-                        return
-
-                    repo_data = await resp.json()
-                    display_name = repo_data.get("full_name", base_repo)
+            display_name = await self._check_repo(base_repo)
+            if display_name is None:
+                yield event.plain_result(f"仓库 {base_repo} 不存在或无法访问")
+                return
         except Exception as e:
             logger.error(f"访问 GitHub API 失败: {e}")
             yield event.plain_result(f"检查仓库时出错: {str(e)}")
             return
 
-        # Build the subscription key including optional branch/events
-        repo_key = self._format_repo_key(base_repo, branch, event_set)
+        # Build the subscription key including optional branch/events/filters
+        repo_key = self._format_repo_key(base_repo, branch, event_set, filter_spec)
         display_suffix = f" ({branch} 分支)" if branch else ""
         if event_set:
             display_suffix += f" [{', '.join(sorted(event_set))}]"
+        if filter_spec:
+            display_suffix += f" 过滤: {filter_spec}"
 
-        # Get the unique identifier for the subscriber
-        subscriber_id = event.unified_msg_origin
-
-        subscribers = self.subscriptions.setdefault(repo_key, [])
-
-        if subscriber_id not in subscribers:
-            subscribers.append(subscriber_id)
+        if self.subscriptions.add(repo_key, subscriber_id):
             self._save_subscriptions()
-
-            # Fetch initial state for new subscription.
-            # Repo-level polling uses base_repo as timestamp key to avoid duplicate API calls.
-            if not self.enable_webhook:
-                if self._subscription_allows(repo_key, "issues") or self._subscription_allows(repo_key, "prs") or self._subscription_allows(repo_key, "releases"):
-                    await self._fetch_new_items(base_repo, None, fetch_commits=False)
-                if self._subscription_allows(repo_key, "commits"):
-                    await self._fetch_new_items(repo_key, None, fetch_repo_level=False)
+            try:
+                await self._prime_subscription(self.subscriptions.get(repo_key))
+            except Exception as e:
+                # The subscription is saved; the next poll cycle initializes it
+                logger.error(f"获取订阅 {repo_key} 的初始状态时出错: {e}")
 
             yield event.plain_result(
                 f"成功订阅仓库 {display_name}{display_suffix} 的事件更新。"
@@ -310,8 +658,155 @@ class MyPlugin(Star):
             )
 
         # Set as default repo for this conversation (always store base repo)
-        self.default_repos[event.unified_msg_origin] = display_name
-        self._save_default_repos()
+        if not is_wildcard_repo(base_repo):
+            self.default_repos[event.unified_msg_origin] = display_name
+            self._save_default_repos()
+
+    async def _prime_subscription(self, subscription: Subscription) -> None:
+        """Fetch the initial state of a new subscription so polling only reports later items.
+
+        Repo-level polling uses base_repo as timestamp key to avoid duplicate API calls.
+        """
+        base_repo = subscription.base_repo
+        if self.enable_polling and subscription.is_wildcard:
+            await self._poll_owner(base_repo)
+        elif self.enable_polling and self.poll_backend == "events":
+            if not self.event_poller.is_tracking(base_repo):
+                await self._poll_repo_events(base_repo)
+        elif self.enable_polling:
+            if subscription.allows_mask(REPO_LEVEL_MASK):
+                await self._fetch_new_items(base_repo, None, fetch_commits=False)
+            if subscription.allows("commits"):
+                await self._fetch_new_items(subscription.key, None, fetch_repo_level=False)
+
+    async def _validate_repos(self, repos: list[str]) -> dict[str, str | None]:
+        """Check repositories concurrently, at most BULK_VALIDATE_CONCURRENCY at a time.
+
+        Maps each repository to its canonical full name, or None if it is
+        missing or inaccessible.
+        """
+        semaphore = asyncio.Semaphore(BULK_VALIDATE_CONCURRENCY)
+
+        async def check(repo: str) -> str | None:
+            async with semaphore:
+                try:
+                    return await self._check_repo(repo)
+                except Exception as e:
+                    logger.error(f"检查仓库 {repo} 时出错: {e}")
+                    return None
+
+        names = await asyncio.gather(*(check(repo) for repo in repos))
+        return dict(zip(repos, names))
+
+    async def _check_repo(self, repo: str) -> str | None:
+        """Return the canonical name of a repository or ``owner/*`` pattern, None if missing."""
+        if is_wildcard_repo(repo):
+            owner = repo_owner(repo)
+            resp = await self.github.get(
+                GITHUB_OWNER_API_URL.format(owner=owner),
+                headers=await self._get_github_headers(repo),
+            )
+            if resp.status != 200:
+                return None
+            data = resp.json()
+            self.owner_is_org[repo] = data.get("type") == "Organization"
+            return f"{data.get('login', owner)}/{WILDCARD_REPO}"
+        resp = await self.github.get(
+            GITHUB_API_URL.format(repo=repo),
+            headers=await self._get_github_headers(repo),
+        )
+        if resp.status != 200:
+            return None
+        return resp.json().get("full_name", repo)
+
+    async def _subscribe_keys(self, subscriber_id: str, targets: list[tuple[str, str]]) -> str:
+        """Subscribe a conversation to several (base_repo, key) targets in one step.
+
+        Repositories are validated concurrently first. All accepted keys are
+        then added and saved together; if saving fails every addition is
+        rolled back so memory and disk stay in agreement.
+        """
+        targets = list(dict.fromkeys(targets))
+        names = await self._validate_repos(list(dict.fromkeys(base for base, _ in targets)))
+        invalid = sorted({base for base, _ in targets if names[base] is None})
+        accepted = [key for base, key in targets if names[base] is not None]
+
+        added = [key for key in accepted if self.subscriptions.add(key, subscriber_id)]
+        if added and not self._save_subscriptions():
+            for key in added:
+                self.subscriptions.discard(key, subscriber_id)
+            return "保存订阅数据失败，本次订阅未生效"
+
+        semaphore = asyncio.Semaphore(BULK_VALIDATE_CONCURRENCY)
+
+        async def prime(key: str) -> None:
+            async with semaphore:
+                try:
+                    await self._prime_subscription(self.subscriptions.get(key))
+                except Exception as e:
+                    logger.error(f"获取订阅 {key} 的初始状态时出错: {e}")
+
+        await asyncio.gather(*(prime(key) for key in added))
+
+        first_base = next(
+            (base for base, key in targets if key in added and not is_wildcard_repo(base)),
+            None,
+        )
+        if first_base and subscriber_id not in self.default_repos:
+            self.default_repos[subscriber_id] = names[first_base]
+            self._save_default_repos()
+
+        lines = []
+        if added:
+            lines.append(f"成功订阅 {len(added)} 项: {', '.join(added)}")
+        existing = [key for key in accepted if key not in added]
+        if existing:
+            lines.append(f"已订阅，无需重复订阅 {len(existing)} 项: {', '.join(existing)}")
+        if invalid:
+            lines.append(f"不存在或无法访问 {len(invalid)} 个仓库: {', '.join(invalid)}")
+        return "\n".join(lines) or "没有需要订阅的仓库"
+
+    def _export_subscriptions(self, subscriber_id: str) -> str:
+        keys = [s.key for s in self.subscriptions.for_subscriber(subscriber_id)]
+        if not keys:
+            return "当前会话没有任何订阅"
+        # Filter specs contain spaces, so keys travel as one base64 token
+        token = SUBSCRIPTION_EXPORT_PREFIX + base64.urlsafe_b64encode(
+            json.dumps(keys, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+        return (
+            f"当前会话的 {len(keys)} 项订阅:\n"
+            + "\n".join(f"- {key}" for key in keys)
+            + f"\n\n在其他会话中发送以下命令即可导入:\n/ghsub import {token}"
+        )
+
+    async def _import_subscriptions(self, subscriber_id: str, token: str | None) -> str:
+        if not token:
+            return "用法: /ghsub import <由 /ghsub export 生成的内容>"
+        try:
+            keys = json.loads(
+                base64.urlsafe_b64decode(token.removeprefix(SUBSCRIPTION_EXPORT_PREFIX))
+            )
+            if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+                raise ValueError("not a list of keys")
+        except Exception as e:
+            logger.debug(f"无法解析订阅导入内容: {e}")
+            return "导入内容无效，请使用 /ghsub export 生成的完整内容"
+
+        targets = []
+        for key in keys:
+            base_repo, branch, event_set = parse_subscription_key(key)
+            spec = split_filter_spec(key)[1]
+            try:
+                filter_spec = normalize_filter_tokens(spec.split()) if spec else None
+            except ValueError as e:
+                return f"导入内容中的订阅 {key} 无效: {e}"
+            if not (self._is_valid_repo(base_repo) or self._is_valid_owner_pattern(base_repo)):
+                return f"导入内容中的订阅 {key} 无效"
+            targets.append(
+                (base_repo, self._format_repo_key(base_repo, branch, event_set, filter_spec))
+            )
+        return await self._subscribe_keys(subscriber_id, targets)
 
     @filter.command("ghunsub")
     async def unsubscribe_repo(
@@ -326,16 +821,11 @@ class MyPlugin(Star):
 
         if repo is None:
             # Unsubscribe from all repos
-            unsubscribed = []
-            for repo_name, subscribers in list(self.subscriptions.items()):
-                if subscriber_id in subscribers:
-                    subscribers.remove(subscriber_id)
-                    unsubscribed.append(repo_name)
-                    if not subscribers:
-                        del self.subscriptions[repo_name]
-
+            unsubscribed = self.subscriptions.discard_subscriber(subscriber_id)
             if unsubscribed:
                 self._save_subscriptions()
+                for repo_key in unsubscribed:
+                    self._forget_subscription_state(repo_key)
                 yield event.plain_result(
                     f"已取消订阅所有仓库: {', '.join(unsubscribed)}"
                 )
@@ -343,6 +833,34 @@ class MyPlugin(Star):
                 yield event.plain_result("你没有订阅任何仓库")
             return
 
+        try:
+            branch, events, filter_spec = self._extract_filter_args(event, branch, events)
+        except ValueError as e:
+            yield event.plain_result(str(e))
+            return
+
+        if "," in repo:
+            removed = []
+            for item in repo.split(","):
+                parsed = self._parse_subscribe_target(item.strip(), branch, events)
+                if not parsed:
+                    yield event.plain_result(
+                        f"无效的仓库: {item}，格式为: 用户名/仓库名 或 用户名/仓库名/分支名"
+                    )
+                    return
+                base_repo, item_branch, event_set = parsed
+                repo_key = self._format_repo_key(base_repo, item_branch, event_set, filter_spec)
+                if self.subscriptions.discard(repo_key, subscriber_id):
+                    removed.append(repo_key)
+            if not removed:
+                yield event.plain_result("你没有订阅这些仓库")
+                return
+            self._save_subscriptions()
+            for repo_key in removed:
+                self._forget_subscription_state(repo_key)
+            yield event.plain_result(f"已取消订阅 {len(removed)} 项: {', '.join(removed)}")
+            return
+
         parsed = self._parse_subscribe_target(repo, branch, events)
         if not parsed:
             yield event.plain_result(
@@ -351,30 +869,54 @@ class MyPlugin(Star):
             return
 
         base_repo, branch, event_set = parsed
-        repo_key = self._format_repo_key(base_repo, branch, event_set)
+        repo_key = self._format_repo_key(base_repo, branch, event_set, filter_spec)
         display_suffix = f" ({branch} 分支)" if branch else ""
         if event_set:
             display_suffix += f" [{', '.join(sorted(event_set))}]"
+        if filter_spec:
+            display_suffix += f" 过滤: {filter_spec}"
 
-        if repo_key and subscriber_id in self.subscriptions.get(repo_key, []):
-            self.subscriptions[repo_key].remove(subscriber_id)
-            if not self.subscriptions[repo_key]:
-                del self.subscriptions[repo_key]
+        if self.subscriptions.discard(repo_key, subscriber_id):
             self._save_subscriptions()
-            self.last_check_time.pop(repo_key, None)
+            self._forget_subscription_state(repo_key)
             yield event.plain_result(f"已取消订阅仓库 {repo_key}{display_suffix}")
         else:
             yield event.plain_result(f"你没有订阅仓库 {base_repo}{display_suffix}")
 
+    def _forget_subscription_state(self, repo_key: str) -> None:
+        """Drop the poll state of a key that no conversation subscribes to any more.
+
+        Repository-level state goes as well once the base repository has no
+        subscriptions left, so subscribe/unsubscribe churn does not grow it.
+        """
+        if self.subscriptions.get(repo_key) is not None:
+            return
+        self.last_check_time.pop(repo_key, None)
+        self.branch_heads.pop(repo_key, None)
+        self.branch_head_etags.pop(repo_key, None)
+
+        base_repo = parse_subscription_key(repo_key)[0]
+        if self.subscriptions.for_repo(base_repo):
+            return
+        self.last_check_time.pop(base_repo, None)
+        self.webhook_last_seen.pop(self._normalize_repo_name(base_repo), None)
+        self.event_poller.forget(base_repo)
+        for repo in self.owner_repos.pop(base_repo, []):
+            self.event_poller.forget(f"{base_repo}:{repo}")
+        self.owner_is_org.pop(base_repo, None)
+        self.owner_repos_refreshed.pop(base_repo, None)
+
     @filter.command("ghlist")
     async def list_subscriptions(self, event: AstrMessageEvent):
         """列出当前订阅的 GitHub 仓库"""
         subscriber_id = event.unified_msg_origin
         subscribed_repos = []
-
-        for repo, subscribers in self.subscriptions.items():
-            if subscriber_id in subscribers:
-                subscribed_repos.append(repo)
+        for subscription in self.subscriptions.for_subscriber(subscriber_id):
+            repos = self.owner_repos.get(subscription.base_repo)
+            if subscription.is_wildcard and repos is not None:
+                subscribed_repos.append(f"{subscription.key} ({len(repos)} 个仓库)")
+            else:
+                subscribed_repos.append(subscription.key)
 
         if subscribed_repos:
             yield event.plain_result(
@@ -403,16 +945,16 @@ class MyPlugin(Star):
 
         # Check if the repo exists
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    GITHUB_API_URL.format(repo=repo), headers=self._get_github_headers()
-                ) as resp:
-                    if resp.status != 200:
-                        yield event.plain_result(f"仓库 {repo} 不存在或无法访问")
-                        return
-
-                    repo_data = await resp.json()
-                    display_name = repo_data.get("full_name", repo)
+            resp = await self.github.get(
+                GITHUB_API_URL.format(repo=repo),
+                headers=await self._get_github_headers(repo),
+            )
+            if resp.status != 200:
+                yield event.plain_result(f"仓库 {repo} 不存在或无法访问")
+                return
+
+            repo_data = resp.json()
+            display_name = repo_data.get("full_name", repo)
         except Exception as e:
             logger.error(f"访问 GitHub API 失败: {e}")
             yield event.plain_result(f"检查仓库时出错: {str(e)}")
@@ -426,53 +968,44 @@ class MyPlugin(Star):
         """Check if the repository name is valid (user/repo format)"""
         return bool(re.match(r"^[\w\-]+/[\w\-]+$", repo))
 
-    def _parse_event_list(self, events: str | None) -> set[str] | None:
-        """Parse comma-separated event list. None means all events."""
-        if not events:
-            return None
-        parsed = {
-            EVENT_ALIASES.get(item.strip().lower(), item.strip().lower())
-            for item in events.split(",")
-            if item.strip()
-        }
-        if not parsed or not parsed <= SUBSCRIPTION_EVENTS:
-            return None
-        return parsed
-
-    def _events_to_suffix(self, events: set[str] | None) -> str:
-        return "" if events is None else ":" + ",".join(sorted(events))
-
-    def _parse_repo_key(self, repo_key: str) -> tuple[str, str | None]:
-        """Parse subscription key into (base_repo, branch), ignoring event suffix."""
-        key_without_events = repo_key.split(":", 1)[0]
-        parts = key_without_events.split("/")
-        if len(parts) == 2:
-            return key_without_events, None
-        if len(parts) >= 3:
-            return f"{parts[0]}/{parts[1]}", "/".join(parts[2:])
-        return key_without_events, None
-
-    def _parse_subscription_key(
-        self, repo_key: str
-    ) -> tuple[str, str | None, set[str] | None]:
-        """Parse subscription key into (base_repo, branch, events)."""
-        key, _, events_part = repo_key.partition(":")
-        base_repo, branch = self._parse_repo_key(key)
-        events = self._parse_event_list(events_part) if events_part else None
-        return base_repo, branch, events
+    def _is_valid_owner_pattern(self, repo: str) -> bool:
+        """Check if the name is an owner-wide pattern (user/* format)"""
+        return bool(re.match(r"^[\w\-]+/\*$", repo))
 
     def _format_repo_key(
         self,
         base_repo: str,
         branch: str | None = None,
         events: set[str] | None = None,
+        filters: str | None = None,
     ) -> str:
-        """Format base_repo, optional branch and optional events into key."""
-        normalized_base = self._normalize_repo_name(base_repo)
-        if branch:
-            branch_norm = branch.lower() if self.use_lowercase else branch
-            return f"{normalized_base}/{branch_norm}{self._events_to_suffix(events)}"
-        return f"{normalized_base}{self._events_to_suffix(events)}"
+        """Format base_repo, optional branch, events and filter spec into key."""
+        return format_subscription_key(
+            self._normalize_repo_name(base_repo),
+            self._normalize_repo_name(branch) if branch else None,
+            events,
+            filters,
+        )
+
+    def _extract_filter_args(
+        self,
+        event: AstrMessageEvent,
+        branch: str | None,
+        events: str | None,
+    ) -> tuple[str | None, str | None, str | None]:
+        """Pull filter tokens such as ``label:bug`` or ``-bots`` out of the command.
+
+        Filters may follow the positional arguments, so they are read from the
+        raw message. Returns (branch, events, filter_spec) with filter tokens
+        removed from the positional arguments.
+        """
+        tokens = (event.message_str or "").split()[1:]
+        filter_spec = normalize_filter_tokens([t for t in tokens if is_filter_token(t)])
+        if is_filter_token(branch):
+            branch = None
+        if is_filter_token(events):
+            events = None
+        return branch, events, filter_spec
 
     def _parse_subscribe_target(
         self,
@@ -488,6 +1021,7 @@ class MyPlugin(Star):
         - /ghsub user/repo issues
         - /ghsub user/repo main issues,commits
         - /ghsub user/repo/main issues,commits
+        - /ghsub user/* issues,prs (every repository of a user or organization)
         """
         if not repo:
             return None
@@ -495,31 +1029,30 @@ class MyPlugin(Star):
         branch_value = branch
         events_value = events
         if branch_value and events_value is None:
-            maybe_events = self._parse_event_list(branch_value)
+            maybe_events = parse_event_list(branch_value)
             if maybe_events is not None:
                 branch_value = None
                 events_value = branch
 
-        parsed_events = self._parse_event_list(events_value) if events_value else None
+        parsed_events = parse_event_list(events_value) if events_value else None
         if events_value and parsed_events is None:
             return None
 
         parts = repo.split("/", 2)
         if len(parts) == 2 and self._is_valid_repo(repo):
             return repo, branch_value, parsed_events
-        if len(parts) >= 3:
+        if self._is_valid_owner_pattern(repo):
+            # Branches differ per repository, so owner-wide subscriptions take none
+            if branch_value is not None:
+                return None
+            return repo, None, parsed_events
+        if len(parts) >= 3 and not is_wildcard_repo(f"{parts[0]}/{parts[1]}"):
             if branch_value is not None:
                 return None
             return f"{parts[0]}/{parts[1]}", parts[2], parsed_events
 
         return None
 
-    def _subscription_allows(self, repo_key: str, event_name: str) -> bool:
-        """Return whether a subscription key allows an event."""
-        _, _, events = self._parse_subscription_key(repo_key)
-        event_name = EVENT_ALIASES.get(event_name, event_name)
-        return events is None or event_name in events
-
     def _item_event_name(self, item: dict[str, Any]) -> str:
         if item.get("_astrbot_type") == "commit":
             return "commits"
@@ -527,9 +1060,6 @@ class MyPlugin(Star):
             return "releases"
         return "prs" if "pull_request" in item else "issues"
 
-    def _webhook_event_name(self, event_type: str) -> str:
-        return EVENT_ALIASES.get(event_type, event_type)
-
     def _extract_webhook_branch(self, event_type: str, payload: dict[str, Any]) -> str | None:
         ref = payload.get("ref")
         if isinstance(ref, str) and ref.startswith("refs/heads/"):
@@ -538,10 +1068,17 @@ class MyPlugin(Star):
 
     async def _check_updates_periodically(self):
         """Periodically check for updates in subscribed repositories"""
-        if self.enable_webhook:
+        if not self.enable_polling:
             logger.debug("Webhook 模式已启用，跳过轮询任务")
             return
 
+        if self.poll_shards:
+            try:
+                # Join the shard ring before the first cycle so repos are split from the start
+                await self.poll_shards.refresh()
+            except Exception as e:
+                logger.error(f"初始化轮询分片失败: {e}")
+
         try:
             while True:
                 try:
@@ -563,52 +1100,305 @@ class MyPlugin(Star):
         repository, while commits are checked per branch subscription to avoid
         duplicate notifications.
         """
-        if self.enable_webhook:
+        if not self.enable_polling:
             return
 
-        # Group subscription keys by base repository
-        base_to_keys: dict[str, list[str]] = {}
-        for repo_key in list(self.subscriptions.keys()):
-            if not self.subscriptions[repo_key]:
+        poll_plan = self._current_poll_plan()
+        self.poll_cycle += 1
+        if self.poll_shards:
+            await self._hand_over_shards(poll_plan)
+
+        for base_repo, plan in poll_plan.items():
+            subs = plan.subscriptions
+            repo_keys = [sub.key for sub in subs]
+            if self.poll_shards and not self.poll_shards.owns(base_repo):
+                logger.debug(f"仓库 {base_repo} 由其他实例轮询，跳过")
+                continue
+
+            if self.hybrid_mode and self._is_covered_by_webhook(base_repo):
+                logger.debug(f"仓库 {base_repo} 近期收到过 Webhook，跳过轮询")
+                self._mark_covered_by_webhook(base_repo, repo_keys)
+                continue
+
+            if self._skip_quiet_repo(base_repo):
+                logger.debug(f"仓库 {base_repo} 近 {QUIET_REPO_HOURS} 小时没有活动，本轮跳过")
                 continue
-            base_repo, _, _ = self._parse_subscription_key(repo_key)
-            base_to_keys.setdefault(base_repo, []).append(repo_key)
 
-        for base_repo, repo_keys in base_to_keys.items():
             logger.debug(f"正在检查仓库 {base_repo} 更新")
 
+            if is_wildcard_repo(base_repo):
+                try:
+                    await self._poll_owner(base_repo)
+                except Exception as e:
+                    logger.error(f"检查 {base_repo} 的事件时出错: {e}")
+                continue
+
+            if self.poll_backend == "events":
+                try:
+                    await self._poll_repo_events(base_repo)
+                except Exception as e:
+                    logger.error(f"检查仓库 {base_repo} 事件时出错: {e}")
+                continue
+
             try:
-                need_repo_level = any(
-                    self._subscription_allows(k, "issues")
-                    or self._subscription_allows(k, "prs")
-                    or self._subscription_allows(k, "releases")
-                    for k in repo_keys
-                )
-                if need_repo_level:
+                if plan.fetches_repo_level:
                     # Repo-level events use one timestamp per base repository to avoid duplicate API calls.
                     last_check = self.last_check_time.get(base_repo, None)
+                    started = time.monotonic()
                     repo_items = await self._fetch_new_items(
-                        base_repo, last_check, fetch_commits=False
+                        base_repo, last_check, fetch_commits=False, plan=plan
                     )
+                    self.tracer.record("poll", "receive", time.monotonic() - started)
                     if repo_items:
                         self.last_check_time[base_repo] = datetime.now().isoformat()
-                        for repo_key in repo_keys:
-                            await self._notify_subscribers(repo_key, repo_items)
-
-                # Check commits individually for each branch subscription that allows commits
-                for repo_key in repo_keys:
-                    if not self._subscription_allows(repo_key, "commits"):
-                        continue
+                        for item in repo_items:
+                            self._record_event(summarize_poll_item(base_repo, item))
+                            if self.issue_mirror and "_astrbot_type" not in item:
+                                self.issue_mirror.upsert(base_repo, item)
+                        for sub in subs:
+                            await self._notify_subscribers(sub, repo_items)
+
+                # Check commits once per branch, for all subscriptions on that branch
+                for group in plan.commit_groups:
+                    repo_key = group[0].key
                     last_check = self.last_check_time.get(repo_key, None)
+                    started = time.monotonic()
                     branch_items = await self._fetch_new_items(
                         repo_key, last_check, fetch_repo_level=False
                     )
+                    self.tracer.record("poll", "receive", time.monotonic() - started)
                     if branch_items:
                         self.last_check_time[repo_key] = datetime.now().isoformat()
-                        await self._notify_subscribers(repo_key, branch_items)
+                        for item in branch_items:
+                            self._record_event(summarize_poll_item(base_repo, item))
+                    self._share_branch_state(repo_key, group[1:])
+                    for sub in group:
+                        if branch_items:
+                            await self._notify_subscribers(sub, branch_items)
             except Exception as e:
                 logger.error(f"检查仓库 {base_repo} 更新时出错: {e}")
 
+        if self.poll_shards and self.poll_shards.owned is not None:
+            cursors = {
+                base_repo: self._export_poll_state(base_repo, plan)
+                for base_repo, plan in poll_plan.items()
+                if self.poll_shards.owns(base_repo)
+            }
+            try:
+                await self.poll_shards.save_cursors(cursors)
+            except Exception as e:
+                logger.error(f"保存轮询游标失败: {e}")
+
+    async def _hand_over_shards(self, poll_plan: dict[str, RepoPlan]) -> None:
+        """Move poll cursors along with the repos that changed owner since the last cycle.
+
+        Repos this instance lost have their local state dropped, so a stale
+        cursor cannot resend what the other owner already delivered if they
+        come back. Repos it gained continue from the cursor the previous
+        owner left in the lease store.
+        """
+        gained, lost = self.poll_shards.rebalance(list(poll_plan))
+        for base_repo in lost:
+            self._drop_poll_state(base_repo, poll_plan[base_repo])
+        if not gained:
+            return
+        try:
+            cursors = await self.poll_shards.load_cursors(gained)
+        except Exception as e:
+            logger.error(f"读取轮询游标失败: {e}")
+            return
+        for base_repo, state in cursors.items():
+            self._restore_poll_state(base_repo, poll_plan[base_repo], state)
+        logger.info(
+            f"接管 {len(gained)} 个仓库的轮询，其中 {len(cursors)} 个从共享游标继续"
+        )
+
+    def _export_poll_state(self, base_repo: str, plan: RepoPlan) -> dict[str, Any]:
+        """Collect the timestamps, branch heads and event cursors of a base repository."""
+        keys = [base_repo, *(sub.key for sub in plan.subscriptions)]
+        saved: dict[str, Any] = {
+            name: {key: state[key] for key in keys if key in state}
+            for name, state in (
+                ("last_check_time", self.last_check_time),
+                ("branch_heads", self.branch_heads),
+                ("branch_head_etags", self.branch_head_etags),
+            )
+        }
+        saved["events"] = {
+            feed: self.event_poller.export_state(feed)
+            for feed in self.event_poller.feeds(base_repo)
+        }
+        return saved
+
+    def _drop_poll_state(self, base_repo: str, plan: RepoPlan) -> None:
+        for key in [base_repo, *(sub.key for sub in plan.subscriptions)]:
+            self.last_check_time.pop(key, None)
+            self.branch_heads.pop(key, None)
+            self.branch_head_etags.pop(key, None)
+        for feed in self.event_poller.feeds(base_repo):
+            self.event_poller.forget(feed)
+
+    def _restore_poll_state(
+        self, base_repo: str, plan: RepoPlan, saved: dict[str, Any]
+    ) -> None:
+        self._drop_poll_state(base_repo, plan)
+        self.last_check_time.update(saved.get("last_check_time") or {})
+        self.branch_heads.update(saved.get("branch_heads") or {})
+        self.branch_head_etags.update(saved.get("branch_head_etags") or {})
+        for feed, state in (saved.get("events") or {}).items():
+            self.event_poller.restore_state(feed, state)
+
+    def _current_poll_plan(self) -> dict[str, RepoPlan]:
+        """Return the poll plan, rebuilt only after the subscriptions changed."""
+        store = self.subscriptions
+        version = (id(store), store.version)
+        if self._poll_plan is None or self._poll_plan_version != version:
+            self._poll_plan = build_poll_plan(store.by_repo())
+            self._poll_plan_version = version
+            requests = sum(plan.requests for plan in self._poll_plan.values())
+            logger.debug(
+                f"已更新轮询计划: {len(self._poll_plan)} 个仓库，每轮约 {requests} 个请求"
+            )
+        return self._poll_plan
+
+    def _share_branch_state(self, repo_key: str, others: list[Subscription]) -> None:
+        """Copy a branch's poll state to the other subscriptions on the same branch.
+
+        Whichever subscription leads the group after an unsubscribe then
+        continues from the same point instead of starting over.
+        """
+        for sub in others:
+            for state in (self.last_check_time, self.branch_heads, self.branch_head_etags):
+                if repo_key in state:
+                    state[sub.key] = state[repo_key]
+
+    def _skip_quiet_repo(self, base_repo: str) -> bool:
+        """Return whether a quiet repository sits out this poll cycle.
+
+        Repositories without recorded activity for QUIET_REPO_HOURS are
+        polled once every ``quiet_poll_factor`` cycles, staggered so they
+        do not all come due together. Timestamps and event cursors are not
+        advanced while skipped, so the next poll still sees everything.
+        """
+        if self.quiet_poll_factor <= 1 or is_wildcard_repo(base_repo):
+            return False
+        self.activity.track(base_repo)
+        if not self.activity.is_quiet(base_repo, QUIET_REPO_HOURS):
+            return False
+        offset = zlib.crc32(self._normalize_repo_name(base_repo).encode("utf-8"))
+        return (self.poll_cycle + offset) % self.quiet_poll_factor != 0
+
+    def _is_covered_by_webhook(self, base_repo: str) -> bool:
+        """Return whether a webhook delivery for the repo arrived within the fallback window."""
+        last_seen = self.webhook_last_seen.get(self._normalize_repo_name(base_repo))
+        if last_seen is None:
+            return False
+        return time.monotonic() - last_seen < self.webhook_fallback_minutes * 60
+
+    def _mark_covered_by_webhook(self, base_repo: str, repo_keys: list[str]) -> None:
+        """Advance poll state for a repo whose updates arrive via webhook.
+
+        Poll state moves to the time of the last webhook delivery, not to
+        now: if deliveries stop, polling resumes from that point, without
+        replaying what the webhook delivered or dropping what came after.
+        """
+        last_seen = self.webhook_last_seen.get(self._normalize_repo_name(base_repo))
+        if last_seen is None:
+            return
+        age = time.monotonic() - last_seen
+        delivered_at = (
+            (datetime.utcnow() - timedelta(seconds=age)).replace(microsecond=0).isoformat()
+        )
+        if base_repo in self.last_check_time:
+            self.last_check_time[base_repo] = delivered_at
+        for repo_key in repo_keys:
+            if repo_key in self.last_check_time:
+                self.last_check_time[repo_key] = delivered_at
+            self.branch_heads.pop(repo_key, None)
+            self.branch_head_etags.pop(repo_key, None)
+        delivered_until = time.time() - age
+        self.event_poller.mark_delivered(base_repo, delivered_until)
+        for repo in self.owner_repos.get(base_repo, []):
+            self.event_poller.mark_delivered(f"{base_repo}:{repo}", delivered_until)
+
+    async def _poll_repo_events(self, base_repo: str) -> None:
+        """Poll the repository events API and route new events like webhooks."""
+        headers = await self._get_github_headers(base_repo)
+        started = time.monotonic()
+        events = await self.event_poller.poll(self.github, base_repo, headers)
+        self.tracer.record("poll", "receive", time.monotonic() - started)
+        for event_type, payload in events:
+            await self.handle_webhook_event(event_type, payload, source="poll")
+
+    async def _poll_owner(self, base_repo: str) -> None:
+        """Poll an ``owner/*`` subscription and route new events like webhooks.
+
+        Organizations are followed through their events feed, a single
+        conditional request per cycle. User accounts have no such feed for
+        their repositories, so each repository on the owner's list is polled.
+        Events are delivered to owner-wide subscriptions only; repositories
+        subscribed directly are polled on their own.
+        """
+        headers = await self._get_github_headers(base_repo)
+        try:
+            await self._refresh_owner_repos(base_repo, headers)
+        except Exception as e:
+            logger.error(f"刷新 {base_repo} 的仓库列表时出错: {e}")
+
+        owner = repo_owner(base_repo)
+        started = time.monotonic()
+        events = None
+        if self.owner_is_org.get(base_repo, True):
+            events = await self.event_poller.poll_org(self.github, owner, headers)
+        if events is None:
+            self.owner_is_org[base_repo] = False
+            events = []
+            for repo in self.owner_repos.get(base_repo, []):
+                events += await self.event_poller.poll(
+                    self.github, repo, headers, key=f"{base_repo}:{repo}"
+                )
+        self.tracer.record("poll", "receive", time.monotonic() - started)
+        for event_type, payload in events:
+            await self.handle_webhook_event(
+                event_type, payload, source="poll", wildcard_only=True
+            )
+
+    async def _refresh_owner_repos(self, base_repo: str, headers: dict[str, str]) -> None:
+        """Refresh the repository list of an ``owner/*`` subscription every few hours."""
+        refreshed = self.owner_repos_refreshed.get(base_repo)
+        if refreshed is not None and time.monotonic() - refreshed < OWNER_REPO_REFRESH_HOURS * 3600:
+            return
+
+        owner = repo_owner(base_repo)
+        if base_repo not in self.owner_is_org:
+            if await self._check_repo(base_repo) is None:
+                logger.error(f"用户或组织 {owner} 不存在或无法访问")
+                return
+        url = (
+            GITHUB_ORG_REPOS_API_URL
+            if self.owner_is_org[base_repo]
+            else GITHUB_USER_REPOS_API_URL
+        ).format(owner=owner)
+
+        repos = []
+        for page in range(1, OWNER_REPO_MAX_PAGES + 1):
+            resp = await self.github.get(
+                url, params={"per_page": 100, "page": page}, headers=headers
+            )
+            if resp.status != 200:
+                logger.error(
+                    f"获取 {owner} 的仓库列表失败: {resp.status}: {resp.text()[:100]}"
+                )
+                return
+            items = resp.json() or []
+            repos.extend(item["full_name"] for item in items if item.get("full_name"))
+            if len(items) < 100:
+                break
+
+        self.owner_repos[base_repo] = repos
+        self.owner_repos_refreshed[base_repo] = time.monotonic()
+        logger.info(f"已刷新 {base_repo} 的仓库列表，共 {len(repos)} 个仓库")
+
     async def _fetch_new_items(
         self,
         repo: str,
@@ -616,6 +1406,7 @@ class MyPlugin(Star):
         *,
         fetch_repo_level: bool = True,
         fetch_commits: bool = True,
+        plan: RepoPlan | None = None,
     ):
         """Fetch new issues, PRs, commits, and releases from a repository since last check.
 
@@ -626,8 +1417,10 @@ class MyPlugin(Star):
         ``fetch_repo_level`` controls whether issues/PRs/releases are checked
         (these are repository-level). ``fetch_commits`` controls whether
         commits are checked (branch-scoped when a branch is present).
+        ``plan`` narrows the repository-level requests to the endpoints the
+        subscriptions need; without it issues, PRs and releases are all checked.
         """
-        base_repo, branch = self._parse_repo_key(repo)
+        base_repo, branch = parse_repo_key(repo)
         branch_suffix = f" ({branch} 分支)" if branch else ""
 
         if not last_check:
@@ -644,104 +1437,84 @@ class MyPlugin(Star):
 
             logger.debug(f"仓库 {repo}{branch_suffix} 的上次检查时间: {last_check_dt.isoformat()}")
             new_items = []
+            headers = await self._get_github_headers(base_repo)
 
-            async with aiohttp.ClientSession() as session:
-                if fetch_repo_level:
-                    # 1. Fetch Issues / PRs (repository-level)
-                    try:
-                        params_issues = {
-                            "sort": "created",
-                            "direction": "desc",
-                            "state": "all",
-                            "per_page": 10,
-                            "since": last_check_dt.isoformat() + "Z",
-                        }
-                        async with session.get(
-                            GITHUB_ISSUES_API_URL.format(repo=base_repo),
-                            params=params_issues,
-                            headers=self._get_github_headers(),
-                        ) as resp:
-                            if resp.status == 200:
-                                items = await resp.json()
-                                for item in items:
-                                    github_timestamp = item["created_at"].replace("Z", "")
-                                    created_at = datetime.fromisoformat(github_timestamp).replace(tzinfo=None)
-                                    if created_at > last_check_dt:
-                                        logger.info(f"发现新的 item #{item.get('number')} in {base_repo}")
-                                        new_items.append(item)
-                                    else:
-                                        break
-                            else:
-                                text = await resp.text()
-                                logger.error(f"获取仓库 {base_repo} 的 Issue/PR 失败: {resp.status}: {text[:100]}")
-                    except Exception as e:
-                        logger.error(f"获取仓库 {base_repo} 的 Issue/PR 时出错: {e}")
-
-                if fetch_commits:
-                    # 2. Fetch Commits (optionally scoped to a branch)
-                    try:
-                        params_commits: dict[str, Any] = {
-                            "per_page": 100,
-                            "since": last_check_dt.isoformat() + "Z",
-                        }
-                        if branch:
-                            params_commits["sha"] = branch
-                        async with session.get(
-                            GITHUB_COMMITS_API_URL.format(repo=base_repo),
-                            params=params_commits,
-                            headers=self._get_github_headers(),
-                        ) as resp:
-                            if resp.status == 200:
-                                commits = await resp.json()
-                                if isinstance(commits, list):
-                                    for commit in commits:
-                                        commit_date_str = commit.get("commit", {}).get("committer", {}).get("date", "")
-                                        if not commit_date_str:
-                                            continue
-                                        github_timestamp = commit_date_str.replace("Z", "")
-                                        created_at = datetime.fromisoformat(github_timestamp).replace(tzinfo=None)
-                                        if created_at > last_check_dt:
-                                            logger.info(f"发现新的 commit {commit.get('sha')[:7]} in {repo}{branch_suffix}")
-                                            commit["_astrbot_type"] = "commit"
-                                            commit["_astrbot_branch"] = branch
-                                            new_items.append(commit)
-                                        else:
-                                            break
-                            else:
-                                text = await resp.text()
-                                logger.error(f"获取仓库 {repo}{branch_suffix} 的 Commits 失败: {resp.status}: {text[:100]}")
-                    except Exception as e:
-                        logger.error(f"获取仓库 {repo}{branch_suffix} 的 Commits 时出错: {e}")
-
-                if fetch_repo_level:
-                    # 3. Fetch Releases (repository-level)
-                    try:
-                        params_releases = {"per_page": 5}
-                        async with session.get(
-                            GITHUB_RELEASES_API_URL.format(repo=base_repo),
-                            params=params_releases,
-                            headers=self._get_github_headers(),
-                        ) as resp:
-                            if resp.status == 200:
-                                releases = await resp.json()
-                                if isinstance(releases, list):
-                                    for release in releases:
-                                        release_date_str = release.get("published_at") or release.get("created_at") or ""
-                                        if not release_date_str:
-                                            continue
-                                        github_timestamp = release_date_str.replace("Z", "")
-                                        created_at = datetime.fromisoformat(github_timestamp).replace(tzinfo=None)
-                                        if created_at > last_check_dt:
-                                            logger.info(f"发现新的 release {release.get('tag_name')} in {base_repo}")
-                                            release["_astrbot_type"] = "release"
-                                            new_items.append(release)
-                                        else:
-                                            break
-                            else:
-                                text = await resp.text()
-                                logger.error(f"获取仓库 {base_repo} 的 Releases 失败: {resp.status}: {text[:100]}")
-                    except Exception as e:
-                        logger.error(f"获取仓库 {base_repo} 的 Releases 时出错: {e}")
+            fetch_items = fetch_repo_level and (plan is None or plan.items is not None)
+            fetch_releases = fetch_repo_level and (plan is None or plan.releases)
+            if fetch_items:
+                # 1. Fetch Issues / PRs (repository-level)
+                try:
+                    params_issues = {
+                        "sort": "created",
+                        "direction": "desc",
+                        "state": "all",
+                        "per_page": 10,
+                    }
+                    if plan is not None and plan.items == ITEMS_PULLS:
+                        # PR-only subscriptions skip the issues; pulls has no "since"
+                        url = GITHUB_PULLS_API_URL.format(repo=base_repo)
+                    else:
+                        url = GITHUB_ISSUES_API_URL.format(repo=base_repo)
+                        params_issues["since"] = last_check_dt.isoformat() + "Z"
+                    resp = await self.github.get(url, params=params_issues, headers=headers)
+                    if resp.status == 200:
+                        items = resp.json()
+                        for item in items:
+                            github_timestamp = item["created_at"].replace("Z", "")
+                            created_at = datetime.fromisoformat(github_timestamp).replace(tzinfo=None)
+                            if created_at <= last_check_dt:
+                                break
+                            if "head" in item:
+                                # Mark pulls objects the way the issues API marks PRs
+                                item.setdefault("pull_request", {"html_url": item.get("html_url")})
+                            elif plan is not None and plan.drop_prs and "pull_request" in item:
+                                continue
+                            logger.info(f"发现新的 item #{item.get('number')} in {base_repo}")
+                            new_items.append(item)
+                    else:
+                        logger.error(f"获取仓库 {base_repo} 的 Issue/PR 失败: {resp.status}: {resp.text()[:100]}")
+                except Exception as e:
+                    logger.error(f"获取仓库 {base_repo} 的 Issue/PR 时出错: {e}")
+
+            if fetch_commits:
+                # 2. Fetch Commits (optionally scoped to a branch)
+                try:
+                    new_items.extend(
+                        await self._fetch_branch_commits(
+                            repo, branch, headers, last_check_dt
+                        )
+                    )
+                except Exception as e:
+                    logger.error(f"获取仓库 {repo}{branch_suffix} 的 Commits 时出错: {e}")
+
+            if fetch_releases:
+                # 3. Fetch Releases (repository-level)
+                try:
+                    params_releases = {"per_page": 5}
+                    resp = await self.github.get(
+                        GITHUB_RELEASES_API_URL.format(repo=base_repo),
+                        params=params_releases,
+                        headers=headers,
+                    )
+                    if resp.status == 200:
+                        releases = resp.json()
+                        if isinstance(releases, list):
+                            for release in releases:
+                                release_date_str = release.get("published_at") or release.get("created_at") or ""
+                                if not release_date_str:
+                                    continue
+                                github_timestamp = release_date_str.replace("Z", "")
+                                created_at = datetime.fromisoformat(github_timestamp).replace(tzinfo=None)
+                                if created_at > last_check_dt:
+                                    logger.info(f"发现新的 release {release.get('tag_name')} in {base_repo}")
+                                    release["_astrbot_type"] = "release"
+                                    new_items.append(release)
+                                else:
+                                    break
+                    else:
+                        logger.error(f"获取仓库 {base_repo} 的 Releases 失败: {resp.status}: {resp.text()[:100]}")
+                except Exception as e:
+                    logger.error(f"获取仓库 {base_repo} 的 Releases 时出错: {e}")
 
             if new_items:
                 logger.info(f"找到 {len(new_items)} 个新的 items 在 {repo}{branch_suffix}")
@@ -764,21 +1537,160 @@ class MyPlugin(Star):
             )
             return []
 
-    async def _notify_subscribers(self, repo: str, new_items: list[dict[str, Any]]):
+    async def _fetch_branch_commits(
+        self,
+        repo: str,
+        branch: str | None,
+        headers: dict[str, str],
+        last_check_dt: datetime,
+    ) -> list[dict[str, Any]]:
+        """Fetch commits pushed to a branch since the last notified head.
+
+        The branch head is looked up first with a conditional request, so an
+        idle branch costs a single 304. When the head has moved, the compare
+        API returns exactly the commits between the last notified SHA and the
+        new head, which also covers rebased or back-dated commits.
+        """
+        base_repo, _ = parse_repo_key(repo)
+        branch_suffix = f" ({branch} 分支)" if branch else ""
+
+        head_headers = {**headers, "Accept": "application/vnd.github.sha"}
+        etag = self.branch_head_etags.get(repo)
+        if etag:
+            head_headers["If-None-Match"] = etag
+        resp = await self.github.get(
+            GITHUB_COMMIT_API_URL.format(repo=base_repo, ref=branch or "HEAD"),
+            headers=head_headers,
+        )
+        if resp.status == 304:
+            logger.debug(f"仓库 {repo}{branch_suffix} 的分支头未变化，跳过")
+            return []
+        if resp.status != 200:
+            logger.error(f"获取仓库 {repo}{branch_suffix} 的分支头失败: {resp.status}: {resp.text()[:100]}")
+            return []
+        head_sha = resp.text().strip()
+        new_etag = resp.headers.get("ETag")
+
+        previous_sha = self.branch_heads.get(repo)
+        if new_etag:
+            self.branch_head_etags[repo] = new_etag
+        if head_sha == previous_sha:
+            return []
+        self.branch_heads[repo] = head_sha
+
+        commits: list[dict[str, Any]] | None = None
+        if previous_sha:
+            resp = await self.github.get(
+                GITHUB_COMPARE_API_URL.format(
+                    repo=base_repo, base=previous_sha, head=head_sha
+                ),
+                headers=headers,
+            )
+            if resp.status == 200:
+                data = resp.json()
+                # Compare lists commits oldest first; notify newest first
+                commits = list(reversed(data.get("commits") or []))
+                if data.get("total_commits", 0) > len(commits):
+                    logger.warning(
+                        f"仓库 {repo}{branch_suffix} 新提交过多，仅通知最近 {len(commits)} 个"
+                    )
+            else:
+                logger.debug(
+                    f"比较 {previous_sha[:7]}...{head_sha[:7]} 失败 ({resp.status})，回退到按时间获取提交"
+                )
+
+        if commits is None:
+            # No usable base SHA yet (first cycle or history rewritten)
+            commits = await self._fetch_commits_since(
+                repo, branch, headers, last_check_dt
+            )
+
+        for commit in commits:
+            logger.info(f"发现新的 commit {commit.get('sha', '')[:7]} in {repo}{branch_suffix}")
+            commit["_astrbot_type"] = "commit"
+            commit["_astrbot_branch"] = branch
+        return commits
+
+    async def _fetch_commits_since(
+        self,
+        repo: str,
+        branch: str | None,
+        headers: dict[str, str],
+        last_check_dt: datetime,
+    ) -> list[dict[str, Any]]:
+        """Fetch commits on a branch whose committer date is after ``last_check_dt``."""
+        base_repo, _ = parse_repo_key(repo)
+        params_commits: dict[str, Any] = {
+            "per_page": 100,
+            "since": last_check_dt.isoformat() + "Z",
+        }
+        if branch:
+            params_commits["sha"] = branch
+        new_commits = []
+        resp = await self.github.get(
+            GITHUB_COMMITS_API_URL.format(repo=base_repo),
+            params=params_commits,
+            headers=headers,
+        )
+        if resp.status != 200:
+            logger.error(f"获取仓库 {repo} 的 Commits 失败: {resp.status}: {resp.text()[:100]}")
+            return []
+        commits = resp.json()
+        if isinstance(commits, list):
+            for commit in commits:
+                commit_date_str = commit.get("commit", {}).get("committer", {}).get("date", "")
+                if not commit_date_str:
+                    continue
+                github_timestamp = commit_date_str.replace("Z", "")
+                created_at = datetime.fromisoformat(github_timestamp).replace(tzinfo=None)
+                if created_at > last_check_dt:
+                    new_commits.append(commit)
+                else:
+                    break
+        return new_commits
+
+    def _record_event(self, record: dict[str, Any]) -> None:
+        """Feed a processed event to the event log, digest aggregates and activity counts."""
+        self.digest.add(record)
+        self.activity.add(record)
+        if not self.event_log:
+            return
+        try:
+            self.event_log.append(record)
+        except Exception as e:
+            logger.error(f"写入事件日志失败: {e}")
+
+    async def _notify_subscribers(
+        self, subscription: Subscription, new_items: list[dict[str, Any]]
+    ):
         """Notify subscribers about new issues and PRs"""
+        # Drop items the subscription does not want once, before any formatting
+        match_started = time.monotonic()
+        predicate = subscription.predicate
+        new_items = [
+            item
+            for item in new_items
+            if subscription.allows(self._item_event_name(item))
+            and (predicate is None or predicate(facts_from_item(item)))
+        ]
         if not new_items:
             return
+        self.tracer.record("poll", "match", time.monotonic() - match_started)
+        traces = {
+            id(item): self.tracer.start("poll", poll_item_time(item)) for item in new_items
+        }
 
-        repo_key = self._resolve_repo_key(repo) or repo
-        base_repo, branch, _ = self._parse_subscription_key(repo_key)
+        base_repo = subscription.base_repo
+        branch = subscription.branch
         branch_suffix = f" ({branch} 分支)" if branch else ""
 
-        for subscriber_id in self.subscriptions.get(repo_key, []):
+        for subscriber_id in list(subscription.subscribers):
             try:
                 # Create notification message
                 for item in new_items:
-                    if not self._subscription_allows(repo_key, self._item_event_name(item)):
-                        continue
+                    # Time since the item was matched, or since its previous send
+                    trace = traces[id(item)]
+                    trace.mark("enqueue")
                     if "_astrbot_type" in item:
                         if item["_astrbot_type"] == "commit":
                             sha = item.get("sha", "")[:7]
@@ -815,11 +1727,13 @@ class MyPlugin(Star):
                             f"作者: {item['user']['login']}\n"
                             f"链接: {item['html_url']}"
                         )
+                    trace.mark("format")
 
                     # Send message to subscriber
                     await self.context.send_message(
                         subscriber_id, MessageChain(chain=[Comp.Plain(message)])
                     )
+                    trace.sent()
 
                     # Add a small delay between messages to avoid rate limiting
                     await asyncio.sleep(1)
@@ -827,9 +1741,23 @@ class MyPlugin(Star):
                 logger.error(f"向订阅者 {subscriber_id} 发送通知时出错: {e}")
 
     async def handle_webhook_event(
-        self, event_type: str, payload: dict[str, Any]
+        self,
+        event_type: str,
+        payload: dict[str, Any],
+        *,
+        source: str = "webhook",
+        stages: dict[str, float] | None = None,
+        wildcard_only: bool = False,
     ) -> None:
-        """Process incoming GitHub webhook events."""
+        """Process incoming GitHub webhook events.
+
+        ``source`` is ``"poll"`` when the payload was converted from the
+        events API rather than delivered by GitHub. ``stages`` carries the
+        receive/verify/parse durations measured by the webhook server.
+        ``wildcard_only`` limits delivery to ``owner/*`` subscriptions, for
+        events polled from an owner-wide feed.
+        """
+        trace = self.tracer.start(source, webhook_event_time(payload))
         if event_type == "ping":
             logger.info("收到 GitHub Webhook ping 事件")
             return
@@ -844,28 +1772,55 @@ class MyPlugin(Star):
             logger.warning("GitHub Webhook 事件缺少仓库全名")
             return
 
-        event_name = self._webhook_event_name(event_type)
+        if self.hybrid_mode and source == "webhook":
+            now = time.monotonic()
+            repo_norm = self._normalize_repo_name(repo_full_name)
+            self.webhook_last_seen[repo_norm] = now
+            # An organization webhook covers the owner/* subscription as well
+            self.webhook_last_seen[f"{repo_owner(repo_norm)}/{WILDCARD_REPO}"] = now
+
+        event_mask = event_bit(event_type)
         event_branch = self._extract_webhook_branch(event_type, payload)
-        normalized_repo = self._normalize_repo_name(repo_full_name)
-        matching_keys = []
-        for key, subscribers in self.subscriptions.items():
-            if not subscribers:
-                continue
-            base_repo, branch, _ = self._parse_subscription_key(key)
-            if self._normalize_repo_name(base_repo) != normalized_repo:
+        event_branch_norm = self._normalize_repo_name(event_branch) if event_branch else None
+        matching_subs: list[Subscription] = []
+        for sub in self.subscriptions.matching(repo_full_name, wildcard_only=wildcard_only):
+            if not sub.subscribers:
                 continue
-            if branch and event_branch and self._normalize_repo_name(branch) != self._normalize_repo_name(event_branch):
+            if sub.branch_norm and event_branch_norm and sub.branch_norm != event_branch_norm:
                 continue
-            if branch and event_branch is None and event_type in {"push", "create"}:
+            if sub.branch and event_branch is None and event_type in {"push", "create"}:
                 continue
-            if self._subscription_allows(key, event_name):
-                matching_keys.append(key)
+            if sub.allows_mask(event_mask):
+                matching_subs.append(sub)
 
-        if not matching_keys:
+        if not matching_subs:
             logger.debug(
                 f"忽略仓库 {repo_full_name} 的 Webhook 事件 {event_type}: 未找到匹配订阅"
             )
             return
+        # Only deliveries that reach a subscriber count towards the stage figures
+        for stage, seconds in (stages or {}).items():
+            trace.add(stage, seconds)
+
+        self._record_event(summarize_webhook_event(event_type, payload))
+        subject = payload.get("pull_request") or payload.get("issue")
+        if self.issue_mirror and isinstance(subject, dict):
+            self.issue_mirror.upsert(repo_full_name, subject)
+
+        # Drop subscriptions whose filters reject the event before formatting it
+        if any(sub.predicate for sub in matching_subs):
+            facts = facts_from_webhook(event_type, payload)
+            matching_subs = [
+                sub
+                for sub in matching_subs
+                if sub.predicate is None or sub.predicate(facts)
+            ]
+            if not matching_subs:
+                logger.debug(
+                    f"仓库 {repo_full_name} 的 Webhook 事件 {event_type} 被订阅过滤条件排除"
+                )
+                return
+        trace.mark("match")
 
         sender = payload.get("sender")
         action = payload.get("action", "")
@@ -959,20 +1914,378 @@ class MyPlugin(Star):
         if not message:
             logger.debug(f"Webhook 事件 {event_type} 未生成通知，可能是不支持的 action")
             return
+        trace.mark("format")
 
-        sent_to: set[str] = set()
-        for repo_key in matching_keys:
-            for subscriber_id in self.subscriptions.get(repo_key, []):
-                if subscriber_id in sent_to:
-                    continue
-                sent_to.add(subscriber_id)
-                try:
-                    await self.context.send_message(
-                        subscriber_id, MessageChain(chain=[Comp.Plain(message)])
-                    )
-                    await asyncio.sleep(1)
-                except Exception as exc:
-                    logger.error(f"向订阅者 {subscriber_id} 发送 Webhook 通知时出错: {exc}")
+        recipients = list(
+            dict.fromkeys(
+                subscriber_id for sub in matching_subs for subscriber_id in sub.subscribers
+            )
+        )
+        if self.storms and event_type in AGGREGATED_EVENTS:
+            self.storms.add(
+                repo_full_name,
+                recipients,
+                event_type,
+                action,
+                (sender or {}).get("login"),
+                message,
+            )
+            return
+        # Review comments, comment threads and repeated edits become one message
+        hold = coalesce_target(event_type, action, payload) if self.coalescer else None
+        if self.coalescer and hold:
+            group, title, entity, lead = hold
+            self.coalescer.add(
+                repo_full_name, recipients, group, title, entity, message, lead=lead
+            )
+            return
+
+        for subscriber_id in recipients:
+            try:
+                # Waiting for the previous subscriber's pacing delay is queueing time
+                trace.mark("enqueue")
+                await self.context.send_message(
+                    subscriber_id, MessageChain(chain=[Comp.Plain(message)])
+                )
+                trace.sent()
+                await asyncio.sleep(1)
+            except Exception as exc:
+                logger.error(f"向订阅者 {subscriber_id} 发送 Webhook 通知时出错: {exc}")
+
+    @filter.command("ghhistory", alias={"ghhist"})
+    async def show_history(
+        self, event: AstrMessageEvent, repo: str, since: str | None = None
+    ):
+        """查看仓库近期事件记录（不调用 GitHub API）。例如: /ghhistory AstrBotDev/AstrBot 24h，时间范围支持 today、12h、3d 或 2024-01-31，默认 24h"""
+        if not self.event_log:
+            yield event.plain_result("事件日志未启用，请在配置中设置事件日志保留天数")
+            return
+        if not self._is_valid_repo(repo):
+            yield event.plain_result("请提供有效的仓库名，格式为: 用户名/仓库名")
+            return
+
+        since_ts = self._parse_since(since or "24h")
+        if since_ts is None:
+            yield event.plain_result("无效的时间范围，支持 today、12h、3d 或 2024-01-31")
+            return
+
+        records = self.event_log.query(repo, since_ts, limit=30)
+        if not records:
+            yield event.plain_result(f"仓库 {repo} 在该时间范围内没有事件记录")
+            return
+
+        lines = [f"📜 {repo} 的事件记录 (共 {len(records)} 条):"]
+        for record in records:
+            when = datetime.fromtimestamp(record["ts"]).strftime("%m-%d %H:%M")
+            number = f"#{record['number']} " if record.get("number") else ""
+            action = f"/{record['action']}" if record.get("action") else ""
+            actor = f" - {record['actor']}" if record.get("actor") else ""
+            lines.append(
+                f"{when} [{record['type']}{action}] {number}{record.get('title', '')}{actor}"
+            )
+        yield event.plain_result("\n".join(lines))
+
+    @filter.command("ghactivity", alias={"ghact"})
+    async def show_activity(self, event: AstrMessageEvent, repo: str = "", span: str = "7d"):
+        """查看仓库近期活动走势（不调用 GitHub API）。例如: /ghactivity AstrBotDev/AstrBot 3d，时间范围支持 12h、3d 等，默认 7d"""
+        if not repo:
+            repo = self.default_repos.get(event.unified_msg_origin, "")
+        if not self._is_valid_repo(repo):
+            yield event.plain_result("请提供有效的仓库名，格式为: 用户名/仓库名")
+            return
+
+        match = re.fullmatch(r"(\d+)([hd])", span.strip().lower())
+        if not match or int(match.group(1)) == 0:
+            yield event.plain_result("无效的时间范围，支持 12h、3d 等格式")
+            return
+        hours = int(match.group(1)) * (24 if match.group(2) == "d" else 1)
+        if hours > self.activity.size:
+            hours = self.activity.size
+        report = self.activity.report(repo, hours)
+        if report is None:
+            yield event.plain_result(f"还没有仓库 {repo} 的活动记录，订阅后会开始统计")
+            return
+        yield event.plain_result(report)
+
+    def _parse_since(self, value: str) -> float | None:
+        """Parse a history time range into a UNIX timestamp."""
+        value = value.strip().lower()
+        now = datetime.now()
+        if value == "today":
+            return now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        match = re.fullmatch(r"(\d+)([hd])", value)
+        if match:
+            hours = int(match.group(1)) * (24 if match.group(2) == "d" else 1)
+            return now.timestamp() - hours * 3600
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+
+    @filter.command("ghdigest")
+    async def set_digest(self, event: AstrMessageEvent, period: str | None = None):
+        """订阅定时仓库摘要。用法: /ghdigest daily|weekly|off，/ghdigest preview 预览当前周期摘要"""
+        umo = event.unified_msg_origin
+        current = self.digest_subscribers.get(umo)
+        if period is None:
+            if current:
+                yield event.plain_result(
+                    f"当前会话已订阅{PERIOD_LABELS[current]}摘要，每天 {self.digest_hour}:00 后发送"
+                    + ("（每周一）" if current == "weekly" else "")
+                )
+            else:
+                yield event.plain_result("当前会话未订阅摘要，可使用 /ghdigest daily 或 /ghdigest weekly 订阅")
+            return
+
+        period = period.lower()
+        if period == "off":
+            if self.digest_subscribers.pop(umo, None):
+                self._save_digest_state()
+                yield event.plain_result("已取消当前会话的仓库摘要")
+            else:
+                yield event.plain_result("当前会话未订阅摘要")
+            return
+        if period == "preview":
+            preview_period = current or "daily"
+            yield event.plain_result(
+                format_digest(
+                    preview_period,
+                    self._subscribed_base_repos(umo),
+                    self.digest.periods[preview_period],
+                    "（预览）",
+                    self._digest_note(),
+                )
+            )
+            return
+        if period not in DIGEST_PERIODS:
+            yield event.plain_result("无效的参数，请使用 daily、weekly、off 或 preview")
+            return
+
+        self.digest_subscribers[umo] = period
+        self._save_digest_state()
+        yield event.plain_result(
+            f"已订阅{PERIOD_LABELS[period]}摘要，将汇总当前会话订阅的仓库动态"
+        )
+
+    def _subscribed_base_repos(self, subscriber_id: str) -> list[str]:
+        """Return the distinct base repositories a conversation subscribes to.
+
+        ``owner/*`` subscriptions expand to the owner's repositories that
+        have digest activity.
+        """
+        repos = []
+        for subscription in self.subscriptions.for_subscriber(subscriber_id):
+            if subscription.is_wildcard:
+                owner = repo_owner(subscription.base_repo).lower()
+                expanded = [
+                    repo
+                    for aggregates in self.digest.periods.values()
+                    for repo in aggregates
+                    if repo_owner(repo) == owner
+                ]
+            else:
+                expanded = [subscription.base_repo]
+            for repo in expanded:
+                if repo not in repos:
+                    repos.append(repo)
+        return repos
+
+    def _digest_note(self) -> str:
+        """Explain the counts a digest lacks when updates come from classic polling."""
+        if not self.enable_polling or self.poll_backend != "classic":
+            return ""
+        scope = "轮询的仓库" if self.hybrid_mode else "classic 轮询"
+        return f"注: {scope}只能发现新建的 Issue/PR、提交和 Release，关闭、合并与 Star 变化不计入统计"
+
+    def _digest_period_id(self, period: str, now: datetime) -> str:
+        """Return the id of the latest digest period that has come due by ``now``.
+
+        Daily digests are due at ``digest_hour`` every day, weekly ones on
+        Mondays at that hour. A digest missed while the bot was down is
+        sent late rather than skipped, because the id only moves on once
+        the next one comes due.
+        """
+        due = now.replace(hour=self.digest_hour, minute=0, second=0, microsecond=0)
+        if due > now:
+            due -= timedelta(days=1)
+        if period == "daily":
+            return due.strftime("%Y-%m-%d")
+        due -= timedelta(days=due.weekday())
+        year, week, _ = due.isocalendar()
+        return f"{year}-W{week:02d}"
+
+    async def _digest_loop(self):
+        """Send scheduled digests and periodically persist the aggregates."""
+        try:
+            ticks = 0
+            while True:
+                await asyncio.sleep(60)
+                ticks += 1
+                now = datetime.now()
+                for period in DIGEST_PERIODS:
+                    period_id = self._digest_period_id(period, now)
+                    if period not in self.digest_last_sent:
+                        # First run: start counting instead of sending a partial digest
+                        self.digest_last_sent[period] = period_id
+                        self._save_digest_state()
+                    elif self.digest_last_sent[period] != period_id:
+                        try:
+                            await self._send_digests(period)
+                        except Exception as e:
+                            logger.error(f"发送仓库摘要时出错: {e}")
+                        self.digest_last_sent[period] = period_id
+                        self._save_digest_state()
+                if ticks % 10 == 0:
+                    self._save_digest_state()
+                    if self._activity is not None:
+                        self._save_activity()
+        except asyncio.CancelledError:
+            pass
+
+    async def _send_plain(self, subscriber_id: str, message: str) -> None:
+        """Send a text notification, pausing afterwards to avoid rate limiting."""
+        await self.context.send_message(
+            subscriber_id, MessageChain(chain=[Comp.Plain(message)])
+        )
+        await asyncio.sleep(1)
+
+    async def _send_digests(self, period: str) -> None:
+        aggregates = self.digest.take(period)
+        for subscriber_id, subscribed_period in list(self.digest_subscribers.items()):
+            if subscribed_period != period:
+                continue
+            message = format_digest(
+                period,
+                self._subscribed_base_repos(subscriber_id),
+                aggregates,
+                note=self._digest_note(),
+            )
+            try:
+                await self.context.send_message(
+                    subscriber_id, MessageChain(chain=[Comp.Plain(message)])
+                )
+                await asyncio.sleep(1)
+            except Exception as e:
+                logger.error(f"向订阅者 {subscriber_id} 发送摘要时出错: {e}")
+
+    async def _issue_mirror_loop(self):
+        """Keep the issue mirror of subscribed repositories current."""
+        try:
+            while True:
+                mirror = self.issue_mirror
+                if mirror is not None:
+                    repos = {
+                        repo for repo in self.subscriptions.by_repo() if not is_wildcard_repo(repo)
+                    }
+                    mirror.retain(repos)
+                    for base_repo in sorted(repos):
+                        try:
+                            await self._sync_issue_mirror(base_repo)
+                        except Exception as e:
+                            logger.error(f"同步仓库 {base_repo} 的 Issue 镜像时出错: {e}")
+                    mirror.save()
+                await asyncio.sleep(max(1, self.issue_mirror_sync_minutes) * 60)
+        except asyncio.CancelledError:
+            logger.info("停止同步 Issue 镜像")
+
+    async def _sync_issue_mirror(self, base_repo: str) -> None:
+        """Fetch issues/PRs updated since the last sync into the mirror.
+
+        The first page is requested conditionally, so a repository without
+        changes costs a single 304 that does not count against the rate limit.
+        """
+        mirror = self.issue_mirror.track(base_repo)
+        headers = await self._get_github_headers(base_repo)
+        params: dict[str, Any] = {
+            "state": "all",
+            "sort": "updated",
+            "direction": "desc",
+            "per_page": 100,
+        }
+        if mirror.since:
+            params["since"] = mirror.since
+
+        count = 0
+        # Only listings advance the cursor; webhook updates may skip over older changes
+        newest = mirror.since or ""
+        for page in range(1, ISSUE_MIRROR_MAX_PAGES + 1):
+            request_headers = headers
+            if page == 1 and mirror.etag:
+                request_headers = {**headers, "If-None-Match": mirror.etag}
+            resp = await self.github.get(
+                GITHUB_ISSUES_API_URL.format(repo=base_repo),
+                params={**params, "page": page},
+                headers=request_headers,
+            )
+            if resp.status == 304:
+                break
+            if resp.status != 200:
+                logger.error(
+                    f"同步仓库 {base_repo} 的 Issue 镜像失败: {resp.status}: {resp.text()[:100]}"
+                )
+                return
+            if page == 1:
+                mirror.etag = resp.headers.get("ETag")
+            items = resp.json() or []
+            for item in items:
+                mirror.upsert(mirror_entry(item))
+                newest = max(newest, item.get("updated_at") or "")
+            count += len(items)
+            if len(items) < params["per_page"]:
+                break
+
+        mirror.synced_at = time.time()
+        mirror.since = newest or None
+        if count:
+            self.issue_mirror.dirty = True
+            logger.debug(f"仓库 {base_repo} 的 Issue 镜像更新了 {count} 条")
+
+    @filter.command("ghsearch", alias={"ghs"})
+    async def search_issues(self, event: AstrMessageEvent, repo: str = "", query: str = ""):
+        """在本地镜像中搜索已订阅仓库的 Issue/PR。例如: /ghsearch AstrBotDev/AstrBot 插件 报错 is:open"""
+        if not self.issue_mirror:
+            yield event.plain_result("Issue 镜像未启用，请在配置中开启「启用 Issue 镜像」")
+            return
+
+        # The query may contain spaces, so read it from the raw message
+        words = (event.message_str or "").split()[1:]
+        if words and self._is_valid_repo(words[0]):
+            repo, words = words[0], words[1:]
+        else:
+            repo = self.default_repos.get(event.unified_msg_origin, "")
+        if not repo or not words:
+            yield event.plain_result(
+                "用法: /ghsearch 用户名/仓库名 关键词 [is:open|is:closed] [is:pr|is:issue]"
+            )
+            return
+
+        mirror = self.issue_mirror.repo(repo)
+        if mirror is None or not mirror.entries:
+            yield event.plain_result(
+                f"仓库 {repo} 不在本地镜像中，仅已订阅的仓库会被镜像，新订阅需等待下一次同步"
+            )
+            return
+
+        started = time.perf_counter()
+        total, results = mirror.search(" ".join(words))
+        elapsed = (time.perf_counter() - started) * 1000
+        if not results:
+            yield event.plain_result(f"在 {repo} 中没有找到匹配的 Issue/PR")
+            return
+
+        lines = [f"🔎 {repo} 的搜索结果 (共 {total} 条，耗时 {elapsed:.1f}ms):"]
+        for entry in results:
+            kind = "PR" if "pull_request" in entry else "Issue"
+            if entry.get("merged"):
+                state = "已合并"
+            else:
+                state = "开启" if entry["state"] == "open" else "已关闭"
+            lines.append(
+                f"#{entry['number']} [{kind}/{state}] {entry['title']} - {entry['user']['login']}"
+            )
+        if total > len(results):
+            lines.append(f"... 仅显示前 {len(results)} 条")
+        yield event.plain_result("\n".join(lines))
 
     @filter.command("ghissue", alias={"ghis"})
     async def get_issue_details(self, event: AstrMessageEvent, issue_ref: str):
@@ -987,7 +2300,13 @@ class MyPlugin(Star):
             return
 
         try:
-            issue_data = await self._fetch_issue_data(repo, issue_number)
+            issue_data = None
+            if self.issue_mirror:
+                issue_data = self.issue_mirror.get(
+                    repo, issue_number, self.issue_mirror_fresh_minutes * 60
+                )
+            if issue_data is None:
+                issue_data = await self._fetch_issue_data(repo, issue_number)
             if not issue_data:
                 yield event.plain_result(
                     f"无法获取 Issue {repo}#{issue_number} 的信息，可能不存在或无访问权限"
@@ -1000,13 +2319,11 @@ class MyPlugin(Star):
 
             # Send the issue card image if available
             if issue_data.get("html_url"):
-                hash_value = uuid.uuid4().hex
                 url_path = issue_data["html_url"].replace("https://github.com/", "")
-                card_url = GITHUB_REPO_OPENGRAPH.format(
-                    hash=hash_value, appendix=url_path
-                )
                 try:
-                    yield event.image_result(card_url)
+                    card = await self._card_image("issue", url_path, issue_data)
+                    if card:
+                        yield event.image_result(card)
                 except Exception as e:
                     logger.error(f"下载 Issue 卡片图片失败: {e}")
 
@@ -1038,13 +2355,11 @@ class MyPlugin(Star):
 
             # Send the PR card image if available
             if pr_data.get("html_url"):
-                hash_value = uuid.uuid4().hex
                 url_path = pr_data["html_url"].replace("https://github.com/", "")
-                card_url = GITHUB_REPO_OPENGRAPH.format(
-                    hash=hash_value, appendix=url_path
-                )
                 try:
-                    yield event.image_result(card_url)
+                    card = await self._card_image("pr", url_path, pr_data)
+                    if card:
+                        yield event.image_result(card)
                 except Exception as e:
                     logger.error(f"下载 PR 卡片图片失败: {e}")
 
@@ -1074,10 +2389,13 @@ class MyPlugin(Star):
 
             # Next check if there's exactly one subscription
             if msg_origin:
-                user_subscriptions = []
-                for repo, subscribers in self.subscriptions.items():
-                    if msg_origin in subscribers:
-                        user_subscriptions.append(repo)
+                user_subscriptions = list(
+                    dict.fromkeys(
+                        subscription.base_repo
+                        for subscription in self.subscriptions.for_subscriber(msg_origin)
+                        if not subscription.is_wildcard
+                    )
+                )
 
                 if len(user_subscriptions) == 1:
                     return user_subscriptions[0], reference
@@ -1139,87 +2457,209 @@ class MyPlugin(Star):
             logger.error(f"获取 README 详情时出错: {e}")
             yield event.plain_result(f"获取 README 详情时出错: {str(e)}")
 
+    async def _card_image(
+        self, kind: str, url_path: str, data: dict[str, Any] | None = None
+    ) -> str | None:
+        """Return a card image for ``url_path``, e.g. ``owner/repo`` or ``owner/repo/pull/1``.
+
+        GitHub's OpenGraph card is preferred. When it is slow or missing,
+        e.g. for private repositories, a card is drawn locally from API data.
+        Without the local renderer the OpenGraph URL is returned as before.
+        """
+        opengraph_url = GITHUB_REPO_OPENGRAPH.format(hash=uuid.uuid4().hex, appendix=url_path)
+        if self.card_renderer is None:
+            return opengraph_url
+
+        if not (data or {}).get("private"):
+            stamp = (data or {}).get("updated_at")
+            image = await self.card_renderer.opengraph(opengraph_url, url_path, stamp)
+            if image:
+                return image
+
+        if data is None:
+            parts = url_path.split("/")
+            repo = "/".join(parts[:2])
+            if kind == "repo":
+                data = await self._fetch_repo_data(repo)
+            elif kind == "issue" and len(parts) >= 4:
+                data = await self._fetch_issue_data(repo, parts[3])
+            elif kind == "pr" and len(parts) >= 4:
+                data = await self._fetch_pr_data(repo, parts[3])
+        if not data:
+            return None
+        try:
+            return await self.card_renderer.render(kind, url_path, data)
+        except Exception as e:
+            logger.error(f"本地渲染 {url_path} 卡片失败: {e}")
+            return None
+
+    async def _fetch_repo_data(self, repo: str) -> dict[str, Any] | None:
+        """Fetch repository data from GitHub API"""
+        try:
+            headers = await self._get_github_headers(repo)
+            resp = await self.github.get(GITHUB_API_URL.format(repo=repo), headers=headers)
+            if resp.status == 200:
+                return resp.json()
+            else:
+                logger.error(f"获取仓库 {repo} 失败: {resp.status}")
+                return None
+        except Exception as e:
+            logger.error(f"获取仓库 {repo} 时出错: {e}")
+            return None
+
     async def _fetch_readme_data(self, repo: str) -> dict[str, Any] | None:
         """Fetch README data from GitHub API"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = GITHUB_README_API_URL.format(repo=repo)
-                async with session.get(url, headers=self._get_github_headers()) as resp:
-                    if resp.status == 200:
-                        return await resp.json()
-                    else:
-                        logger.error(f"获取 README {repo} 失败: {resp.status}")
-                        return None
-            except Exception as e:
-                logger.error(f"获取 README {repo} 时出错: {e}")
+        try:
+            url = GITHUB_README_API_URL.format(repo=repo)
+            headers = await self._get_github_headers(repo)
+            resp = await self.github.get(url, headers=headers)
+            if resp.status == 200:
+                return resp.json()
+            else:
+                logger.error(f"获取 README {repo} 失败: {resp.status}")
                 return None
+        except Exception as e:
+            logger.error(f"获取 README {repo} 时出错: {e}")
+            return None
 
     async def _fetch_issue_data(
         self, repo: str, issue_number: str
     ) -> dict[str, Any] | None:
         """Fetch issue data from GitHub API"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = GITHUB_ISSUE_API_URL.format(repo=repo, issue_number=issue_number)
-                async with session.get(url, headers=self._get_github_headers()) as resp:
-                    if resp.status == 200:
-                        return await resp.json()
-                    else:
-                        logger.error(
-                            f"获取 Issue {repo}#{issue_number} 失败: {resp.status}"
-                        )
-                        return None
-            except Exception as e:
-                logger.error(f"获取 Issue {repo}#{issue_number} 时出错: {e}")
+        try:
+            url = GITHUB_ISSUE_API_URL.format(repo=repo, issue_number=issue_number)
+            headers = await self._get_github_headers(repo)
+            resp = await self.github.get(url, headers=headers)
+            if resp.status == 200:
+                data = resp.json()
+                if self.issue_mirror:
+                    self.issue_mirror.upsert(repo, data)
+                return data
+            else:
+                logger.error(f"获取 Issue {repo}#{issue_number} 失败: {resp.status}")
                 return None
+        except Exception as e:
+            logger.error(f"获取 Issue {repo}#{issue_number} 时出错: {e}")
+            return None
 
     async def _fetch_pr_data(self, repo: str, pr_number: str) -> dict[str, Any] | None:
         """Fetch PR data from GitHub API"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = GITHUB_PR_API_URL.format(repo=repo, pr_number=pr_number)
-                async with session.get(url, headers=self._get_github_headers()) as resp:
-                    if resp.status == 200:
-                        return await resp.json()
-                    else:
-                        logger.error(f"获取 PR {repo}#{pr_number} 失败: {resp.status}")
-                        return None
-            except Exception as e:
-                logger.error(f"获取 PR {repo}#{pr_number} 时出错: {e}")
+        try:
+            url = GITHUB_PR_API_URL.format(repo=repo, pr_number=pr_number)
+            headers = await self._get_github_headers(repo)
+            resp = await self.github.get(url, headers=headers)
+            if resp.status == 200:
+                data = resp.json()
+                if self.issue_mirror:
+                    self.issue_mirror.upsert(repo, data)
+                return data
+            else:
+                logger.error(f"获取 PR {repo}#{pr_number} 失败: {resp.status}")
                 return None
+        except Exception as e:
+            logger.error(f"获取 PR {repo}#{pr_number} 时出错: {e}")
+            return None
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ghprof")
+    async def profile_plugin(self, event: AstrMessageEvent, action: str = "", seconds: int = 60):
+        """分析插件性能 (仅管理员)。用法: /ghprof start [秒数] | stop | dump"""
+        action = action.lower()
+        if action == "start":
+            if self.profiler is None:
+                from .profiler import PluginProfiler
+
+                self.profiler = PluginProfiler(PLUGIN_DIR, PROFILE_DIR)
+            window = max(1, min(int(seconds), 3600))
+            try:
+                self.profiler.start(window)
+            except ValueError as e:
+                yield event.plain_result(f"无法开始性能分析: {e}")
+                return
+            yield event.plain_result(
+                f"已开始性能分析，{window} 秒后自动停止，使用 /ghprof stop 提前结束"
+            )
+        elif action == "stop":
+            if not self.profiler or not self.profiler.stop():
+                yield event.plain_result("性能分析未在运行")
+                return
+            yield event.plain_result(self.profiler.report())
+        elif action == "dump":
+            if self.profiler and self.profiler.running:
+                yield event.plain_result("性能分析仍在运行，请先 /ghprof stop 或等待窗口结束")
+                return
+            report = self.profiler.report() if self.profiler else None
+            if report is None:
+                yield event.plain_result("还没有性能分析结果，请先 /ghprof start")
+                return
+            try:
+                path = self.profiler.dump()
+                report += f"\n\n完整结果已保存到 {path}，可用 snakeviz 等工具查看"
+            except OSError as e:
+                logger.error(f"保存性能分析结果失败: {e}")
+            yield event.plain_result(report)
+        else:
+            status = "运行中" if self.profiler and self.profiler.running else "未运行"
+            yield event.plain_result(
+                f"性能分析{status}。用法: /ghprof start [秒数] | stop | dump"
+            )
+
+    @filter.command("ghstats")
+    async def show_stats(self, event: AstrMessageEvent):
+        """查看通知各阶段耗时 (p50/p95/p99)，用于排查通知延迟"""
+        report = self.tracer.report()
+        if report is None:
+            yield event.plain_result("还没有通知投递记录")
+            return
+        yield event.plain_result(f"📊 通知投递各阶段耗时 (最近 {self.tracer.window} 次):\n{report}")
 
     @filter.command("ghlimit", alias={"ghrate"})
     async def check_rate_limit(self, event: AstrMessageEvent):
         """查看 GitHub API 速率限制状态"""
         try:
-            rate_limit_data = await self._fetch_rate_limit()
+            rate_limit_data = await self._fetch_rate_limit(
+                self.default_repos.get(event.unified_msg_origin)
+            )
             if not rate_limit_data:
                 yield event.plain_result("无法获取 GitHub API 速率限制信息")
                 return
 
             # Format and send the rate limit details
             result = self._format_rate_limit(rate_limit_data)
+            result += self._format_client_stats()
             yield event.plain_result(result)
 
         except Exception as e:
             logger.error(f"获取 API 速率限制信息时出错: {e}")
             yield event.plain_result(f"获取 API 速率限制信息时出错: {str(e)}")
 
-    async def _fetch_rate_limit(self) -> dict[str, Any] | None:
-        """Fetch rate limit information from GitHub API"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    GITHUB_RATE_LIMIT_URL, headers=self._get_github_headers()
-                ) as resp:
-                    if resp.status == 200:
-                        return await resp.json()
-                    else:
-                        logger.error(f"获取 API 速率限制信息失败: {resp.status}")
-                        return None
-            except Exception as e:
-                logger.error(f"获取 API 速率限制信息时出错: {e}")
+    async def _fetch_rate_limit(self, repo: str | None = None) -> dict[str, Any] | None:
+        """Fetch rate limit information from GitHub API.
+
+        With GitHub App auth, ``repo`` selects whose installation limits are shown.
+        """
+        try:
+            headers = await self._get_github_headers(repo)
+            resp = await self.github.get(GITHUB_RATE_LIMIT_URL, headers=headers)
+            if resp.status == 200:
+                return resp.json()
+            else:
+                logger.error(f"获取 API 速率限制信息失败: {resp.status}")
                 return None
+        except Exception as e:
+            logger.error(f"获取 API 速率限制信息时出错: {e}")
+            return None
+
+    def _format_client_stats(self) -> str:
+        """Describe retries and open circuit breakers of the API client."""
+        stats = self.github.stats
+        lines = [
+            f"\n\n客户端统计: 请求 {stats['requests']} 次，重试 {stats['retries']} 次，"
+            f"熔断拒绝 {stats['short_circuited']} 次，合并重复请求 {stats['coalesced']} 次"
+        ]
+        for endpoint, retry_in in sorted(self.github.open_circuits().items()):
+            lines.append(f"- 熔断中: {endpoint} ({retry_in:.0f} 秒后探测)")
+        return "\n".join(lines)
 
     def _format_rate_limit(self, rate_limit_data: dict[str, Any]) -> str:
         """Format rate limit data for display"""
@@ -1257,7 +2697,9 @@ class MyPlugin(Star):
         )
 
         # Add information about authentication status
-        if self.github_token:
+        if self.github_app:
+            result += "\n✅ 已启用 GitHub App 认证，使用仓库所有者的安装令牌，速率限制随组织规模提高"
+        elif self.github_token:
             result += "\n✅ 已使用 GitHub Token 进行身份验证，速率限制较高"
         else:
             result += (
@@ -1283,9 +2725,26 @@ class MyPlugin(Star):
 
     async def terminate(self):
         """Cleanup and save data before termination"""
-        self._save_subscriptions()
-        self._save_default_repos()
-        self._save_link_settings()
+        if self._startup_task and not self._startup_task.done():
+            self._startup_task.cancel()
+        # Only write back state that was actually loaded
+        if self._subscriptions is not None:
+            self._save_subscriptions()
+        if self._default_repos is not None:
+            self._save_default_repos()
+        if self._link_settings is not None:
+            self._save_link_settings()
+        if self._digest is not None:
+            self._save_digest_state()
+        if self._activity is not None:
+            self._save_activity()
+        if self.digest_task:
+            self.digest_task.cancel()
+            try:
+                await self.digest_task
+            except asyncio.CancelledError:
+                pass
+
         if self.task:
             self.task.cancel()
             try:
@@ -1293,6 +2752,35 @@ class MyPlugin(Star):
             except asyncio.CancelledError:
                 pass
 
+        if self.poll_shards:
+            await self.poll_shards.stop()
+
         if self.webhook_server:
             await self.webhook_server.stop()
+
+        if self.storms:
+            # Deliver star/fork summaries still waiting for their window to end
+            await self.storms.close()
+
+        if self.coalescer:
+            # Send held review/comment updates instead of dropping them
+            await self.coalescer.close()
+
+        if self.card_renderer:
+            await self.card_renderer.close()
+
+        if self.mirror_task:
+            self.mirror_task.cancel()
+            try:
+                await self.mirror_task
+            except asyncio.CancelledError:
+                pass
+        if self._issue_mirror:
+            self._issue_mirror.save()
+        if self.profiler:
+            self.profiler.stop()
+
+        if self._event_log:
+            self._event_log.close()
+        await self.github.close()
         logger.info("GitHub Cards Plugin 已终止")
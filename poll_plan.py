@@ -0,0 +1,94 @@
+from .subscriptions import EVENT_BITS, Subscription, is_wildcard_repo
+
+ISSUE_BIT = EVENT_BITS["issues"]
+PR_BIT = EVENT_BITS["prs"]
+RELEASE_BIT = EVENT_BITS["releases"]
+COMMIT_BIT = EVENT_BITS["commits"]
+
+# Endpoints that list new issues and PRs
+ITEMS_ISSUES = "issues"
+ITEMS_PULLS = "pulls"
+
+
+class RepoPlan:
+    """Requests made for one base repository in every classic poll cycle.
+
+    ``items`` is the endpoint listing new issues/PRs, or None when no
+    subscription wants either: the issues endpoint covers both, the pulls
+    endpoint serves PR-only repositories. ``drop_prs`` discards the PRs the
+    issues endpoint returns when only issues are wanted. Commit
+    subscriptions are grouped by branch; each group is fetched once under
+    the key of its first subscription and notified as a whole.
+    """
+
+    __slots__ = (
+        "base_repo",
+        "subscriptions",
+        "items",
+        "drop_prs",
+        "releases",
+        "commit_groups",
+    )
+
+    def __init__(self, base_repo: str, subscriptions: list[Subscription]) -> None:
+        self.base_repo = base_repo
+        self.subscriptions = subscriptions
+        self.items: str | None = None
+        self.drop_prs = False
+        self.releases = False
+        self.commit_groups: list[list[Subscription]] = []
+
+    @property
+    def fetches_repo_level(self) -> bool:
+        return self.items is not None or self.releases
+
+    @property
+    def requests(self) -> int:
+        """Requests per cycle, counting one per commit group for the branch head."""
+        return (self.items is not None) + self.releases + len(self.commit_groups)
+
+    def describe(self) -> str:
+        parts = []
+        if self.items == ITEMS_ISSUES:
+            parts.append("issues" if not self.drop_prs else "issues(不含 PR)")
+        elif self.items == ITEMS_PULLS:
+            parts.append("pulls")
+        if self.releases:
+            parts.append("releases")
+        for group in self.commit_groups:
+            parts.append(f"commits@{group[0].branch or '默认分支'}")
+        return ", ".join(parts) or "无"
+
+
+def plan_repo(base_repo: str, subscriptions: list[Subscription]) -> RepoPlan:
+    """Plan the minimal requests covering the union of the subscribed events."""
+    plan = RepoPlan(base_repo, subscriptions)
+    if is_wildcard_repo(base_repo):
+        # Owner-wide subscriptions are polled through event feeds
+        return plan
+
+    mask = 0
+    branches: dict[str | None, list[Subscription]] = {}
+    for subscription in subscriptions:
+        mask |= subscription.event_mask
+        if subscription.event_mask & COMMIT_BIT:
+            branches.setdefault(subscription.branch_norm, []).append(subscription)
+
+    wants_issues = bool(mask & ISSUE_BIT)
+    wants_prs = bool(mask & PR_BIT)
+    if wants_issues:
+        plan.items = ITEMS_ISSUES
+        plan.drop_prs = not wants_prs
+    elif wants_prs:
+        plan.items = ITEMS_PULLS
+    plan.releases = bool(mask & RELEASE_BIT)
+    plan.commit_groups = list(branches.values())
+    return plan
+
+
+def build_poll_plan(grouped: dict[str, list[Subscription]]) -> dict[str, RepoPlan]:
+    """Plan every base repository of ``SubscriptionStore.by_repo()``."""
+    return {
+        base_repo: plan_repo(base_repo, subscriptions)
+        for base_repo, subscriptions in grouped.items()
+    }
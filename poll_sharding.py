@@ -0,0 +1,244 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import Any
+
+from astrbot.api import logger
+
+# Virtual nodes per instance on the hash ring; more nodes spread repos more evenly
+RING_REPLICAS = 64
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class ConsistentHashRing:
+    """Map keys to nodes so that membership changes only move a small share of keys."""
+
+    def __init__(self, nodes: list[str], replicas: int = RING_REPLICAS) -> None:
+        self.nodes = sorted(set(nodes))
+        points = sorted(
+            (_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> str | None:
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class SqliteLeaseStore:
+    """Instance membership stored as expiring leases in a shared SQLite file.
+
+    Every live instance renews its own lease; instances that stop renewing
+    drop out once their lease expires. The same file holds the poll cursors
+    of every base repository, so whichever instance owns a repository next
+    continues where the previous owner stopped.
+    """
+
+    def __init__(self, path: str, lease_seconds: float) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS poll_leases ("
+                "instance_id TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS poll_cursors ("
+                "repo TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def heartbeat(self, instance_id: str) -> list[str]:
+        """Renew ``instance_id``'s lease and return all live instance IDs."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO poll_leases (instance_id, expires_at) VALUES (?, ?) "
+                "ON CONFLICT(instance_id) DO UPDATE SET expires_at = excluded.expires_at",
+                (instance_id, now + self.lease_seconds),
+            )
+            conn.execute("DELETE FROM poll_leases WHERE expires_at < ?", (now,))
+            rows = conn.execute("SELECT instance_id FROM poll_leases").fetchall()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def save_cursors(self, cursors: dict[str, dict[str, Any]]) -> None:
+        """Store the poll cursors of several base repositories in one transaction."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO poll_cursors (repo, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(repo) DO UPDATE SET "
+                "state = excluded.state, updated_at = excluded.updated_at",
+                [(repo, json.dumps(state), now) for repo, state in cursors.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def load_cursors(self, repos: list[str]) -> dict[str, dict[str, Any]]:
+        """Return the stored poll cursors of the given base repositories."""
+        conn = self._connect()
+        try:
+            cursors = {}
+            for repo in repos:
+                row = conn.execute(
+                    "SELECT state FROM poll_cursors WHERE repo = ?", (repo,)
+                ).fetchone()
+                if row:
+                    cursors[repo] = json.loads(row[0])
+            return cursors
+        finally:
+            conn.close()
+
+    def release(self, instance_id: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM poll_leases WHERE instance_id = ?", (instance_id,))
+        finally:
+            conn.close()
+
+
+class PollShardCoordinator:
+    """Decide which base repositories this instance polls.
+
+    Live instances are discovered through the lease store and base repos are
+    assigned with a consistent hash ring, so repos rebalance automatically
+    when an instance joins or its lease expires. ``rebalance`` reports which
+    repos changed hands since the previous poll cycle, and the poll cursors
+    travel with them through the lease store.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        instance_id: str | None = None,
+        lease_seconds: float = 60,
+    ) -> None:
+        self.instance_id = instance_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = max(10.0, float(lease_seconds))
+        self.store = SqliteLeaseStore(path, self.lease_seconds)
+        self.ring: ConsistentHashRing | None = None
+        self.ring_changed_at = 0.0
+        # Normalized base repos owned since the last rebalance; None while
+        # there is no ring yet and every repo is polled
+        self.owned: set[str] | None = set()
+        self._task: asyncio.Task[Any] | None = None
+
+    def owns(self, base_repo: str) -> bool:
+        """Return whether this instance should poll ``base_repo`` this cycle.
+
+        Ownership only changes in ``rebalance``, so a heartbeat landing in
+        the middle of a cycle cannot move a repo without its cursor. Before
+        the first successful heartbeat every repo is owned, so a broken
+        lease store never silences notifications.
+        """
+        return self.owned is None or base_repo.lower() in self.owned
+
+    def rebalance(self, base_repos: list[str]) -> tuple[list[str], list[str]]:
+        """Update the owned set from the ring; return the repos gained and lost.
+
+        Nothing changes hands before the first heartbeat, when every repo
+        is owned. Repos are only taken over once the ring has been stable
+        for a heartbeat interval: by then every other instance has seen the
+        same ring and stopped polling them.
+        """
+        if self.ring is None:
+            self.owned = None
+            return [], []
+        previous = (
+            {repo.lower() for repo in base_repos} if self.owned is None else self.owned
+        )
+        owned = {
+            repo.lower()
+            for repo in base_repos
+            if self.ring.node_for(repo.lower()) == self.instance_id
+        }
+        settling = time.monotonic() - self.ring_changed_at < self.lease_seconds / 3
+        if settling and len(self.ring.nodes) > 1:
+            owned &= previous
+        gained = [repo for repo in base_repos if repo.lower() in owned - previous]
+        lost = [repo for repo in base_repos if repo.lower() in previous - owned]
+        self.owned = owned
+        return gained, lost
+
+    async def save_cursors(self, cursors: dict[str, dict[str, Any]]) -> None:
+        if cursors:
+            await asyncio.to_thread(
+                self.store.save_cursors,
+                {repo.lower(): state for repo, state in cursors.items()},
+            )
+
+    async def load_cursors(self, base_repos: list[str]) -> dict[str, dict[str, Any]]:
+        """Return stored cursors keyed by the given base repo names."""
+        stored = await asyncio.to_thread(
+            self.store.load_cursors, [repo.lower() for repo in base_repos]
+        )
+        return {repo: stored[repo.lower()] for repo in base_repos if repo.lower() in stored}
+
+    async def refresh(self) -> None:
+        live = await asyncio.to_thread(self.store.heartbeat, self.instance_id)
+        if self.ring is None or self.ring.nodes != sorted(set(live)):
+            self.ring = ConsistentHashRing(live)
+            self.ring_changed_at = time.monotonic()
+            logger.info(
+                f"轮询分片成员变化，当前实例 {self.instance_id}，在线实例: {', '.join(self.ring.nodes)}"
+            )
+
+    def start(self) -> None:
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self) -> None:
+        try:
+            while True:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.error(f"更新轮询分片租约失败: {e}")
+                # Renew well before the lease runs out
+                await asyncio.sleep(self.lease_seconds / 3)
+        except asyncio.CancelledError:
+            pass
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.to_thread(self.store.release, self.instance_id)
+        except Exception as e:
+            logger.error(f"释放轮询分片租约失败: {e}")
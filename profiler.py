@@ -0,0 +1,95 @@
+import asyncio
+import cProfile
+import os
+import pstats
+import time
+from datetime import datetime
+
+from astrbot.api import logger
+
+
+class PluginProfiler:
+    """On-demand cProfile session limited to one collection window.
+
+    Nothing is installed while the profiler is off, so it costs nothing
+    until ``start`` is called. cProfile sees every function run on the
+    event loop thread; reports keep only functions defined in the
+    plugin's own files.
+    """
+
+    def __init__(self, plugin_dir: str, output_dir: str) -> None:
+        self.plugin_dir = os.path.abspath(plugin_dir)
+        self.output_dir = output_dir
+        self._profile: cProfile.Profile | None = None
+        self._stats: pstats.Stats | None = None
+        self._started_at = 0.0
+        self._elapsed = 0.0
+        self._auto_stop: asyncio.TimerHandle | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def start(self, window: float) -> None:
+        """Start collecting; stops by itself after ``window`` seconds.
+
+        Raises ValueError if a profiler is already running in this process.
+        """
+        if self._profile is not None:
+            raise ValueError("性能分析已在运行中")
+        profile = cProfile.Profile()
+        # Raises ValueError when another profiling tool is active
+        profile.enable()
+        self._profile = profile
+        self._stats = None
+        self._started_at = time.monotonic()
+        self._auto_stop = asyncio.get_running_loop().call_later(window, self.stop)
+        logger.info(f"已开始 GitHub Cards 性能分析，窗口 {window:.0f} 秒")
+
+    def stop(self) -> bool:
+        """Stop collecting and keep the results for reports. Returns False if not running."""
+        if self._profile is None:
+            return False
+        self._profile.disable()
+        if self._auto_stop:
+            self._auto_stop.cancel()
+            self._auto_stop = None
+        self._elapsed = time.monotonic() - self._started_at
+        self._stats = pstats.Stats(self._profile)
+        self._profile = None
+        logger.info(f"GitHub Cards 性能分析已结束，共采集 {self._elapsed:.1f} 秒")
+        return True
+
+    def _is_plugin_file(self, filename: str) -> bool:
+        return os.path.abspath(filename).startswith(self.plugin_dir + os.sep)
+
+    def report(self, limit: int = 15) -> str | None:
+        """Top plugin functions by cumulative time from the last finished window."""
+        if self._stats is None:
+            return None
+        rows = []
+        for (filename, lineno, func), (_, calls, _, cumulative, _) in self._stats.stats.items():
+            if self._is_plugin_file(filename):
+                rows.append((cumulative, calls, filename, lineno, func))
+        rows.sort(reverse=True)
+
+        lines = [f"⏱ 性能分析结果 (窗口 {self._elapsed:.1f} 秒，按累计耗时排序):"]
+        for cumulative, calls, filename, lineno, func in rows[:limit]:
+            location = os.path.relpath(filename, self.plugin_dir)
+            lines.append(
+                f"{cumulative * 1000:8.1f}ms {calls:6d}次  {location}:{lineno}({func})"
+            )
+        if not rows:
+            lines.append("窗口内没有执行插件代码")
+        return "\n".join(lines)
+
+    def dump(self) -> str | None:
+        """Write the last finished window to a .prof file and return its path."""
+        if self._stats is None:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(
+            self.output_dir, f"ghprof-{datetime.now().strftime('%Y%m%d-%H%M%S')}.prof"
+        )
+        self._stats.dump_stats(path)
+        return path
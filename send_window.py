@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from astrbot.api import logger
+
+# Closed windows waiting to be sent to one subscriber; beyond this the oldest is dropped
+MAX_PENDING = 50
+
+
+class WindowedSender:
+    """Collect notifications in per-key windows and send each window as one message.
+
+    Keys are tuples whose first element is the subscriber ID. The first
+    ``open`` of a key creates its window (any object with a ``render()``
+    method returning the message) and starts a ``window``-second timer;
+    when it fires, or when ``flush`` is called earlier, the window joins
+    its subscriber's send queue. Each subscriber's queue is sent one
+    message at a time, independently of other subscribers. A queued
+    window keeps collecting updates for its key until it is sent, so the
+    backlog holds at most one window per key.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        send: Callable[[str, str], Awaitable[None]],
+        label: str,
+    ) -> None:
+        self.window = window
+        self._send = send
+        # Names the messages in logs, e.g. " Star/Fork 汇总" or "合并通知"
+        self._label = label
+        self._windows: dict[tuple[str, ...], Any] = {}
+        self._timers: dict[tuple[str, ...], asyncio.TimerHandle] = {}
+        # Subscriber ID -> closed windows in flush order
+        self._pending: dict[str, dict[tuple[str, ...], Any]] = {}
+        self._senders: dict[str, asyncio.Task[None]] = {}
+
+    def open(self, key: tuple[str, ...], factory: Callable[[], Any]) -> Any:
+        """Return the open or queued window of ``key``, creating one if needed."""
+        window = self._windows.get(key)
+        if window is None:
+            window = self._pending.get(key[0], {}).get(key)
+        if window is None:
+            window = self._windows[key] = factory()
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.window, self.flush, key
+            )
+        return window
+
+    def flush(self, key: tuple[str, ...]) -> None:
+        """Close the window of ``key`` and queue it for sending."""
+        window = self._windows.pop(key, None)
+        if window is None:
+            return
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+
+        subscriber_id = key[0]
+        queue = self._pending.setdefault(subscriber_id, {})
+        if len(queue) >= MAX_PENDING:
+            del queue[next(iter(queue))]
+            logger.warning(f"订阅者 {subscriber_id} 待发送的{self._label}过多，丢弃最早的一条")
+        queue[key] = window
+        if subscriber_id not in self._senders:
+            self._senders[subscriber_id] = asyncio.create_task(self._drain(subscriber_id))
+
+    async def _drain(self, subscriber_id: str) -> None:
+        queue = self._pending[subscriber_id]
+        try:
+            while queue:
+                key = next(iter(queue))
+                # Updates arriving from here on open a new window
+                window = queue.pop(key)
+                try:
+                    await self._send(subscriber_id, window.render())
+                except Exception as e:
+                    logger.error(f"向订阅者 {subscriber_id} 发送{self._label}时出错: {e}")
+        finally:
+            del self._senders[subscriber_id]
+            if not queue:
+                del self._pending[subscriber_id]
+
+    async def close(self) -> None:
+        """Flush every open window and wait for the messages to be sent."""
+        for key in list(self._windows):
+            self.flush(key)
+        if self._senders:
+            await asyncio.gather(*self._senders.values(), return_exceptions=True)
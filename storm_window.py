@@ -0,0 +1,106 @@
+import math
+import time
+from collections.abc import Awaitable, Callable
+
+from . import formatters
+from .send_window import WindowedSender
+
+# High-volume, low-value webhook events that are summarized instead of sent one by one
+AGGREGATED_EVENTS = {"star", "fork"}
+# Actor names listed in a summary
+ACTOR_SAMPLES = 5
+
+
+class StormWindow:
+    """Star/fork events of one repository collected for one subscriber."""
+
+    __slots__ = (
+        "repo",
+        "opened_at",
+        "stars",
+        "unstars",
+        "forks",
+        "actors",
+        "first_message",
+    )
+
+    def __init__(self, repo: str) -> None:
+        self.repo = repo
+        self.opened_at = time.monotonic()
+        self.stars = 0
+        self.unstars = 0
+        self.forks = 0
+        # Insertion-ordered so the first actors are the ones sampled
+        self.actors: dict[str, None] = {}
+        # Sent unchanged when the window closes with a single event
+        self.first_message: str | None = None
+
+    @property
+    def count(self) -> int:
+        return self.stars + self.unstars + self.forks
+
+    def add(self, event_type: str, action: str, actor: str | None, message: str) -> None:
+        if event_type == "fork":
+            self.forks += 1
+        elif action == "deleted":
+            self.unstars += 1
+        else:
+            self.stars += 1
+        if actor:
+            self.actors[actor] = None
+        if self.first_message is None:
+            self.first_message = message
+
+    def render(self) -> str:
+        if self.count == 1 and self.first_message:
+            return self.first_message
+        minutes = max(1, math.ceil((time.monotonic() - self.opened_at) / 60))
+        return formatters.format_webhook_storm_summary(
+            self.repo,
+            minutes,
+            self.stars,
+            self.unstars,
+            self.forks,
+            list(self.actors)[:ACTOR_SAMPLES],
+            len(self.actors),
+        )
+
+
+class StormAggregator:
+    """Collapse star/fork storms into one summary per window.
+
+    The first event for a (subscriber, repository) pair opens a window of
+    ``window`` seconds; events arriving meanwhile only bump counters. The
+    window is flushed as a single message when it ends, or early once
+    ``threshold`` events have accumulated.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        threshold: int,
+        send: Callable[[str, str], Awaitable[None]],
+    ) -> None:
+        self.threshold = max(1, threshold)
+        self._windows = WindowedSender(window, send, " Star/Fork 汇总")
+
+    def add(
+        self,
+        repo: str,
+        subscriber_ids: list[str],
+        event_type: str,
+        action: str,
+        actor: str | None,
+        message: str,
+    ) -> None:
+        """Count an event for its recipients instead of sending it now."""
+        for subscriber_id in subscriber_ids:
+            key = (subscriber_id, repo.lower())
+            window = self._windows.open(key, lambda: StormWindow(repo))
+            window.add(event_type, action, actor, message)
+            if window.count >= self.threshold:
+                self._windows.flush(key)
+
+    async def close(self) -> None:
+        """Flush every open window and wait for the summaries to be sent."""
+        await self._windows.close()
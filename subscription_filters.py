@@ -0,0 +1,198 @@
+import fnmatch
+import re
+from typing import Any
+
+# Filter token prefixes accepted by /ghsub, e.g. "label:bug" or "-author:dependabot"
+FILTER_FIELDS = ("label", "author", "title", "path")
+BOT_EXCLUSION_TOKENS = {"-bots", "nobots"}
+
+
+def is_filter_token(token: str | None) -> bool:
+    if not token:
+        return False
+    if token.lower() in BOT_EXCLUSION_TOKENS:
+        return True
+    field, sep, _ = token.lstrip("-").partition(":")
+    return bool(sep) and field.lower() in FILTER_FIELDS
+
+
+def normalize_filter_tokens(tokens: list[str]) -> str | None:
+    """Validate filter tokens and return their canonical spec string.
+
+    Raises ValueError for unknown fields or invalid regular expressions.
+    """
+    normalized = []
+    for token in tokens:
+        if token.lower() in BOT_EXCLUSION_TOKENS:
+            normalized.append("-bots")
+            continue
+        negated = token.startswith("-")
+        field, sep, value = token.lstrip("-").partition(":")
+        field = field.lower()
+        if not sep or field not in FILTER_FIELDS or not value:
+            raise ValueError(f"无效的过滤条件: {token}")
+        if field == "title":
+            if negated:
+                raise ValueError("title 过滤条件不支持排除")
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"无效的标题正则: {value} ({e})") from e
+        elif field == "path" and negated:
+            raise ValueError("path 过滤条件不支持排除")
+        elif field in ("label", "author"):
+            value = ",".join(sorted({v.strip().lower() for v in value.split(",") if v.strip()}))
+        normalized.append(f"{'-' if negated else ''}{field}:{value}")
+    return " ".join(sorted(set(normalized))) or None
+
+
+class EventFacts:
+    """Fields of an event that subscription filters look at.
+
+    ``None`` means the field does not apply to the event (for example
+    labels on a push), and filters on that field let the event through.
+    """
+
+    __slots__ = ("labels", "author", "is_bot", "title", "paths")
+
+    def __init__(
+        self,
+        labels: set[str] | None = None,
+        author: str | None = None,
+        is_bot: bool = False,
+        title: str | None = None,
+        paths: list[str] | None = None,
+    ) -> None:
+        self.labels = labels
+        self.author = author
+        self.is_bot = is_bot
+        self.title = title
+        self.paths = paths
+
+
+def _is_bot(user: dict[str, Any] | None) -> bool:
+    user = user or {}
+    login = user.get("login") or ""
+    return user.get("type") == "Bot" or login.endswith("[bot]")
+
+
+def _labels(subject: dict[str, Any]) -> set[str]:
+    return {
+        (label.get("name") or "").lower()
+        for label in subject.get("labels") or []
+        if isinstance(label, dict)
+    }
+
+
+def facts_from_webhook(event_type: str, payload: dict[str, Any]) -> EventFacts:
+    sender = payload.get("sender") or {}
+    facts = EventFacts(
+        author=(sender.get("login") or "").lower() or None,
+        is_bot=_is_bot(sender),
+    )
+    subject = payload.get("pull_request") or payload.get("issue") or payload.get("discussion")
+    if isinstance(subject, dict):
+        facts.labels = _labels(subject)
+        facts.title = subject.get("title") or ""
+    elif event_type == "release":
+        release = payload.get("release") or {}
+        facts.title = release.get("name") or release.get("tag_name") or ""
+    if event_type == "push":
+        commits = payload.get("commits") or []
+        # Events API pushes carry no file lists; leave paths unknown there
+        if any("added" in commit for commit in commits):
+            facts.paths = [
+                path
+                for commit in commits
+                for key in ("added", "modified", "removed")
+                for path in commit.get(key) or []
+            ]
+    return facts
+
+
+def facts_from_item(item: dict[str, Any]) -> EventFacts:
+    """Build facts for a polled issue/PR/commit/release item."""
+    kind = item.get("_astrbot_type")
+    if kind == "commit":
+        author = item.get("author") or {}
+        return EventFacts(
+            author=(author.get("login") or "").lower() or None,
+            is_bot=_is_bot(author),
+        )
+    if kind == "release":
+        author = item.get("author") or {}
+        return EventFacts(
+            author=(author.get("login") or "").lower() or None,
+            is_bot=_is_bot(author),
+            title=item.get("name") or item.get("tag_name") or "",
+        )
+    user = item.get("user") or {}
+    return EventFacts(
+        labels=_labels(item),
+        author=(user.get("login") or "").lower() or None,
+        is_bot=_is_bot(user),
+        title=item.get("title") or "",
+    )
+
+
+class SubscriptionFilter:
+    """A filter spec compiled once into a predicate over ``EventFacts``."""
+
+    __slots__ = (
+        "spec",
+        "include_labels",
+        "exclude_labels",
+        "include_authors",
+        "exclude_authors",
+        "exclude_bots",
+        "title_patterns",
+        "path_patterns",
+    )
+
+    def __init__(self, spec: str) -> None:
+        self.spec = spec
+        self.include_labels: set[str] = set()
+        self.exclude_labels: set[str] = set()
+        self.include_authors: set[str] = set()
+        self.exclude_authors: set[str] = set()
+        self.exclude_bots = False
+        self.title_patterns: list[re.Pattern[str]] = []
+        self.path_patterns: list[re.Pattern[str]] = []
+
+        for token in spec.split():
+            if token == "-bots":
+                self.exclude_bots = True
+                continue
+            negated = token.startswith("-")
+            field, _, value = token.lstrip("-").partition(":")
+            if field == "label":
+                target = self.exclude_labels if negated else self.include_labels
+                target.update(value.split(","))
+            elif field == "author":
+                target = self.exclude_authors if negated else self.include_authors
+                target.update(value.split(","))
+            elif field == "title":
+                self.title_patterns.append(re.compile(value, re.IGNORECASE))
+            elif field == "path":
+                self.path_patterns.append(re.compile(fnmatch.translate(value)))
+
+    def __call__(self, facts: EventFacts) -> bool:
+        if self.exclude_bots and facts.is_bot:
+            return False
+        if facts.author is not None:
+            if facts.author in self.exclude_authors:
+                return False
+            if self.include_authors and facts.author not in self.include_authors:
+                return False
+        if facts.labels is not None:
+            if facts.labels & self.exclude_labels:
+                return False
+            if self.include_labels and not facts.labels & self.include_labels:
+                return False
+        if facts.title is not None and self.title_patterns:
+            if not any(p.search(facts.title) for p in self.title_patterns):
+                return False
+        if facts.paths is not None and self.path_patterns:
+            if not any(p.match(path) for p in self.path_patterns for path in facts.paths):
+                return False
+        return True
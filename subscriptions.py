@@ -0,0 +1,330 @@
+import sys
+from collections.abc import Callable, Iterator
+
+from .subscription_filters import SubscriptionFilter
+
+POLL_EVENTS = {"issues", "prs", "commits", "releases"}
+WEBHOOK_EVENTS = {
+    "issues",
+    "issue_comment",
+    "prs",
+    "pull_request",
+    "pull_request_review",
+    "pull_request_review_comment",
+    "pull_request_review_thread",
+    "commit_comment",
+    "discussion",
+    "discussion_comment",
+    "fork",
+    "star",
+    "create",
+    "push",
+    "commits",
+    "release",
+    "releases",
+}
+SUBSCRIPTION_EVENTS = POLL_EVENTS | WEBHOOK_EVENTS
+EVENT_ALIASES = {
+    "issue": "issues",
+    "pr": "prs",
+    "pulls": "prs",
+    "pull_request": "prs",
+    "commit": "commits",
+    "push": "commits",
+    "release": "releases",
+}
+
+# One bit per canonical event name. Names outside SUBSCRIPTION_EVENTS share
+# the top bit, which only the "all events" mask has set.
+EVENT_BITS = {name: 1 << i for i, name in enumerate(sorted(SUBSCRIPTION_EVENTS))}
+OTHER_EVENT_BIT = 1 << len(EVENT_BITS)
+ALL_EVENTS_MASK = (OTHER_EVENT_BIT << 1) - 1
+REPO_LEVEL_MASK = EVENT_BITS["issues"] | EVENT_BITS["prs"] | EVENT_BITS["releases"]
+
+# Repository part of owner-wide subscriptions, e.g. "myorg/*"
+WILDCARD_REPO = "*"
+
+
+def is_wildcard_repo(base_repo: str) -> bool:
+    """Return whether a base repository is an owner-wide ``owner/*`` pattern."""
+    return base_repo.endswith("/" + WILDCARD_REPO)
+
+
+def repo_owner(repo: str) -> str:
+    return repo.split("/", 1)[0]
+
+
+def event_bit(event_name: str) -> int:
+    """Return the mask bit of an event name, resolving aliases."""
+    return EVENT_BITS.get(EVENT_ALIASES.get(event_name, event_name), OTHER_EVENT_BIT)
+
+
+def parse_event_list(events: str | None) -> set[str] | None:
+    """Parse comma-separated event list. None means all events."""
+    if not events:
+        return None
+    parsed = {
+        EVENT_ALIASES.get(item.strip().lower(), item.strip().lower())
+        for item in events.split(",")
+        if item.strip()
+    }
+    if not parsed or not parsed <= SUBSCRIPTION_EVENTS:
+        return None
+    return parsed
+
+
+def events_to_mask(events: set[str] | None) -> int:
+    if events is None:
+        return ALL_EVENTS_MASK
+    mask = 0
+    for name in events:
+        mask |= event_bit(name)
+    return mask
+
+
+def split_filter_spec(repo_key: str) -> tuple[str, str | None]:
+    """Split a subscription key into (key_without_filters, filter_spec)."""
+    key, _, spec = repo_key.partition("?")
+    return key, spec or None
+
+
+def parse_repo_key(repo_key: str) -> tuple[str, str | None]:
+    """Parse subscription key into (base_repo, branch), ignoring event and filter suffixes."""
+    key_without_events = split_filter_spec(repo_key)[0].split(":", 1)[0]
+    parts = key_without_events.split("/")
+    if len(parts) == 2:
+        return key_without_events, None
+    if len(parts) >= 3:
+        return f"{parts[0]}/{parts[1]}", "/".join(parts[2:])
+    return key_without_events, None
+
+
+def parse_subscription_key(repo_key: str) -> tuple[str, str | None, set[str] | None]:
+    """Parse subscription key into (base_repo, branch, events)."""
+    key, _, events_part = split_filter_spec(repo_key)[0].partition(":")
+    base_repo, branch = parse_repo_key(key)
+    events = parse_event_list(events_part) if events_part else None
+    return base_repo, branch, events
+
+
+def format_subscription_key(
+    base_repo: str,
+    branch: str | None = None,
+    events: set[str] | None = None,
+    filters: str | None = None,
+) -> str:
+    """Format base_repo, optional branch, events and filter spec into a key."""
+    key = f"{base_repo}/{branch}" if branch else base_repo
+    if events is not None:
+        key += ":" + ",".join(sorted(events))
+    if filters:
+        key += f"?{filters}"
+    return key
+
+
+class Subscription:
+    """One subscription key, parsed once, with the conversations subscribed to it.
+
+    ``subscribers`` is an insertion-ordered dict used as a set so that
+    membership checks and removals are O(1) while the stored order is kept.
+    """
+
+    __slots__ = (
+        "key",
+        "base_repo",
+        "base_norm",
+        "branch",
+        "branch_norm",
+        "event_mask",
+        "filter_spec",
+        "predicate",
+        "subscribers",
+    )
+
+    def __init__(
+        self,
+        key: str,
+        normalize: Callable[[str], str],
+        predicate: SubscriptionFilter | None = None,
+    ) -> None:
+        base_repo, branch, events = parse_subscription_key(key)
+        self.key = key
+        self.base_repo = sys.intern(base_repo)
+        self.base_norm = sys.intern(normalize(base_repo))
+        self.branch = sys.intern(branch) if branch else None
+        self.branch_norm = sys.intern(normalize(branch)) if branch else None
+        self.event_mask = events_to_mask(events)
+        self.filter_spec = split_filter_spec(key)[1]
+        self.predicate = predicate
+        self.subscribers: dict[str, None] = {}
+
+    @property
+    def is_wildcard(self) -> bool:
+        return is_wildcard_repo(self.base_repo)
+
+    def allows(self, event_name: str) -> bool:
+        """Return whether the subscription allows an event."""
+        return bool(self.event_mask & event_bit(event_name))
+
+    def allows_mask(self, mask: int) -> bool:
+        return bool(self.event_mask & mask)
+
+    def __contains__(self, subscriber_id: str) -> bool:
+        return subscriber_id in self.subscribers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.subscribers)
+
+    def __len__(self) -> int:
+        return len(self.subscribers)
+
+
+class SubscriptionStore:
+    """All subscriptions, indexed by key, by normalized base repository and,
+    for ``owner/*`` subscriptions, by normalized owner.
+
+    The JSON form is the historical ``{key: [subscriber_ids]}`` mapping;
+    ``from_json(data).to_json() == data`` for any stored file, so keys,
+    key order and subscriber order survive a round trip unchanged.
+
+    ``version`` changes whenever a conversation subscribes or unsubscribes,
+    so views derived from the store can tell when to rebuild.
+    """
+
+    def __init__(self, normalize: Callable[[str], str] = str) -> None:
+        self.normalize = normalize
+        self._by_key: dict[str, Subscription] = {}
+        self._by_repo: dict[str, list[Subscription]] = {}
+        self._by_owner: dict[str, list[Subscription]] = {}
+        self._filters: dict[str, SubscriptionFilter] = {}
+        self.version = 0
+
+    @classmethod
+    def from_json(
+        cls, data: dict[str, list[str]], normalize: Callable[[str], str] = str
+    ) -> "SubscriptionStore":
+        store = cls(normalize)
+        for key, subscribers in data.items():
+            subscription = store._get_or_create(key)
+            for subscriber_id in subscribers:
+                subscription.subscribers[sys.intern(subscriber_id)] = None
+        return store
+
+    def to_json(self) -> dict[str, list[str]]:
+        return {
+            key: list(subscription.subscribers)
+            for key, subscription in self._by_key.items()
+        }
+
+    def _get_or_create(self, key: str) -> Subscription:
+        subscription = self._by_key.get(key)
+        if subscription is None:
+            spec = split_filter_spec(key)[1]
+            predicate = None
+            if spec:
+                predicate = self._filters.get(spec)
+                if predicate is None:
+                    predicate = self._filters[spec] = SubscriptionFilter(spec)
+            subscription = Subscription(key, self.normalize, predicate)
+            self._by_key[key] = subscription
+            self._by_repo.setdefault(subscription.base_norm, []).append(subscription)
+            if subscription.is_wildcard:
+                owner = repo_owner(subscription.base_norm)
+                self._by_owner.setdefault(owner, []).append(subscription)
+        return subscription
+
+    @staticmethod
+    def _unindex(
+        index: dict[str, list[Subscription]], name: str, subscription: Subscription
+    ) -> None:
+        siblings = index[name]
+        siblings.remove(subscription)
+        if not siblings:
+            del index[name]
+
+    def _drop(self, subscription: Subscription) -> None:
+        del self._by_key[subscription.key]
+        self._unindex(self._by_repo, subscription.base_norm, subscription)
+        if subscription.is_wildcard:
+            self._unindex(self._by_owner, repo_owner(subscription.base_norm), subscription)
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __iter__(self) -> Iterator[Subscription]:
+        return iter(list(self._by_key.values()))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_key
+
+    def get(self, key: str) -> Subscription | None:
+        return self._by_key.get(key)
+
+    def resolve(self, repo_key: str) -> Subscription | None:
+        """Find the subscription for a key, ignoring case when names are normalized."""
+        subscription = self._by_key.get(repo_key)
+        if subscription is not None:
+            return subscription
+        normalized = self.normalize(repo_key)
+        for key, subscription in self._by_key.items():
+            if self.normalize(key) == normalized:
+                return subscription
+        return None
+
+    def add(self, key: str, subscriber_id: str) -> bool:
+        """Subscribe a conversation to a key. Returns False if it already was."""
+        subscription = self._get_or_create(key)
+        if subscriber_id in subscription.subscribers:
+            return False
+        subscription.subscribers[sys.intern(subscriber_id)] = None
+        self.version += 1
+        return True
+
+    def discard(self, key: str, subscriber_id: str) -> bool:
+        """Unsubscribe a conversation from a key. Returns False if it was not subscribed."""
+        subscription = self._by_key.get(key)
+        if subscription is None or subscriber_id not in subscription.subscribers:
+            return False
+        del subscription.subscribers[subscriber_id]
+        if not subscription.subscribers:
+            self._drop(subscription)
+        self.version += 1
+        return True
+
+    def discard_subscriber(self, subscriber_id: str) -> list[str]:
+        """Remove a conversation from every subscription; return the affected keys."""
+        removed = []
+        for subscription in list(self._by_key.values()):
+            if subscriber_id in subscription.subscribers:
+                self.discard(subscription.key, subscriber_id)
+                removed.append(subscription.key)
+        return removed
+
+    def for_subscriber(self, subscriber_id: str) -> list[Subscription]:
+        return [s for s in self._by_key.values() if subscriber_id in s.subscribers]
+
+    def for_repo(self, repo: str) -> list[Subscription]:
+        """Return the subscriptions of a base repository."""
+        return self._by_repo.get(self.normalize(repo), [])
+
+    def matching(self, repo: str, *, wildcard_only: bool = False) -> list[Subscription]:
+        """Return the subscriptions that receive events of a repository.
+
+        These are the repository's own subscriptions followed by the
+        ``owner/*`` subscriptions of its owner, or only the latter.
+        """
+        owner_subs = self._by_owner.get(repo_owner(self.normalize(repo)), [])
+        if wildcard_only:
+            return owner_subs
+        own_subs = self._by_repo.get(self.normalize(repo), [])
+        if not owner_subs:
+            return own_subs
+        return own_subs + owner_subs
+
+    def by_repo(self) -> dict[str, list[Subscription]]:
+        """Group active subscriptions by base repository, keyed by the stored name."""
+        grouped: dict[str, list[Subscription]] = {}
+        for subscription in self._by_key.values():
+            if subscription.subscribers:
+                grouped.setdefault(subscription.base_repo, []).append(subscription)
+        return grouped
@@ -0,0 +1 @@
+"""Development harnesses (benchmarks, fault injection, soak); the plugin never imports them."""
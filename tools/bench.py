@@ -0,0 +1,365 @@
+"""Micro-benchmarks for the per-event hot paths.
+
+Run from the directory containing the plugin package, e.g.::
+
+    python -m astrbot_plugin_github_cards.tools.bench
+    python -m astrbot_plugin_github_cards.tools.bench --save
+    python -m astrbot_plugin_github_cards.tools.bench --tolerance 0.3 push
+
+Each case reports calls per second (best of several timed repeats) and
+the bytes allocated by one call (tracemalloc peak). ``--save`` stores
+the results as the baseline; later runs exit with status 1 when a case
+is slower or allocates more than the baseline by more than the tolerance.
+Baselines are machine specific and are not shipped with the plugin.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from .. import formatters
+from ..activity import ActivityTracker
+from ..links import GITHUB_URL_RE
+from ..subscriptions import Subscription, SubscriptionStore, parse_subscription_key
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+DEFAULT_TOLERANCE = 0.2
+# Each timed repeat runs for roughly this long
+TARGET_SECONDS = 0.2
+REPEATS = 5
+
+REPO = "AstrBotDev/AstrBot"
+SENDER = {"login": "octocat", "type": "User"}
+TIMESTAMP = "2024-05-01T12:34:56Z"
+# Issue/PR bodies are unbounded on GitHub; long pasted logs are common
+HUGE_BODY = "Traceback (most recent call last):\n  File \"main.py\", line 1\n" * 2000
+
+
+def _user(login: str) -> dict[str, Any]:
+    return {"login": login, "type": "User", "html_url": f"https://github.com/{login}"}
+
+
+def _issue(number: int, body: str) -> dict[str, Any]:
+    return {
+        "number": number,
+        "title": "插件在处理 Webhook 时崩溃 / crash while handling webhook",
+        "state": "open",
+        "html_url": f"https://github.com/{REPO}/issues/{number}",
+        "user": _user("reporter"),
+        "labels": [{"name": name} for name in ("bug", "webhook", "needs-triage")],
+        "assignees": [_user("maintainer-a"), _user("maintainer-b")],
+        "created_at": TIMESTAMP,
+        "updated_at": TIMESTAMP,
+        "comments": 12,
+        "body": body,
+    }
+
+
+def _pull_request(number: int, body: str) -> dict[str, Any]:
+    pr = _issue(number, body)
+    pr.update(
+        {
+            "html_url": f"https://github.com/{REPO}/pull/{number}",
+            "head": {"label": "contributor:fix/webhook-crash", "ref": "fix/webhook-crash"},
+            "base": {"label": "AstrBotDev:master", "ref": "master"},
+            "requested_reviewers": [_user("reviewer-a"), _user("reviewer-b")],
+            "merged": False,
+            "additions": 1234,
+            "deletions": 567,
+            "changed_files": 42,
+        }
+    )
+    return pr
+
+
+def _comment(body: str) -> dict[str, Any]:
+    return {
+        "id": 1,
+        "user": _user("commenter"),
+        "body": body,
+        "html_url": f"https://github.com/{REPO}/issues/1#issuecomment-1",
+        "commit_id": "0123456789abcdef0123456789abcdef01234567",
+        "path": "main.py",
+        "created_at": TIMESTAMP,
+        "updated_at": TIMESTAMP,
+    }
+
+
+def _push(commit_count: int) -> dict[str, Any]:
+    return {
+        "ref": "refs/heads/master",
+        "compare": f"https://github.com/{REPO}/compare/abc...def",
+        "commits": [
+            {
+                "id": f"{i:040x}",
+                "message": f"Commit {i}: update handler\n\nLonger description of change {i}",
+                "timestamp": TIMESTAMP,
+                "author": {"name": "Dev", "username": "dev"},
+                "added": [],
+                "modified": [f"src/module_{i % 50}.py"],
+                "removed": [],
+            }
+            for i in range(commit_count)
+        ],
+    }
+
+
+def _release(body: str) -> dict[str, Any]:
+    return {
+        "tag_name": "v3.5.0",
+        "name": "AstrBot v3.5.0",
+        "html_url": f"https://github.com/{REPO}/releases/tag/v3.5.0",
+        "author": _user("releaser"),
+        "prerelease": False,
+        "published_at": TIMESTAMP,
+        "body": body,
+    }
+
+
+def _cases() -> dict[str, Callable[[], Any]]:
+    """Benchmark cases keyed by a stable name used in the baseline file."""
+    issue = _issue(101, "Steps to reproduce: open the bot and send a link.")
+    issue_huge = _issue(102, HUGE_BODY)
+    pr = _pull_request(201, "Fixes #101 by checking the payload first.")
+    pr_huge = _pull_request(202, HUGE_BODY)
+    comment = _comment("Confirmed on 3.4.x, see the attached log.")
+    comment_huge = _comment(HUGE_BODY)
+    discussion = {
+        "number": 7,
+        "title": "Roadmap for v4",
+        "html_url": f"https://github.com/{REPO}/discussions/7",
+        "user": _user("maintainer-a"),
+        "category": {"name": "Ideas"},
+        "body": "Let's collect ideas here.",
+    }
+    review = {
+        "state": "changes_requested",
+        "body": "Please add a test.",
+        "user": _user("reviewer-a"),
+        "html_url": f"https://github.com/{REPO}/pull/201#pullrequestreview-1",
+        "submitted_at": TIMESTAMP,
+    }
+    thread = {"comments": [_comment("nit: rename this"), _comment("done")]}
+    forkee = {"full_name": "someone/AstrBot", "html_url": "https://github.com/someone/AstrBot"}
+    create = {"ref": "feature/cards", "ref_type": "branch"}
+    push_small = _push(3)
+    push_huge = _push(2000)
+    release = _release("## Changes\n- Faster cards\n- Fixed webhook crash")
+    release_huge = _release(HUGE_BODY)
+
+    f = formatters
+    # A review with 15 inline comments, as the coalescer renders it
+    review_burst = [
+        f.format_webhook_pr_review_message(REPO, "submitted", pr, review, SENDER) or ""
+    ] + [
+        f.format_webhook_pr_review_comment_message(REPO, "created", pr, comment, SENDER) or ""
+    ] * 9
+    cases: dict[str, Callable[[], Any]] = {
+        "issue": lambda: f.format_webhook_issue_message(REPO, "opened", issue, SENDER),
+        "issue_huge_body": lambda: f.format_webhook_issue_message(
+            REPO, "opened", issue_huge, SENDER
+        ),
+        "pr": lambda: f.format_webhook_pr_message(REPO, "opened", pr, SENDER),
+        "pr_huge_body": lambda: f.format_webhook_pr_message(REPO, "opened", pr_huge, SENDER),
+        "issue_comment": lambda: f.format_webhook_issue_comment_message(
+            REPO, "created", issue, comment, SENDER
+        ),
+        "issue_comment_huge_body": lambda: f.format_webhook_issue_comment_message(
+            REPO, "created", issue, comment_huge, SENDER
+        ),
+        "commit_comment": lambda: f.format_webhook_commit_comment_message(
+            REPO, "created", comment, SENDER
+        ),
+        "discussion": lambda: f.format_webhook_discussion_message(
+            REPO, "created", discussion, SENDER
+        ),
+        "discussion_comment": lambda: f.format_webhook_discussion_comment_message(
+            REPO, "created", discussion, comment, SENDER
+        ),
+        "fork": lambda: f.format_webhook_fork_message(REPO, forkee, SENDER),
+        "pr_review_comment": lambda: f.format_webhook_pr_review_comment_message(
+            REPO, "created", pr, comment, SENDER
+        ),
+        "pr_review": lambda: f.format_webhook_pr_review_message(
+            REPO, "submitted", pr, review, SENDER
+        ),
+        "pr_review_thread": lambda: f.format_webhook_pr_review_thread_message(
+            REPO, "resolved", pr, thread, SENDER
+        ),
+        "star": lambda: f.format_webhook_star_message(REPO, "created", SENDER),
+        "storm_summary": lambda: f.format_webhook_storm_summary(
+            REPO, 10, 143, 2, 12, ["a", "b", "c", "d", "e"], 155
+        ),
+        "coalesced_review": lambda: f.format_webhook_coalesced(
+            REPO, "PR #201 审查", review_burst, 5
+        ),
+        "create": lambda: f.format_webhook_create_message(REPO, create, SENDER),
+        "push": lambda: f.format_webhook_push_message(REPO, push_small, SENDER),
+        "push_2000_commits": lambda: f.format_webhook_push_message(REPO, push_huge, SENDER),
+        "release": lambda: f.format_webhook_release_message(
+            REPO, "published", release, SENDER
+        ),
+        "release_huge_body": lambda: f.format_webhook_release_message(
+            REPO, "published", release_huge, SENDER
+        ),
+        "issue_details": lambda: f.format_issue_details(REPO, issue),
+        "issue_details_huge_body": lambda: f.format_issue_details(REPO, issue_huge),
+        "pr_details": lambda: f.format_pr_details(REPO, pr),
+        "pr_details_huge_body": lambda: f.format_pr_details(REPO, pr_huge),
+    }
+
+    key = "AstrBotDev/AstrBot/feature/cards:issues,prs,releases?-bots label:bug,webhook"
+    subscription = Subscription(key, str.lower)
+    store = SubscriptionStore(str.lower)
+    for i in range(2000):
+        store.add(f"owner{i}/repo{i}:issues,prs", f"group:{i}")
+    store.add(key, "group:target")
+    cases.update(
+        {
+            "parse_subscription_key": lambda: parse_subscription_key(key),
+            "subscription_allows_hit": lambda: subscription.allows("prs"),
+            "subscription_allows_miss": lambda: subscription.allows("star"),
+            "subscription_allows_alias": lambda: subscription.allows("pull_request"),
+            "store_for_repo": lambda: store.for_repo("astrbotdev/astrbot"),
+        }
+    )
+
+    activity = ActivityTracker(14)
+    for i in range(2000):
+        activity.track(f"owner{i}/repo{i}")
+    issue_record = {"ts": time.time(), "repo": REPO, "type": "issues", "action": "opened"}
+    activity.add(issue_record)
+    cases.update(
+        {
+            "activity_add": lambda: activity.add(issue_record),
+            "activity_report_7d": lambda: activity.report(REPO, 7 * 24),
+        }
+    )
+
+    chat_with_link = "看看这个问题 " * 40 + f"https://github.com/{REPO}/issues/101 谢谢"
+    chat_without_link = "今天机器人回复有点慢，大家有遇到吗？" * 20
+    cases.update(
+        {
+            "link_regex_match": lambda: GITHUB_URL_RE.search(chat_with_link),
+            "link_regex_miss": lambda: GITHUB_URL_RE.search(chat_without_link),
+        }
+    )
+    return cases
+
+
+def _calibrate(func: Callable[[], Any]) -> int:
+    """Find a loop count whose run takes about TARGET_SECONDS."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= TARGET_SECONDS / 10 or loops >= 1 << 24:
+            return max(1, int(loops * TARGET_SECONDS / max(elapsed, 1e-9)))
+        loops *= 10
+
+
+def measure(func: Callable[[], Any]) -> dict[str, float]:
+    """Return calls per second and bytes allocated per call."""
+    loops = _calibrate(func)
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - started)
+
+    # Allocation is measured separately because tracing slows every call down
+    func()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"ops": loops / best, "alloc": float(max(0, peak - before))}
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Return a description of every case that regressed beyond the tolerance."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["ops"] < base["ops"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['ops']:,.0f} ops/s, baseline {base['ops']:,.0f} ops/s"
+            )
+        # Small allocations vary by a few bytes between runs; allow 64 bytes of slack
+        if result["alloc"] > base["alloc"] * (1 + tolerance) + 64:
+            regressions.append(
+                f"{name}: {result['alloc']:,.0f} B/call, baseline {base['alloc']:,.0f} B/call"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help="only run cases whose name contains one of these")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed relative regression, default %(default)s",
+    )
+    args = parser.parse_args(argv)
+
+    cases = _cases()
+    if args.cases:
+        cases = {
+            name: func for name, func in cases.items() if any(c in name for c in args.cases)
+        }
+
+    baseline: dict[str, dict[str, float]] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    width = max(len(name) for name in cases) if cases else 0
+    for name, func in cases.items():
+        result = results[name] = measure(func)
+        line = f"{name:<{width}}  {result['ops']:>14,.0f} ops/s  {result['alloc']:>12,.0f} B/call"
+        base = baseline.get(name)
+        if base:
+            line += f"  ({result['ops'] / base['ops'] - 1:+.0%} vs baseline)"
+        print(line)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""Fault-injection check: run GitHubClient against a local server that fails on purpose.
+
+Run from the directory containing the plugin package, in the environment
+AstrBot runs in (the client logs through ``astrbot``), e.g.::
+
+    python -m astrbot_plugin_github_cards.tools.client_check
+    python -m astrbot_plugin_github_cards.tools.client_check breaker coalesce
+
+Each scenario scripts the responses of a local HTTP server, sends requests
+through a fresh client and checks what reached the server, how long the
+client waited and what the caller got back:
+
+- 5xx responses are retried with backoff until they succeed or retries run out
+- ``Retry-After`` and ``X-RateLimit-Reset`` waits are honored, and waits
+  longer than ``max_wait`` return the throttled response at once
+- plain 403 permission errors are returned without retrying
+- an endpoint's breaker opens after consecutive failures, fails fast while
+  open, lets one probe through when half-open and closes on success
+- concurrent identical GETs share one request, and cancelling one caller
+  leaves the others' request running
+
+The run exits with status 1 if any check fails.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiohttp import web
+
+from ..github_client import CircuitOpenError, GitHubClient
+
+API_PREFIX = "https://api.github.com"
+# Backoff base used by the scenarios, so retries take milliseconds
+FAST_BACKOFF = 0.01
+
+
+class LocalGitHubClient(GitHubClient):
+    """GitHubClient that sends api.github.com requests to a local stand-in."""
+
+    def __init__(self, base_url: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+        json_body: Any,
+    ):
+        if url.startswith(API_PREFIX):
+            url = self.base_url + url[len(API_PREFIX):]
+        return await super()._request(method, url, params, headers, json_body)
+
+
+class Reply:
+    """One scripted response: status, headers and a delay before answering."""
+
+    __slots__ = ("status", "headers", "delay")
+
+    def __init__(
+        self, status: int, headers: dict[str, str] | None = None, delay: float = 0.0
+    ) -> None:
+        self.status = status
+        self.headers = headers or {}
+        self.delay = delay
+
+
+class FaultyGitHub:
+    """Local server answering each path from a script of replies.
+
+    Replies are used in order; the last one repeats. Paths without a
+    script answer 200. Every request is counted per path.
+    """
+
+    def __init__(self) -> None:
+        self.base_url = ""
+        self.hits: dict[str, int] = {}
+        self._scripts: dict[str, list[Reply]] = {}
+        self._runner: web.AppRunner | None = None
+
+    def script(self, path: str, *replies: Reply) -> str:
+        """Script the replies of ``path`` and return its api.github.com URL."""
+        self._scripts[path] = list(replies)
+        self.hits[path] = 0
+        return API_PREFIX + path
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        path = request.path
+        self.hits[path] = self.hits.get(path, 0) + 1
+        replies = self._scripts.get(path) or [Reply(200)]
+        reply = replies.pop(0) if len(replies) > 1 else replies[0]
+        if reply.delay:
+            await asyncio.sleep(reply.delay)
+        return web.json_response({"path": path}, status=reply.status, headers=reply.headers)
+
+
+class Checker:
+    """Collects the outcome of every check of a scenario."""
+
+    def __init__(self) -> None:
+        self.failures: list[str] = []
+
+    def check(self, condition: bool, description: str) -> None:
+        print(f"  {'ok  ' if condition else 'FAIL'} {description}")
+        if not condition:
+            self.failures.append(description)
+
+
+async def _timed(coro: Awaitable[Any]) -> tuple[Any, float]:
+    started = time.monotonic()
+    result = await coro
+    return result, time.monotonic() - started
+
+
+async def check_retry_5xx(fake: FaultyGitHub, c: Checker) -> None:
+    client = LocalGitHubClient(fake.base_url, max_retries=3, backoff_base=FAST_BACKOFF)
+    url = fake.script("/repos/o/r/issues", Reply(503), Reply(502), Reply(200))
+    resp = await client.get(url)
+    c.check(resp.status == 200, f"503, 502 then 200 returns 200 (got {resp.status})")
+    c.check(fake.hits["/repos/o/r/issues"] == 3, "the server saw 3 attempts")
+    c.check(client.stats["retries"] == 2, f"2 retries counted (got {client.stats['retries']})")
+
+    url = fake.script("/repos/o/r/releases", Reply(500))
+    resp = await client.get(url)
+    c.check(resp.status == 500, "a persistent 500 is returned once retries run out")
+    c.check(fake.hits["/repos/o/r/releases"] == 4, "max_retries=3 means 4 attempts")
+
+    slow = LocalGitHubClient(fake.base_url, max_retries=2, backoff_base=0.2)
+    url = fake.script("/repos/o/r/commits", Reply(500), Reply(500), Reply(200))
+    resp, elapsed = await _timed(slow.get(url))
+    # Full jitter picks each delay between 0 and its cap: 0.2 s, then 0.4 s
+    c.check(resp.status == 200, "backoff retries still reach the 200")
+    c.check(elapsed < 0.6 + 0.2, f"backoff stays within its caps ({elapsed:.2f}s)")
+    await client.close()
+    await slow.close()
+
+
+async def check_retry_after(fake: FaultyGitHub, c: Checker) -> None:
+    client = LocalGitHubClient(fake.base_url, max_retries=2, backoff_base=FAST_BACKOFF)
+    url = fake.script("/repos/o/r/pulls", Reply(429, {"Retry-After": "1"}), Reply(200))
+    resp, elapsed = await _timed(client.get(url))
+    c.check(resp.status == 200, "429 with Retry-After: 1 is retried")
+    c.check(elapsed >= 1.0, f"the client waited the full second ({elapsed:.2f}s)")
+
+    client.max_wait = 5
+    url = fake.script("/repos/o/r/pulls/1", Reply(429, {"Retry-After": "30"}), Reply(200))
+    resp, elapsed = await _timed(client.get(url))
+    c.check(resp.status == 429, "a Retry-After beyond max_wait returns the 429")
+    c.check(elapsed < 1.0, f"without sleeping ({elapsed:.2f}s)")
+    await client.close()
+
+
+async def check_rate_limit_reset(fake: FaultyGitHub, c: Checker) -> None:
+    client = LocalGitHubClient(fake.base_url, max_retries=2, backoff_base=FAST_BACKOFF)
+    reset = str(int(time.time()) + 1)
+    limited = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}
+    url = fake.script("/repos/o/r/readme", Reply(403, limited), Reply(200))
+    resp, elapsed = await _timed(client.get(url))
+    c.check(resp.status == 200, "403 with X-RateLimit-Remaining: 0 is retried after the reset")
+    c.check(elapsed >= 1.0, f"the client waited for X-RateLimit-Reset ({elapsed:.2f}s)")
+
+    far = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+    url = fake.script("/repos/o/r/readme/docs", Reply(403, far), Reply(200))
+    resp, elapsed = await _timed(client.get(url))
+    c.check(resp.status == 403, "a reset an hour away returns the 403 at once")
+    c.check(fake.hits["/repos/o/r/readme/docs"] == 1, "and does not retry")
+
+    url = fake.script("/repos/o/private", Reply(403), Reply(200))
+    resp = await client.get(url)
+    c.check(resp.status == 403, "a plain 403 permission error is final")
+    c.check(fake.hits["/repos/o/private"] == 1, "and is not retried")
+    c.check(not client.open_circuits(), "and trips no breaker")
+    await client.close()
+
+
+async def check_breaker(fake: FaultyGitHub, c: Checker) -> None:
+    client = LocalGitHubClient(
+        fake.base_url,
+        max_retries=0,
+        backoff_base=FAST_BACKOFF,
+        failure_threshold=3,
+        reset_timeout=1.0,
+    )
+    path = "/repos/o/r/events"
+    url = fake.script(path, Reply(500))
+    for _ in range(3):
+        await client.get(url)
+    c.check(bool(client.open_circuits()), "3 consecutive 500s open the breaker")
+
+    try:
+        await client.get(API_PREFIX + "/repos/other/repo/events")
+        short_circuited = False
+    except CircuitOpenError:
+        short_circuited = True
+    c.check(short_circuited, "the open breaker fails fast for every repository of the endpoint")
+    c.check(fake.hits[path] == 3, "without reaching the server")
+    other = await client.get(fake.script("/repos/o/r/tags", Reply(200)))
+    c.check(other.status == 200, "other endpoints are unaffected")
+
+    await asyncio.sleep(1.05)
+    resp = await client.get(url)
+    c.check(fake.hits[path] == 4, "after reset_timeout one half-open probe is sent")
+    c.check(resp.status == 500 and bool(client.open_circuits()), "a failed probe reopens it")
+
+    fake.script(path, Reply(200, delay=0.3))
+    await asyncio.sleep(1.05)
+    probe = asyncio.ensure_future(client.get(url))
+    await asyncio.sleep(0.1)
+    breaker = client._breakers["GET /repos/*/*/events"]
+    c.check(
+        breaker.state == "half_open",
+        f"the breaker is half-open during the probe ({breaker.state})",
+    )
+    try:
+        await client.get(url, params={"page": 2})
+        blocked = False
+    except CircuitOpenError:
+        blocked = True
+    c.check(blocked, "other requests still fail fast while the probe is out")
+    resp = await probe
+    c.check(resp.status == 200, "the probe succeeds")
+    c.check(breaker.state == "closed" and not client.open_circuits(), "and closes the breaker")
+    await client.close()
+
+
+async def check_coalesce(fake: FaultyGitHub, c: Checker) -> None:
+    client = LocalGitHubClient(fake.base_url, max_retries=0)
+    path = "/repos/o/r"
+    url = fake.script(path, Reply(200, delay=0.3))
+    responses = await asyncio.gather(*(client.get(url, params={"a": 1}) for _ in range(10)))
+    c.check(all(r.status == 200 for r in responses), "10 concurrent identical GETs all succeed")
+    c.check(fake.hits[path] == 1, f"with one request to the server (got {fake.hits[path]})")
+    c.check(client.stats["coalesced"] == 9, f"9 coalesced (got {client.stats['coalesced']})")
+    c.check(
+        responses[0].json() is not responses[1].json(),
+        "each caller parses its own objects",
+    )
+
+    fake.hits[path] = 0
+    await asyncio.gather(
+        client.get(url, headers={"Authorization": "token a"}),
+        client.get(url, headers={"Authorization": "token b"}),
+    )
+    c.check(fake.hits[path] == 2, "GETs with different headers are not shared")
+
+    fake.hits[path] = 0
+    first = asyncio.ensure_future(client.get(url))
+    second = asyncio.ensure_future(client.get(url))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    resp = await second
+    c.check(resp.status == 200, "cancelling one caller leaves the shared request running")
+    c.check(fake.hits[path] == 1, "which still went out once")
+    await client.close()
+
+
+SCENARIOS: dict[str, Callable[[FaultyGitHub, Checker], Awaitable[None]]] = {
+    "retry_5xx": check_retry_5xx,
+    "retry_after": check_retry_after,
+    "rate_limit_reset": check_rate_limit_reset,
+    "breaker": check_breaker,
+    "coalesce": check_coalesce,
+}
+
+
+async def run(names: list[str]) -> int:
+    fake = FaultyGitHub()
+    await fake.start()
+    checker = Checker()
+    try:
+        for name, scenario in SCENARIOS.items():
+            if names and not any(n in name for n in names):
+                continue
+            print(name)
+            await scenario(fake, checker)
+    finally:
+        await fake.stop()
+
+    if checker.failures:
+        print(f"\n{len(checker.failures)} check(s) failed")
+        return 1
+    print("\nall checks passed")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "scenarios", nargs="*", help="only run scenarios whose name contains one of these"
+    )
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args.scenarios))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""Multi-process check: run sharded plugin instances that join, crash and leave.
+
+Run from the directory containing the plugin package, in the environment
+AstrBot runs in (the plugin imports ``astrbot`` and ``quart``), e.g.::
+
+    python -m astrbot_plugin_github_cards.tools.shard_check
+    python -m astrbot_plugin_github_cards.tools.shard_check --poll-backend classic --repos 20
+
+The parent process serves the GitHub stand-in of the soak test, where every
+repository opens a new issue now and then, and starts each plugin instance
+as a separate process with its own data directory. All instances share one
+poll lease file and subscribe one conversation to the same repositories.
+While issues keep opening, the membership changes in phases:
+
+1. three instances start and split the repositories
+2. one is killed without releasing its lease; its repositories move once
+   the lease expires
+3. a new instance joins and takes a share of the repositories
+4. one instance stops cleanly and releases its lease
+
+The run then checks that every issue opened after the first instances
+were ready was notified exactly once across all instances, and that the
+instances still running own each repository exactly once. It exits with
+status 1 if any check fails. Data is written to a temporary directory
+that is removed afterwards unless ``--keep`` is given.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import signal
+import sys
+import tempfile
+import zlib
+from collections import Counter
+from typing import Any
+
+from .client_check import Checker, LocalGitHubClient
+from .soak import ACTIVITY_PERIOD, ORG, FakeGitHub
+
+SUBSCRIBER = "shard:GroupMessage:1"
+# Lines an instance writes for the parent start with this marker; the rest is logging
+REPORT_PREFIX = "@shard "
+ISSUE_URL = re.compile(r"https://github\.com/([^/\s]+/[^/\s]+)/issues/(\d+)")
+
+
+def _version(repo: str, tick: int) -> int:
+    """The issue number FakeGitHub shows for ``repo`` at ``tick``."""
+    return (tick + zlib.crc32(repo.encode("utf-8")) % ACTIVITY_PERIOD) // ACTIVITY_PERIOD
+
+
+def _report(**fields: Any) -> None:
+    print(REPORT_PREFIX + json.dumps(fields), flush=True)
+
+
+class ReportingChat:
+    """Replaces AstrBot's Context; reports the issues of every message sent."""
+
+    async def send_message(self, session: str, message_chain: Any) -> bool:
+        text = "".join(getattr(part, "text", "") for part in message_chain.chain)
+        for repo, number in ISSUE_URL.findall(text):
+            _report(issue=[repo, int(number)])
+        return True
+
+
+async def run_instance(args: argparse.Namespace) -> int:
+    """Run one plugin instance until its stdin closes or it is killed."""
+    from ..main import MyPlugin
+
+    os.chdir(args.data_dir)
+    plugin = MyPlugin(
+        ReportingChat(),
+        {
+            "poll_backend": args.poll_backend,
+            # Poll cycles are driven below; the plugin's own loop only runs once
+            "check_interval": 24 * 60,
+            "enable_local_cards": False,
+            "github_max_retries": 0,
+            "enable_poll_sharding": True,
+            "poll_shard_lease_file": args.lease_file,
+            "poll_shard_instance_id": args.instance,
+            "poll_shard_lease_seconds": args.lease_seconds,
+        },
+    )
+    plugin.github = LocalGitHubClient(args.base_url, max_retries=0)
+    await plugin._startup_task
+    repos = [f"{ORG}/repo{i}" for i in range(args.repos)]
+    await plugin._subscribe_keys(
+        SUBSCRIBER,
+        [(repo, plugin._format_repo_key(repo, None, {"issues"})) for repo in repos],
+    )
+    _report(ready=True)
+
+    async def poll() -> None:
+        while True:
+            await plugin._check_all_repos()
+            _report(owned=sorted(plugin.poll_shards.owned or ()))
+            await asyncio.sleep(args.poll_seconds)
+
+    poller = asyncio.create_task(poll())
+    # The parent closes stdin to stop the instance cleanly
+    await asyncio.to_thread(sys.stdin.read)
+    poller.cancel()
+    await asyncio.gather(poller, return_exceptions=True)
+    await plugin.terminate()
+    return 0
+
+
+class Instance:
+    """A plugin instance running in a child process, as seen by the parent."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.process: asyncio.subprocess.Process | None = None
+        self.issues: list[tuple[str, int]] = []
+        self.owned: list[str] = []
+        self.ready = asyncio.Event()
+        self._reader: asyncio.Task[None] | None = None
+
+    async def start(self, args: argparse.Namespace, base_url: str) -> None:
+        data_dir = os.path.join(args.workdir, self.name)
+        os.makedirs(data_dir)
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            __spec__.name,
+            "--instance",
+            self.name,
+            "--base-url",
+            base_url,
+            "--data-dir",
+            data_dir,
+            "--lease-file",
+            os.path.join(args.workdir, "leases.sqlite3"),
+            "--lease-seconds",
+            str(args.lease_seconds),
+            "--poll-seconds",
+            str(args.poll_seconds),
+            "--poll-backend",
+            args.poll_backend,
+            "--repos",
+            str(args.repos),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=None if args.verbose else asyncio.subprocess.DEVNULL,
+        )
+        self._reader = asyncio.create_task(self._read(args.verbose))
+
+    async def _read(self, verbose: bool) -> None:
+        async for raw in self.process.stdout:
+            line = raw.decode("utf-8", "replace").rstrip("\n")
+            if not line.startswith(REPORT_PREFIX):
+                if verbose:
+                    print(f"  [{self.name}] {line}")
+                continue
+            fields = json.loads(line[len(REPORT_PREFIX):])
+            if "issue" in fields:
+                self.issues.append(tuple(fields["issue"]))
+            elif "owned" in fields:
+                self.owned = fields["owned"]
+            elif "ready" in fields:
+                self.ready.set()
+
+    async def stop(self) -> None:
+        """Let the instance terminate the plugin and release its lease."""
+        self.process.stdin.close()
+        await self.process.wait()
+        await self._reader
+
+    async def kill(self) -> None:
+        """Kill the instance so its lease is left to expire."""
+        self.process.send_signal(signal.SIGKILL)
+        await self.process.wait()
+        await self._reader
+
+
+async def run(args: argparse.Namespace) -> int:
+    fake = FakeGitHub()
+    await fake.start()
+
+    async def advance() -> None:
+        while True:
+            await asyncio.sleep(args.tick_seconds)
+            fake.tick += 1
+
+    ticker = asyncio.create_task(advance())
+    instances: dict[str, Instance] = {}
+
+    async def start(name: str) -> None:
+        instance = instances[name] = Instance(name)
+        await instance.start(args, fake.base_url)
+        await asyncio.wait_for(instance.ready.wait(), 60)
+        print(f"{name} started", flush=True)
+
+    async def phase(description: str) -> None:
+        print(f"{description}, waiting {args.phase_seconds:.0f}s", flush=True)
+        await asyncio.sleep(args.phase_seconds)
+
+    checker = Checker()
+    try:
+        await asyncio.gather(*(start(name) for name in ("a", "b", "c")))
+        # Issues opened while the instances were subscribing are not counted
+        await asyncio.sleep(2)
+        first_tick = fake.tick
+        await phase("phase 1: a, b and c split the repositories")
+        await instances["a"].kill()
+        await phase("phase 2: a killed, its lease expires")
+        await start("d")
+        await phase("phase 3: d joined")
+        await instances["b"].stop()
+        await phase("phase 4: b stopped cleanly")
+        ticker.cancel()
+        last_tick = fake.tick
+        # Let the remaining instances poll the last issues and settle
+        await asyncio.sleep(args.lease_seconds / 3 + 3 * args.poll_seconds)
+        live = [instances[name] for name in ("c", "d")]
+        owners = Counter(repo for instance in live for repo in instance.owned)
+        for instance in live:
+            await instance.stop()
+    finally:
+        ticker.cancel()
+        for instance in instances.values():
+            if instance.process and instance.process.returncode is None:
+                instance.process.kill()
+                await instance.process.wait()
+        await fake.stop()
+
+    repos = [f"{ORG}/repo{i}" for i in range(args.repos)]
+    opened = {
+        (repo, number)
+        for repo in repos
+        for number in range(_version(repo, first_tick) + 1, _version(repo, last_tick) + 1)
+    }
+    notified = Counter(issue for instance in instances.values() for issue in instance.issues)
+    for name, instance in instances.items():
+        counted = sum(1 for issue in instance.issues if issue in opened)
+        print(f"{name}: notified {counted} issues, owns {len(instance.owned)} repositories")
+
+    print("checks")
+    missed = sorted(opened - set(notified))
+    checker.check(
+        not missed,
+        f"all {len(opened)} opened issues were notified"
+        + (f" (missed: {', '.join(f'{r}#{n}' for r, n in missed[:10])})" if missed else ""),
+    )
+    repeated = sorted(issue for issue, count in notified.items() if count > 1 and issue in opened)
+    checker.check(
+        not repeated,
+        "no issue was notified twice"
+        + (f" (repeated: {', '.join(f'{r}#{n}' for r, n in repeated[:10])})" if repeated else ""),
+    )
+    unowned = [repo for repo in repos if owners[repo.lower()] != 1]
+    checker.check(
+        not unowned,
+        "c and d own every repository exactly once"
+        + (f" (not: {', '.join(unowned[:10])})" if unowned else ""),
+    )
+    checker.check(
+        all(instances[name].owned for name in ("c", "d")),
+        "both remaining instances own some repositories",
+    )
+
+    if checker.failures:
+        print(f"\n{len(checker.failures)} check(s) failed")
+        return 1
+    print("\nall checks passed")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--repos", type=int, default=12, help="subscribed repositories, default %(default)s"
+    )
+    parser.add_argument("--poll-backend", choices=("classic", "events"), default="events")
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=10,
+        help="poll shard lease length, default %(default)s",
+    )
+    parser.add_argument(
+        "--poll-seconds",
+        type=float,
+        default=1,
+        help="pause between poll cycles, default %(default)s",
+    )
+    parser.add_argument(
+        "--tick-seconds",
+        type=float,
+        default=3,
+        help=(
+            "stand-in clock; each repository opens an issue every "
+            f"{ACTIVITY_PERIOD} ticks, default %(default)s"
+        ),
+    )
+    parser.add_argument(
+        "--phase-seconds",
+        type=float,
+        default=40,
+        help="length of each membership phase, default %(default)s",
+    )
+    parser.add_argument("--verbose", action="store_true", help="show the instances' logs")
+    parser.add_argument("--keep", action="store_true", help="keep the instances' data")
+    # Used by the parent to start the instances
+    parser.add_argument("--instance", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--lease-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.instance:
+        return asyncio.run(run_instance(args))
+
+    args.workdir = tempfile.mkdtemp(prefix="github-cards-shards-")
+    print(f"instance data in {args.workdir}")
+    try:
+        return asyncio.run(run(args))
+    finally:
+        if not args.keep:
+            shutil.rmtree(args.workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,590 @@
+"""Soak test: run the plugin for hours against local stand-ins and watch for leaks.
+
+Run from the directory containing the plugin package, in the environment
+AstrBot runs in (the plugin imports ``astrbot`` and ``quart``), e.g.::
+
+    python -m astrbot_plugin_github_cards.tools.soak --minutes 180
+    python -m astrbot_plugin_github_cards.tools.soak --minutes 10 --sample-seconds 5
+
+The plugin polls a local HTTP server that emulates the GitHub endpoints it
+uses, and a stand-in context replaces the chat platform. Three drivers run
+for the whole soak:
+
+- signed webhook deliveries posted through the real Quart route
+- poll cycles back to back, with new activity on every repository
+- conversations subscribing and unsubscribing all the time
+
+Traced Python memory, open file descriptors, ``asyncio.all_tasks()`` and
+the size of the plugin's per-repository state are sampled periodically.
+Samples taken during the warm-up are ignored. The run exits with status 1
+if any metric keeps growing across the rest of the run. State is written
+to a temporary directory that is removed afterwards unless ``--keep`` is given.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Any
+
+from aiohttp import web
+
+from ..main import MyPlugin
+from ..webhook_server import GitHubWebhookServer
+from .client_check import API_PREFIX, LocalGitHubClient
+
+WEBHOOK_PATH = "/github/webhook"
+WEBHOOK_SECRET = "soak-secret"
+ORG = "soak-org"
+USER = "soak-user"
+REPOS_PER_OWNER = 20
+CONVERSATIONS = 30
+# Each repository gets new activity once every this many poll cycles
+ACTIVITY_PERIOD = 10
+WEBHOOK_EVENTS = ("issues", "issue_comment", "pull_request", "push", "star", "fork")
+
+# Growth a metric may show between the first and last third of the run
+# before it counts as a leak: (absolute, relative to the first third)
+SLACK = {
+    "memory": (1 << 20, 0.10),
+    "fds": (4, 0.0),
+    "tasks": (10, 0.0),
+    "state": (10, 0.10),
+}
+METRIC_LABELS = {
+    "memory": "traced memory",
+    "fds": "open fds",
+    "tasks": "asyncio tasks",
+    "state": "plugin state entries",
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _user(login: str) -> dict[str, Any]:
+    return {"login": login, "type": "User", "html_url": f"https://github.com/{login}"}
+
+
+def _issue(
+    repo: str, number: int, pull: bool = False, created_at: str | None = None
+) -> dict[str, Any]:
+    kind = "pull" if pull else "issues"
+    created_at = created_at or _now()
+    return {
+        "number": number,
+        "title": f"Soak item {number}",
+        "state": "open",
+        "html_url": f"https://github.com/{repo}/{kind}/{number}",
+        "user": _user(f"user{number % 50}"),
+        "labels": [{"name": "bug"}] if number % 3 == 0 else [],
+        "created_at": created_at,
+        "updated_at": created_at,
+        "comments": number % 7,
+        "body": "Steps to reproduce:\n" * (number % 20),
+    }
+
+
+def _commit(repo: str, version: int, date: str) -> dict[str, Any]:
+    sha = f"{version:040x}"
+    return {
+        "sha": sha,
+        "html_url": f"https://github.com/{repo}/commit/{sha}",
+        "commit": {
+            "message": f"Change number {version}",
+            "author": {"name": "dev", "date": date},
+            "committer": {"name": "dev", "date": date},
+        },
+        "author": _user("dev"),
+    }
+
+
+def webhook_payload(event_type: str, repo: str, number: int) -> dict[str, Any]:
+    """Build a webhook payload of ``event_type`` for ``repo``."""
+    payload: dict[str, Any] = {
+        "repository": {"full_name": repo, "html_url": f"https://github.com/{repo}"},
+        "sender": _user(f"user{number % 50}"),
+    }
+    if event_type == "issues":
+        payload.update(action="opened", issue=_issue(repo, number))
+    elif event_type == "issue_comment":
+        payload.update(
+            action="created",
+            issue=_issue(repo, number),
+            comment={
+                "body": "Same here",
+                "html_url": f"https://github.com/{repo}/issues/{number}#issuecomment-{number}",
+                "user": _user("commenter"),
+                "updated_at": _now(),
+            },
+        )
+    elif event_type == "pull_request":
+        payload.update(action="opened", pull_request=_issue(repo, number, pull=True))
+    elif event_type == "push":
+        commits = [
+            {
+                "id": f"{number:032x}{i:08x}",
+                "message": f"Commit {i}",
+                "author": {"name": "dev"},
+                "url": f"https://github.com/{repo}/commit/{number:032x}{i:08x}",
+                "timestamp": _now(),
+            }
+            for i in range(1 + number % 5)
+        ]
+        payload.update(
+            ref="refs/heads/main",
+            commits=commits,
+            head_commit=commits[-1],
+            compare=f"https://github.com/{repo}/compare/a...b",
+            pusher={"name": "dev"},
+        )
+    elif event_type == "star":
+        payload.update(action="created", starred_at=_now())
+    elif event_type == "fork":
+        payload.update(
+            forkee={"full_name": f"fork{number}/repo", "created_at": _now()}
+        )
+    return payload
+
+
+class FakeGitHub:
+    """Local stand-in for the GitHub REST endpoints the plugin calls.
+
+    ``tick`` is advanced once per poll cycle. Each repository changes once
+    every ACTIVITY_PERIOD ticks, staggered across repositories: it gets a
+    new version with a new issue, a new commit on its default branch and
+    a new event. ETags follow the versions, so unchanged feeds answer 304
+    like GitHub does.
+    """
+
+    def __init__(self) -> None:
+        self.tick = 0
+        self.base_url = ""
+        self._runner: web.AppRunner | None = None
+        # repo -> (version, time the version appeared)
+        self._changed: dict[str, tuple[int, str]] = {}
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @staticmethod
+    def _offset(repo: str) -> int:
+        return zlib.crc32(repo.encode("utf-8")) % ACTIVITY_PERIOD
+
+    def version(self, repo: str) -> tuple[int, str]:
+        """Return the current version of a repository and when it appeared."""
+        version = (self.tick + self._offset(repo)) // ACTIVITY_PERIOD
+        changed = self._changed.get(repo)
+        if changed is None or changed[0] != version:
+            changed = self._changed[repo] = (version, _now())
+        return changed
+
+    def _events(self, repos: list[str]) -> list[dict[str, Any]]:
+        events = []
+        for index, repo in enumerate(repos):
+            version, changed_at = self.version(repo)
+            for v in (version, version - 1):
+                began = v * ACTIVITY_PERIOD - self._offset(repo)
+                if began <= 0:
+                    continue
+                events.append(
+                    {
+                        "id": str(began * 1000 + index),
+                        "type": "IssuesEvent",
+                        "repo": {"name": repo},
+                        "actor": {"login": f"user{v % 50}"},
+                        "payload": {
+                            "action": "opened",
+                            "issue": _issue(repo, v, created_at=changed_at),
+                        },
+                        "created_at": changed_at,
+                    }
+                )
+        events.sort(key=lambda event: int(event["id"]), reverse=True)
+        return events[:100]
+
+    def _feed(self, request: web.Request, repos: list[str]) -> web.Response:
+        events = self._events(repos)
+        etag = f'"{events[0]["id"] if events else 0}"'
+        # GitHub sends X-Poll-Interval with 304s too
+        headers = {"ETag": etag, "X-Poll-Interval": "0"}
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=headers)
+        return web.json_response(events, headers=headers)
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        parts = request.match_info["path"].strip("/").split("/")
+        if parts[0] == "orgs" and parts[1] != ORG:
+            return web.json_response({"message": "Not Found"}, status=404)
+        if parts[0] in ("users", "orgs") and len(parts) == 2:
+            kind = "Organization" if parts[1] == ORG else "User"
+            return web.json_response({"login": parts[1], "type": kind})
+        if parts[0] in ("users", "orgs") and parts[2:] == ["repos"]:
+            if request.query.get("page", "1") != "1":
+                return web.json_response([])
+            return web.json_response(
+                [{"full_name": f"{parts[1]}/repo{i}"} for i in range(REPOS_PER_OWNER)]
+            )
+        if parts[0] == "orgs" and parts[2:] == ["events"]:
+            return self._feed(
+                request, [f"{parts[1]}/repo{i}" for i in range(REPOS_PER_OWNER)]
+            )
+        if parts[0] != "repos" or len(parts) < 3:
+            return web.json_response({"message": "Not Found"}, status=404)
+
+        repo = f"{parts[1]}/{parts[2]}"
+        rest = parts[3:]
+        version, changed_at = self.version(repo)
+        if not rest:
+            return web.json_response(
+                {
+                    "full_name": repo,
+                    "html_url": f"https://github.com/{repo}",
+                    "default_branch": "main",
+                    "stargazers_count": version,
+                    "updated_at": changed_at,
+                }
+            )
+        if rest == ["events"]:
+            return self._feed(request, [repo])
+        if rest == ["issues"]:
+            return web.json_response([_issue(repo, version, created_at=changed_at)])
+        if rest[0] == "commits" and len(rest) == 2:
+            etag = f'"{version}"'
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304)
+            return web.Response(text=f"{version:040x}", headers={"ETag": etag})
+        if rest[0] in ("commits", "compare"):
+            commits = [_commit(repo, version, changed_at)]
+            if rest[0] == "compare":
+                return web.json_response({"commits": commits, "total_commits": 1})
+            return web.json_response(commits)
+        if rest == ["releases"]:
+            return web.json_response([])
+        return web.json_response({"message": "Not Found"}, status=404)
+
+
+class ChatStandIn:
+    """Replaces AstrBot's Context; counts messages instead of sending them."""
+
+    def __init__(self) -> None:
+        self.sent = 0
+
+    async def send_message(self, session: str, message_chain: Any) -> bool:
+        self.sent += 1
+        return True
+
+
+def open_fds() -> int:
+    for path in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(path):
+            return len(os.listdir(path))
+    return 0
+
+
+def state_size(plugin: Any) -> int:
+    """Count the per-repository entries the plugin keeps outside its subscriptions."""
+    return sum(
+        len(mapping)
+        for mapping in (
+            plugin.last_check_time,
+            plugin.branch_heads,
+            plugin.branch_head_etags,
+            plugin.webhook_last_seen,
+            plugin.owner_repos,
+        )
+    )
+
+
+def find_growth(samples: list[dict[str, float]], metric: str) -> str | None:
+    """Describe ``metric`` if it grew steadily over the samples, else None.
+
+    The samples are split into thirds. A bounded metric levels off, so it
+    only counts as growing if each third averages higher than the one
+    before and the last third peaks above the first by more than the slack.
+    """
+    values = [sample[metric] for sample in samples]
+    third = len(values) // 3
+    if third < 2:
+        return None
+    parts = (values[:third], values[third:-third], values[-third:])
+    means = [sum(part) / len(part) for part in parts]
+    first_peak, last_peak = max(parts[0]), max(parts[2])
+    absolute, relative = SLACK[metric]
+    if means[0] < means[1] < means[2] and last_peak > first_peak * (1 + relative) + absolute:
+        return f"{METRIC_LABELS[metric]}: {first_peak:,.0f} -> {last_peak:,.0f}"
+    return None
+
+
+class Soak:
+    """Drive one plugin instance with webhook, poll and churn traffic."""
+
+    def __init__(self, plugin: Any, fake: FakeGitHub, args: argparse.Namespace) -> None:
+        self.plugin = plugin
+        self.fake = fake
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.repos = [
+            f"{owner}/repo{i}" for owner in (ORG, USER) for i in range(REPOS_PER_OWNER)
+        ]
+        self.conversations = [f"soak:GroupMessage:{i}" for i in range(CONVERSATIONS)]
+        self.counts = {"webhooks": 0, "polls": 0, "subscribes": 0, "unsubscribes": 0}
+
+    def _random_target(self) -> tuple[str, str]:
+        roll = self.rng.random()
+        if roll < 0.05:
+            base_repo = self.rng.choice((f"{ORG}/*", f"{USER}/*"))
+            return base_repo, self.plugin._format_repo_key(base_repo, None, {"issues"})
+        base_repo = self.rng.choice(self.repos)
+        if roll < 0.3:
+            return base_repo, self.plugin._format_repo_key(base_repo, "main")
+        if roll < 0.5:
+            return base_repo, self.plugin._format_repo_key(base_repo, None, {"issues", "prs"})
+        return base_repo, self.plugin._format_repo_key(base_repo)
+
+    async def webhooks(self) -> None:
+        server = GitHubWebhookServer(
+            self.plugin, "127.0.0.1", 0, WEBHOOK_SECRET, WEBHOOK_PATH
+        )
+        client = server.app.test_client()
+        interval = 1 / self.args.webhook_rate
+        while True:
+            event_type = self.rng.choice(WEBHOOK_EVENTS)
+            repo = self.rng.choice(self.repos)
+            body = json.dumps(
+                webhook_payload(event_type, repo, self.counts["webhooks"])
+            ).encode("utf-8")
+            signature = hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+            await client.post(
+                WEBHOOK_PATH,
+                data=body,
+                headers={
+                    "Content-Type": "application/json",
+                    "X-GitHub-Event": event_type,
+                    "X-GitHub-Delivery": str(uuid.uuid4()),
+                    "X-Hub-Signature-256": f"sha256={signature}",
+                },
+            )
+            self.counts["webhooks"] += 1
+            await asyncio.sleep(interval)
+
+    async def polls(self) -> None:
+        while True:
+            self.fake.tick += 1
+            await self.plugin._check_all_repos()
+            self.counts["polls"] += 1
+            if self.counts["polls"] % 20 == 0:
+                await self.plugin._send_digests("daily")
+            await asyncio.sleep(self.args.poll_seconds)
+
+    async def churn(self) -> None:
+        plugin = self.plugin
+        while True:
+            conversation = self.rng.choice(self.conversations)
+            subscribed = plugin.subscriptions.for_subscriber(conversation)
+            roll = self.rng.random()
+            if roll < 0.05 and subscribed:
+                for repo_key in plugin.subscriptions.discard_subscriber(conversation):
+                    plugin._forget_subscription_state(repo_key)
+                plugin._save_subscriptions()
+                self.counts["unsubscribes"] += len(subscribed)
+            elif roll < 0.5 and subscribed:
+                repo_key = self.rng.choice(subscribed).key
+                plugin.subscriptions.discard(repo_key, conversation)
+                plugin._save_subscriptions()
+                plugin._forget_subscription_state(repo_key)
+                self.counts["unsubscribes"] += 1
+            else:
+                targets = [self._random_target() for _ in range(self.rng.randint(1, 4))]
+                await plugin._subscribe_keys(conversation, targets)
+                self.counts["subscribes"] += len(targets)
+            if self.rng.random() < 0.1:
+                plugin.digest_subscribers[conversation] = "daily"
+            await asyncio.sleep(self.args.churn_seconds)
+
+    def sample(self, started: float) -> dict[str, float]:
+        return {
+            "elapsed": time.monotonic() - started,
+            "memory": tracemalloc.get_traced_memory()[0],
+            "fds": open_fds(),
+            "tasks": len(asyncio.all_tasks()),
+            "state": state_size(self.plugin),
+        }
+
+
+    async def run(self, chat: ChatStandIn) -> int:
+        """Drive traffic for the whole soak, then judge the samples."""
+        args = self.args
+        drivers = [
+            asyncio.create_task(driver()) for driver in (self.webhooks, self.polls, self.churn)
+        ]
+        started = time.monotonic()
+        warmup_until = started + args.minutes * 60 * args.warmup
+        deadline = started + args.minutes * 60
+        samples: list[dict[str, float]] = []
+        warm_snapshot: tracemalloc.Snapshot | None = None
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(
+                    min(args.sample_seconds, max(0.0, deadline - time.monotonic()))
+                )
+                for driver in drivers:
+                    if driver.done() and driver.exception():
+                        raise driver.exception()
+                sample = self.sample(started)
+                _print_sample(sample, self, chat.sent)
+                if time.monotonic() >= warmup_until:
+                    if warm_snapshot is None:
+                        warm_snapshot = tracemalloc.take_snapshot()
+                    samples.append(sample)
+        finally:
+            for driver in drivers:
+                driver.cancel()
+            await asyncio.gather(*drivers, return_exceptions=True)
+
+        print(
+            f"\n{self.counts['webhooks']} webhooks, {self.counts['polls']} poll cycles, "
+            f"{self.counts['subscribes']} subscribes, "
+            f"{self.counts['unsubscribes']} unsubscribes, {chat.sent} messages sent"
+        )
+        if len(samples) < 6:
+            print("too few samples after warm-up to judge growth; run longer or sample more often")
+            return 1
+        leaks = [
+            growth
+            for growth in (find_growth(samples, metric) for metric in SLACK)
+            if growth is not None
+        ]
+        if not leaks:
+            print("no unbounded growth detected")
+            return 0
+
+        print(f"\n{len(leaks)} metric(s) kept growing:")
+        for leak in leaks:
+            print(f"  {leak}")
+        if warm_snapshot is not None:
+            print("\nlargest allocation growth since warm-up:")
+            for stat in tracemalloc.take_snapshot().compare_to(warm_snapshot, "lineno")[:10]:
+                print(f"  {stat}")
+        return 1
+
+
+def _print_sample(sample: dict[str, float], soak: Soak, sent: int) -> None:
+    print(
+        f"[{sample['elapsed'] / 60:7.1f} min] "
+        f"memory {sample['memory'] / (1 << 20):8.2f} MiB  "
+        f"fds {sample['fds']:4.0f}  tasks {sample['tasks']:4.0f}  "
+        f"state {sample['state']:5.0f}  subscriptions {len(soak.plugin.subscriptions):4d}  "
+        f"webhooks {soak.counts['webhooks']}  polls {soak.counts['polls']}  sent {sent}",
+        flush=True,
+    )
+
+
+async def run(args: argparse.Namespace) -> int:
+    fake = FakeGitHub()
+    await fake.start()
+    chat = ChatStandIn()
+    plugin = MyPlugin(
+        chat,
+        {
+            "poll_backend": args.poll_backend,
+            # Poll cycles are driven by the soak; the plugin's own loop only runs once
+            "check_interval": 24 * 60,
+            "issue_mirror_sync_minutes": 24 * 60,
+            "enable_local_cards": False,
+            "storm_window_minutes": 1,
+            "webhook_secret": WEBHOOK_SECRET,
+            "github_max_retries": 0,
+        },
+    )
+    plugin.github = LocalGitHubClient(fake.base_url, max_retries=0)
+    await plugin._startup_task
+
+    tracemalloc.start()
+    soak = Soak(plugin, fake, args)
+    try:
+        return await soak.run(chat)
+    finally:
+        tracemalloc.stop()
+        # Open star/fork windows are flushed at the plugin's normal send pace
+        print("shutting down the plugin", flush=True)
+        await plugin.terminate()
+        await fake.stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--minutes", type=float, default=120, help="soak duration, default %(default)s"
+    )
+    parser.add_argument(
+        "--sample-seconds", type=float, default=60, help="sampling interval, default %(default)s"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=0.2,
+        help="fraction of the run ignored as warm-up, default %(default)s",
+    )
+    parser.add_argument(
+        "--webhook-rate",
+        type=float,
+        default=5,
+        help="webhook deliveries per second, default %(default)s",
+    )
+    parser.add_argument(
+        "--poll-seconds",
+        type=float,
+        default=5,
+        help="pause between poll cycles, default %(default)s",
+    )
+    parser.add_argument(
+        "--churn-seconds",
+        type=float,
+        default=0.5,
+        help="pause between subscribe/unsubscribe operations, default %(default)s",
+    )
+    parser.add_argument("--poll-backend", choices=("classic", "events"), default="classic")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the traffic mix")
+    parser.add_argument("--keep", action="store_true", help="keep the plugin's data directory")
+    args = parser.parse_args(argv)
+
+    # The plugin keeps its state under data/ in the working directory
+    workdir = tempfile.mkdtemp(prefix="github-cards-soak-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    print(f"plugin data in {workdir}")
+    try:
+        return asyncio.run(run(args))
+    finally:
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+# Stages in delivery order; "lag" is the end-to-end delay from GitHub's own
+# event timestamp to the first successful send
+TRACE_STAGES = ("receive", "verify", "parse", "match", "format", "enqueue", "send", "lag")
+STAGE_LABELS = {
+    "receive": "接收",
+    "verify": "验签",
+    "parse": "解析",
+    "match": "匹配",
+    "format": "格式化",
+    "enqueue": "排队",
+    "send": "发送",
+    "lag": "端到端延迟",
+}
+SOURCE_LABELS = {"webhook": "Webhook", "poll": "轮询"}
+
+# Samples kept per (source, stage); older samples roll off
+DEFAULT_WINDOW = 1024
+
+# Payload objects carrying the event's own timestamp, most specific first
+_WEBHOOK_TIME_FIELDS = (
+    ("comment", "updated_at"),
+    ("review", "submitted_at"),
+    ("release", "published_at"),
+    ("head_commit", "timestamp"),
+    ("forkee", "created_at"),
+    ("pull_request", "updated_at"),
+    ("issue", "updated_at"),
+    ("discussion", "updated_at"),
+)
+
+
+def parse_timestamp(value: Any) -> float | None:
+    """Parse a GitHub ISO 8601 timestamp into a UNIX timestamp."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def webhook_event_time(payload: dict[str, Any]) -> float | None:
+    """Return when GitHub says a webhook event happened, if the payload tells."""
+    starred_at = parse_timestamp(payload.get("starred_at"))
+    if starred_at is not None:
+        return starred_at
+    for key, field in _WEBHOOK_TIME_FIELDS:
+        obj = payload.get(key)
+        if isinstance(obj, dict):
+            ts = parse_timestamp(obj.get(field))
+            if ts is not None:
+                return ts
+    return None
+
+
+def poll_item_time(item: dict[str, Any]) -> float | None:
+    """Return when a polled issue/PR/commit/release was created."""
+    kind = item.get("_astrbot_type")
+    if kind == "commit":
+        commit = item.get("commit") or {}
+        return parse_timestamp((commit.get("committer") or {}).get("date"))
+    if kind == "release":
+        return parse_timestamp(item.get("published_at") or item.get("created_at"))
+    return parse_timestamp(item.get("created_at"))
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = max(0, min(len(sorted_values) - 1, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def format_duration(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f}h"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f}min"
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    return f"{seconds * 1000:.1f}ms"
+
+
+class StageTracer:
+    """Rolling per-stage latency samples for notification deliveries.
+
+    Samples are kept per source (``webhook`` or ``poll``) and stage in
+    bounded deques, so percentiles always describe the most recent
+    deliveries and memory stays fixed.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self.window = window
+        self._samples: dict[tuple[str, str], deque[float]] = {}
+
+    def record(self, source: str, stage: str, seconds: float) -> None:
+        samples = self._samples.get((source, stage))
+        if samples is None:
+            samples = self._samples[(source, stage)] = deque(maxlen=self.window)
+        samples.append(max(0.0, seconds))
+
+    def start(
+        self, source: str, event_time: float | None = None
+    ) -> "DeliveryTrace":
+        return DeliveryTrace(self, source, event_time)
+
+    def summary(self, source: str, stage: str) -> tuple[int, float, float, float] | None:
+        """Return (samples, p50, p95, p99) in seconds, or None without samples."""
+        samples = self._samples.get((source, stage))
+        if not samples:
+            return None
+        values = sorted(samples)
+        return (
+            len(values),
+            percentile(values, 0.50),
+            percentile(values, 0.95),
+            percentile(values, 0.99),
+        )
+
+    def report(self) -> str | None:
+        sections = []
+        for source, source_label in SOURCE_LABELS.items():
+            rows = []
+            for stage in TRACE_STAGES:
+                summary = self.summary(source, stage)
+                if summary is None:
+                    continue
+                count, p50, p95, p99 = summary
+                rows.append(
+                    f"  {STAGE_LABELS[stage]}: p50 {format_duration(p50)} / "
+                    f"p95 {format_duration(p95)} / p99 {format_duration(p99)} ({count} 次)"
+                )
+            if rows:
+                sections.append(f"[{source_label}]\n" + "\n".join(rows))
+        if not sections:
+            return None
+        return "\n".join(sections)
+
+
+class DeliveryTrace:
+    """Stage timings of one delivery, taken with the monotonic clock.
+
+    ``mark(stage)`` attributes the time since the previous mark to the
+    stage. The end-to-end lag compares wall-clock time against the event's
+    GitHub timestamp and is recorded once, at the first successful send.
+    """
+
+    __slots__ = ("tracer", "source", "event_time", "last", "lag_recorded")
+
+    def __init__(
+        self, tracer: StageTracer, source: str, event_time: float | None = None
+    ) -> None:
+        self.tracer = tracer
+        self.source = source
+        self.event_time = event_time
+        self.last = time.monotonic()
+        self.lag_recorded = False
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Record a stage measured elsewhere, e.g. in the webhook receiver."""
+        self.tracer.record(self.source, stage, seconds)
+
+    def mark(self, stage: str) -> None:
+        now = time.monotonic()
+        self.tracer.record(self.source, stage, now - self.last)
+        self.last = now
+
+    def sent(self) -> None:
+        """Mark a finished send and record the end-to-end lag on the first one."""
+        self.mark("send")
+        if not self.lag_recorded and self.event_time is not None:
+            self.lag_recorded = True
+            self.tracer.record(self.source, "lag", time.time() - self.event_time)
@@ -0,0 +1,140 @@
+"""Webhook helpers shared by the in-process server and the receiver process.
+
+This module must not import AstrBot so the standalone receiver process
+stays lightweight.
+"""
+
+import hashlib
+import hmac
+from collections import OrderedDict
+from typing import Any
+
+# Environment variable used to hand the webhook secret to the receiver process
+SECRET_ENV = "GITHUB_CARDS_WEBHOOK_SECRET"
+
+# Longest text kept for bodies and messages in slimmed payloads
+MAX_TEXT_LENGTH = 1000
+
+_USER = {"login": None, "type": None}
+_LABELS = {"name": None}
+_ISSUE = {
+    "number": None,
+    "title": None,
+    "state": None,
+    "html_url": None,
+    "body": None,
+    "created_at": None,
+    "updated_at": None,
+    "user": _USER,
+    "labels": _LABELS,
+    "assignees": _USER,
+    "pull_request": {"html_url": None},
+}
+_PULL_REQUEST = {
+    **_ISSUE,
+    "merged": None,
+    "base": {"label": None, "ref": None},
+    "head": {"label": None, "ref": None},
+}
+_COMMENT = {
+    "id": None,
+    "body": None,
+    "html_url": None,
+    "commit_id": None,
+    "created_at": None,
+    "updated_at": None,
+    "pull_request_review_id": None,
+    "user": _USER,
+}
+_COMMIT = {
+    "id": None,
+    "message": None,
+    "timestamp": None,
+    "author": {"name": None, "username": None},
+    "added": None,
+    "modified": None,
+    "removed": None,
+}
+
+# Fields kept from webhook payloads; everything the formatters and the
+# subscription matcher read, and nothing else.
+SLIM_SPEC: dict[str, Any] = {
+    "action": None,
+    "ref": None,
+    "ref_type": None,
+    "before": None,
+    "after": None,
+    "compare": None,
+    "repository": {"full_name": None, "private": None},
+    "sender": _USER,
+    "issue": _ISSUE,
+    "pull_request": _PULL_REQUEST,
+    "comment": _COMMENT,
+    "review": {**_COMMENT, "state": None, "submitted_at": None},
+    "thread": {"html_url": None, "comments": _COMMENT},
+    "discussion": {**_ISSUE, "answer_html_url": None},
+    "forkee": {"full_name": None, "name": None, "html_url": None, "created_at": None},
+    "release": {
+        "tag_name": None,
+        "name": None,
+        "body": None,
+        "html_url": None,
+        "published_at": None,
+        "created_at": None,
+        "author": _USER,
+    },
+    "commits": _COMMIT,
+    "head_commit": _COMMIT,
+    "starred_at": None,
+}
+
+
+def verify_signature(secret: bytes | None, payload: bytes, signature: str | None) -> bool:
+    """Check an ``X-Hub-Signature-256`` header. No secret means no check."""
+    if not secret:
+        return True
+    expected = "sha256=" + hmac.new(secret, payload, hashlib.sha256).hexdigest()
+    return bool(signature) and hmac.compare_digest(signature, expected)
+
+
+def _prune(value: Any, spec: dict[str, Any] | None) -> Any:
+    if isinstance(value, list):
+        return [_prune(item, spec) for item in value]
+    if spec is None or not isinstance(value, dict):
+        if isinstance(value, str) and len(value) > MAX_TEXT_LENGTH:
+            return value[:MAX_TEXT_LENGTH]
+        return value
+    return {key: _prune(value[key], sub) for key, sub in spec.items() if key in value}
+
+
+def slim_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    """Drop payload fields the plugin never reads and cap long texts."""
+    return _prune(payload, SLIM_SPEC)
+
+
+class DeliveryDeduper:
+    """Remember recent ``X-GitHub-Delivery`` IDs to drop redeliveries.
+
+    Only deliveries that were accepted are recorded: GitHub redelivers a
+    failed delivery under the same ID, and that retry must go through.
+    """
+
+    def __init__(self, maxlen: int = 2048) -> None:
+        self.maxlen = maxlen
+        self._seen: OrderedDict[str, None] = OrderedDict()
+
+    def seen(self, delivery_id: str | None) -> bool:
+        """Return True if ``delivery_id`` was already accepted, without recording it."""
+        if not delivery_id or delivery_id not in self._seen:
+            return False
+        self._seen.move_to_end(delivery_id)
+        return True
+
+    def record(self, delivery_id: str | None) -> None:
+        """Remember ``delivery_id`` once its delivery has been accepted."""
+        if not delivery_id:
+            return
+        self._seen[delivery_id] = None
+        self._seen.move_to_end(delivery_id)
+        if len(self._seen) > self.maxlen:
+            self._seen.popitem(last=False)
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any
+
+from astrbot.api import logger
+
+from .webhook_payloads import SECRET_ENV
+
+RECEIVER_SCRIPT = os.path.join(os.path.dirname(__file__), "webhook_receiver.py")
+# Longest record line accepted from the receiver process
+MAX_RECORD_BYTES = 4 * 1024 * 1024
+# Restart backoff bounds for a crashing receiver process
+RESTART_DELAY_MIN = 1.0
+RESTART_DELAY_MAX = 60.0
+# A receiver that ran this long is considered healthy and resets the backoff
+HEALTHY_RUNTIME = 60.0
+
+
+class GitHubWebhookProcess:
+    """Run the webhook receiver in a supervised child process.
+
+    Signature checks, payload parsing and slimming happen in the child, so
+    webhook storms do not compete with chat handling on the bot's event
+    loop. Records arrive over the child's stdout; at most ``max_pending``
+    of them are dispatched concurrently, and once that limit is reached the
+    pipe and then the child's queue fill up and GitHub receives 503s.
+    """
+
+    def __init__(
+        self,
+        plugin,
+        host: str,
+        port: int,
+        secret: str | None,
+        path: str,
+        max_pending: int = 256,
+    ) -> None:
+        self.plugin = plugin
+        self.host = host
+        self.port = port
+        self.secret = secret or ""
+        self.path = path if path.startswith("/") else f"/{path}"
+        self.max_pending = max(1, int(max_pending))
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._process: asyncio.subprocess.Process | None = None
+        self._runner: asyncio.Task[Any] | None = None
+        self._stopping = False
+        self._dispatches: set[asyncio.Task[Any]] = set()
+
+    def start(self) -> None:
+        if self._runner:
+            return
+        self._stopping = False
+        logger.info(
+            f"启动 GitHub Webhook 子进程: http://{self.host}:{self.port}{self.path}"
+        )
+        if not self.secret:
+            logger.warning("GitHub Webhook 未设置 secret，建议在配置中设置以验证请求")
+        self._runner = asyncio.create_task(self._supervise())
+
+    async def _supervise(self) -> None:
+        delay = RESTART_DELAY_MIN
+        while not self._stopping:
+            started = time.monotonic()
+            try:
+                await self._run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"GitHub Webhook 子进程运行出错: {e}", exc_info=True)
+
+            if self._stopping:
+                break
+            if time.monotonic() - started > HEALTHY_RUNTIME:
+                delay = RESTART_DELAY_MIN
+            logger.warning(f"GitHub Webhook 子进程已退出，{delay:.0f} 秒后重启")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RESTART_DELAY_MAX)
+
+    async def _run_once(self) -> None:
+        env = dict(os.environ)
+        env[SECRET_ENV] = self.secret
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            RECEIVER_SCRIPT,
+            "--host",
+            self.host,
+            "--port",
+            str(self.port),
+            "--path",
+            self.path,
+            "--max-pending",
+            str(self.max_pending),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            limit=MAX_RECORD_BYTES,
+        )
+        self._process = process
+        logger.info(f"GitHub Webhook 子进程已启动 (pid {process.pid})")
+        log_task = asyncio.create_task(self._relay_logs(process))
+        try:
+            await self._read_records(process)
+            code = await process.wait()
+            logger.info(f"GitHub Webhook 子进程退出，返回码 {code}")
+        finally:
+            await log_task
+            self._process = None
+
+    async def _read_records(self, process: asyncio.subprocess.Process) -> None:
+        assert process.stdout is not None
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                return
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning("无法解析 GitHub Webhook 子进程转发的记录")
+                continue
+            # Stop reading while saturated so backpressure reaches the child
+            await self._slots.acquire()
+            task = asyncio.create_task(self._dispatch(record))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, record: dict[str, Any]) -> None:
+        try:
+            stages = dict(record.get("stages") or {})
+            received_at = record.get("received_at")
+            if received_at is not None:
+                # Time spent forwarding the delivery from the child counts as receiving it
+                handoff = time.time() - received_at - sum(stages.values())
+                stages["receive"] = stages.get("receive", 0.0) + max(0.0, handoff)
+            await self.plugin.handle_webhook_event(
+                record["event"], record["payload"], stages=stages
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.error(f"处理 GitHub Webhook 事件时出错: {exc}", exc_info=True)
+        finally:
+            self._slots.release()
+
+    async def _relay_logs(self, process: asyncio.subprocess.Process) -> None:
+        assert process.stderr is not None
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                return
+            text = line.decode("utf-8", errors="replace").rstrip()
+            if text.startswith(("WARNING", "ERROR", "CRITICAL")):
+                logger.warning(f"[Webhook 子进程] {text}")
+            else:
+                logger.debug(f"[Webhook 子进程] {text}")
+
+    async def stop(self) -> None:
+        if not self._runner:
+            return
+        self._stopping = True
+        process = self._process
+        if process and process.returncode is None:
+            # Closing stdin asks the receiver to shut down gracefully
+            if process.stdin:
+                process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                logger.warning("GitHub Webhook 子进程未能及时退出，强制结束")
+                process.kill()
+                await process.wait()
+        self._runner.cancel()
+        try:
+            await self._runner
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._runner = None
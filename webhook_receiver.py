@@ -0,0 +1,163 @@
+"""Standalone GitHub webhook receiver run as a child process of the plugin.
+
+The receiver verifies signatures, drops redeliveries, slims payloads and
+writes one compact JSON record per delivery to stdout. The plugin reads the
+records and closes our stdin to ask for shutdown. When the plugin stops
+reading, the bounded queue fills up and new deliveries are answered with 503.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any
+
+from quart import Quart, Response, request
+
+from webhook_payloads import (
+    SECRET_ENV,
+    DeliveryDeduper,
+    slim_payload,
+    verify_signature,
+)
+
+logger = logging.getLogger("github_webhook_receiver")
+
+
+def create_app(
+    path: str,
+    secret: bytes | None,
+    queue: "asyncio.Queue[bytes]",
+) -> Quart:
+    app = Quart(__name__)
+    deduper = DeliveryDeduper()
+
+    @app.post(path)
+    async def github_webhook():
+        received_at = time.time()
+        started = time.perf_counter()
+        payload_bytes = await request.get_data()
+        if not isinstance(payload_bytes, (bytes, bytearray)):
+            payload_bytes = str(payload_bytes).encode("utf-8")
+        received = time.perf_counter()
+
+        if not verify_signature(
+            secret, bytes(payload_bytes), request.headers.get("X-Hub-Signature-256")
+        ):
+            logger.warning("收到无效的 GitHub Webhook 签名")
+            return Response("invalid signature", status=401)
+        verified = time.perf_counter()
+
+        event_type = request.headers.get("X-GitHub-Event", "")
+        if not event_type:
+            return Response("missing event", status=400)
+
+        delivery_id = request.headers.get("X-GitHub-Delivery")
+        if deduper.seen(delivery_id):
+            return Response("duplicate delivery", status=200)
+
+        try:
+            if request.is_json:
+                data = json.loads(payload_bytes)
+            else:
+                form_data = await request.form
+                data = json.loads(form_data["payload"]) if "payload" in form_data else None
+            if not isinstance(data, dict):
+                return Response("invalid payload", status=400)
+        except Exception:
+            logger.warning("GitHub Webhook JSON 解析失败")
+            return Response("invalid payload", status=400)
+
+        record = {
+            "event": event_type,
+            "delivery": delivery_id,
+            "received_at": received_at,
+            "stages": {
+                "receive": received - started,
+                "verify": verified - received,
+                "parse": time.perf_counter() - verified,
+            },
+            "payload": slim_payload(data),
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        try:
+            queue.put_nowait(line.encode("utf-8") + b"\n")
+        except asyncio.QueueFull:
+            logger.warning("Webhook 转发队列已满，拒绝本次投递")
+            return Response("busy", status=503)
+        deduper.record(delivery_id)
+        return Response("ok", status=200)
+
+    @app.get(path)
+    async def github_webhook_health():
+        return Response("github webhook ok", status=200)
+
+    return app
+
+
+def _write_record(out: Any, line: bytes) -> None:
+    out.write(line)
+    out.flush()
+
+
+async def _forward(queue: "asyncio.Queue[bytes]", out: Any) -> None:
+    """Write queued records to the plugin, blocking while the pipe is full."""
+    while True:
+        line = await queue.get()
+        await asyncio.to_thread(_write_record, out, line)
+
+
+async def serve(host: str, port: int, path: str, secret: bytes | None, max_pending: int) -> None:
+    # Records go to a private copy of stdout; anything else printed by
+    # Quart or Hypercorn is sent to stderr so it cannot corrupt the stream.
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    loop = asyncio.get_running_loop()
+    shutdown = asyncio.Event()
+
+    def wait_for_parent() -> None:
+        # stdin reaches EOF when the plugin closes it or exits
+        sys.stdin.buffer.read()
+        loop.call_soon_threadsafe(shutdown.set)
+
+    threading.Thread(target=wait_for_parent, daemon=True).start()
+
+    queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=max(1, max_pending))
+    app = create_app(path, secret, queue)
+    forwarder = asyncio.create_task(_forward(queue, out))
+    try:
+        await app.run_task(host=host, port=port, shutdown_trigger=shutdown.wait)
+    finally:
+        forwarder.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=6192)
+    parser.add_argument("--path", default="/github/webhook")
+    parser.add_argument("--max-pending", type=int, default=256)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, stream=sys.stderr, format="%(levelname)s %(message)s"
+    )
+    secret = os.environ.get(SECRET_ENV)
+    asyncio.run(
+        serve(
+            args.host,
+            args.port,
+            args.path if args.path.startswith("/") else f"/{args.path}",
+            secret.encode("utf-8") if secret else None,
+            args.max_pending,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
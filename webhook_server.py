@@ -1,13 +1,14 @@
 import asyncio
-import hashlib
-import hmac
 import json
+import time
 from typing import Any
 
 from quart import Quart, Response, request
 
 from astrbot.api import logger
 
+from .webhook_payloads import DeliveryDeduper, verify_signature
+
 
 class GitHubWebhookServer:
     """Run a Quart server to receive GitHub webhook callbacks."""
@@ -26,6 +27,7 @@ class GitHubWebhookServer:
         self.secret: bytes | None = secret.encode("utf-8") if secret else None
         self.path = path if path.startswith("/") else f"/{path}"
         self.app = Quart(__name__)
+        self._deduper = DeliveryDeduper()
         self._shutdown: asyncio.Event | None = None
         self._runner: asyncio.Task[Any] | None = None
         self._configure_routes()
@@ -33,25 +35,29 @@ class GitHubWebhookServer:
     def _configure_routes(self) -> None:
         @self.app.post(self.path)
         async def github_webhook():
+            started = time.perf_counter()
             signature = request.headers.get("X-Hub-Signature-256")
             payload = await request.get_data()
             if isinstance(payload, (bytes, bytearray)):
                 payload_bytes = bytes(payload)
             else:
                 payload_bytes = str(payload).encode("utf-8")
+            received = time.perf_counter()
 
-            if self.secret:
-                expected = "sha256=" + hmac.new(
-                    self.secret, payload_bytes, hashlib.sha256
-                ).hexdigest()
-                if not signature or not hmac.compare_digest(signature, expected):
-                    logger.warning("收到无效的 GitHub Webhook 签名")
-                    return Response("invalid signature", status=401)
+            if not verify_signature(self.secret, payload_bytes, signature):
+                logger.warning("收到无效的 GitHub Webhook 签名")
+                return Response("invalid signature", status=401)
+            verified = time.perf_counter()
 
             event_type = request.headers.get("X-GitHub-Event", "")
             if not event_type:
                 return Response("missing event", status=400)
 
+            delivery_id = request.headers.get("X-GitHub-Delivery")
+            if self._deduper.seen(delivery_id):
+                logger.debug("忽略重复投递的 GitHub Webhook")
+                return Response("duplicate delivery", status=200)
+
             try:
                 if request.is_json:
                     data = await request.get_json()
@@ -69,15 +75,24 @@ class GitHubWebhookServer:
                 logger.warning("GitHub Webhook JSON 解析失败")
                 return Response("invalid payload", status=400)
 
+            stages = {
+                "receive": received - started,
+                "verify": verified - received,
+                "parse": time.perf_counter() - verified,
+            }
+
             async def dispatch() -> None:
                 try:
-                    await self.plugin.handle_webhook_event(event_type, data)
+                    await self.plugin.handle_webhook_event(
+                        event_type, data, stages=stages
+                    )
                 except Exception as exc:  # noqa: BLE001
                     logger.error(
                         f"处理 GitHub Webhook 事件时出错: {exc}", exc_info=True
                     )
 
             asyncio.create_task(dispatch())
+            self._deduper.record(delivery_id)
             return Response("ok", status=200)
 
         @self.app.get(self.path)